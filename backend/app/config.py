@@ -3,7 +3,7 @@ Configuration management for the AutoPilot project generator.
 Loads settings from environment variables using python-dotenv.
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Dict
 
 
 class Settings(BaseSettings):
@@ -19,6 +19,76 @@ class Settings(BaseSettings):
     # Groq AI configuration
     groq_api_key: Optional[str] = None
     groq_model: str = "llama3-70b-8192"
+    groq_api_url: str = "https://api.groq.com/openai/v1/chat/completions"
+    
+    # Groq HTTP connection pool
+    groq_http2: bool = True
+    groq_max_connections: int = 50
+    groq_max_keepalive_connections: int = 20
+    groq_keepalive_expiry: float = 30.0
+    groq_timeout: float = 90.0
+    
+    # Groq quotas (per model, 0 disables) and retry policy
+    groq_requests_per_minute: int = 30
+    groq_tokens_per_minute: int = 30000
+    groq_model_rate_limits: Dict[str, Dict[str, int]] = {}
+    groq_max_retries: int = 3
+    
+    # Model routing of generated files: file category (config, docs, database,
+    # backend, frontend, other) -> "fast", "default" or a model id; {} disables
+    groq_fast_model: str = "llama-3.1-8b-instant"
+    groq_model_routes: Dict[str, str] = {"config": "fast", "docs": "fast"}
+    # Tech stack keyword -> route overrides, e.g. {"django": {"config": "default"}}
+    groq_model_stack_routes: Dict[str, Dict[str, str]] = {}
+    
+    # Hedged requests: duplicate calls slower than this percentile of recent
+    # latency, spending at most groq_hedge_budget extra requests per request
+    groq_hedging_enabled: bool = False
+    groq_hedge_percentile: float = 95.0
+    groq_hedge_min_samples: int = 20
+    groq_hedge_window: int = 200
+    groq_hedge_min_delay: float = 1.0
+    groq_hedge_budget: float = 0.05
+    
+    # Share one upstream call among identical concurrent AI calls
+    llm_single_flight_enabled: bool = True
+    
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_dir: str = "storage/llm_cache"
+    llm_cache_max_bytes: int = 512 * 1024 * 1024
+    llm_cache_memory_bytes: int = 64 * 1024 * 1024
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    
+    # Code generation concurrency
+    generation_max_concurrency: int = 8
+    generation_project_concurrency: int = 4
+    # Small files (config, package markers, section READMEs) per shared
+    # completion; 1 disables batching
+    generation_batch_max_files: int = 6
+    generation_batch_window: float = 0.05
+    # Render boilerplate files from local templates instead of the AI
+    generation_templates_enabled: bool = True
+    
+    # Generation log buffering and status write coalescing
+    log_buffer_max_entries: int = 50
+    log_flush_interval: float = 1.0
+    status_coalesce_interval: float = 0.5
+    
+    # Live progress streaming (GET /projects/{id}/events)
+    progress_event_history: int = 500
+    progress_event_queue_size: int = 1000
+    sse_keepalive_seconds: float = 15.0
+    # Status polling interval for runs not published in this process
+    sse_poll_seconds: float = 5.0
+    
+    # Generation job queue and workers
+    job_worker_concurrency: int = 2
+    job_embedded_worker: bool = True
+    job_lease_seconds: int = 60
+    job_heartbeat_seconds: int = 15
+    job_poll_interval: float = 1.0
+    job_max_attempts: int = 3
     
     class Config:
         env_file = ".env"
@@ -5,11 +5,17 @@ from app.db.models import (
     ProjectSpec,
     ProjectFile,
     GenerationLog,
+    Blueprint,
+    GenerationJob,
+    GenerationRun,
     Project_Pydantic,
     ProjectIn_Pydantic,
     ProjectSpec_Pydantic,
     ProjectFile_Pydantic,
     GenerationLog_Pydantic,
+    Blueprint_Pydantic,
+    GenerationJob_Pydantic,
+    GenerationRun_Pydantic,
 )
 
 __all__ = [
@@ -19,9 +25,15 @@ __all__ = [
     "ProjectSpec",
     "ProjectFile",
     "GenerationLog",
+    "Blueprint",
+    "GenerationJob",
+    "GenerationRun",
     "Project_Pydantic",
     "ProjectIn_Pydantic",
     "ProjectSpec_Pydantic",
     "ProjectFile_Pydantic",
     "GenerationLog_Pydantic",
+    "Blueprint_Pydantic",
+    "GenerationJob_Pydantic",
+    "GenerationRun_Pydantic",
 ]
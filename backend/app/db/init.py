@@ -1,7 +1,7 @@
 """
 Tortoise ORM initialization and configuration.
 """
-from tortoise import Tortoise
+from tortoise import Tortoise, connections
 from app.config import settings
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
@@ -71,6 +71,26 @@ TORTOISE_ORM = {
 }
 
 
+# Idempotent DDL for changes that generate_schemas() cannot apply to
+# tables that already exist (it only creates missing tables).
+SCHEMA_UPGRADES = [
+    "ALTER TABLE project_specs ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64)",
+    "ALTER TABLE project_specs ADD COLUMN IF NOT EXISTS blueprint_json JSONB",
+    "ALTER TABLE project_specs ADD COLUMN IF NOT EXISTS generated_snapshot JSONB",
+    "ALTER TABLE project_files ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'PENDING'",
+    "ALTER TABLE project_files ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE project_files ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ",
+    "CREATE INDEX IF NOT EXISTS idx_project_files_project_path ON project_files (project_id, path)",
+    "CREATE INDEX IF NOT EXISTS idx_generation_jobs_claim ON generation_jobs (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_generation_jobs_project ON generation_jobs (project_id, status)",
+    # Keyset pagination of GET /projects/{id}/logs, with and without a step filter
+    "CREATE INDEX IF NOT EXISTS idx_generation_logs_project_ts ON generation_logs (project_id, timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_generation_logs_project_step_ts ON generation_logs (project_id, step, timestamp, id)",
+    # Latest runs of a project for GET /projects/{id}/runs
+    "CREATE INDEX IF NOT EXISTS idx_generation_runs_project ON generation_runs (project_id, started_at)",
+]
+
+
 async def init_db():
     """Initialize Tortoise ORM and create database tables."""
     await Tortoise.init(
@@ -79,6 +99,11 @@ async def init_db():
     )
     # Generate schema
     await Tortoise.generate_schemas()
+    
+    # Bring existing tables up to date
+    connection = connections.get("default")
+    for statement in SCHEMA_UPGRADES:
+        await connection.execute_script(statement)
 
 
 async def close_db():
@@ -42,6 +42,19 @@ class ProjectSpec(models.Model):
     apis_json = fields.JSONField(default=dict)
     database_json = fields.JSONField(default=dict)
     tech_stack_json = fields.JSONField(default=dict)
+    fingerprint = fields.CharField(
+        max_length=64,
+        null=True,
+        description="SHA-256 of the canonical parsed spec content"
+    )
+    blueprint_json = fields.JSONField(
+        null=True,
+        description="Blueprint the project files were generated from"
+    )
+    generated_snapshot = fields.JSONField(
+        null=True,
+        description="Parsed specs as of the last successful generation"
+    )
     created_at = fields.DatetimeField(auto_now_add=True)
     
     class Meta:
@@ -66,7 +79,18 @@ class ProjectFile(models.Model):
         description="backend | frontend | config | docs"
     )
     is_optimized = fields.BooleanField(default=False)
+    status = fields.CharField(
+        max_length=20,
+        default="PENDING",
+        description="PENDING | DONE | FAILED (generation checkpoint)"
+    )
+    content_hash = fields.CharField(
+        max_length=64,
+        null=True,
+        description="SHA-256 of the generated content on disk"
+    )
     created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True, null=True)
     
     class Meta:
         table = "project_files"
@@ -96,9 +120,106 @@ class GenerationLog(models.Model):
         return f"GenerationLog({self.step}, {self.timestamp})"
 
 
+class Blueprint(models.Model):
+    """AI-generated blueprint memoized by spec fingerprint, tech stack and model."""
+    
+    id = fields.UUIDField(pk=True, default=uuid.uuid4)
+    fingerprint = fields.CharField(max_length=64)
+    tech_stack = fields.CharField(max_length=255)
+    model = fields.CharField(max_length=255)
+    blueprint_json = fields.JSONField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+    
+    class Meta:
+        table = "blueprints"
+        unique_together = (("fingerprint", "tech_stack", "model"),)
+    
+    def __str__(self):
+        return f"Blueprint({self.fingerprint[:12]}, {self.tech_stack}, {self.model})"
+
+
+class GenerationJob(models.Model):
+    """Queued generation run, claimed and executed by a worker process."""
+    
+    id = fields.UUIDField(pk=True, default=uuid.uuid4)
+    project = fields.ForeignKeyField(
+        "models.Project",
+        related_name="jobs",
+        on_delete=fields.CASCADE
+    )
+    kind = fields.CharField(
+        max_length=20,
+        description="generate | regenerate | resume"
+    )
+    options = fields.JSONField(default=dict)
+    status = fields.CharField(
+        max_length=20,
+        default="QUEUED",
+        description="QUEUED | RUNNING | DONE | FAILED"
+    )
+    attempts = fields.IntField(default=0)
+    max_attempts = fields.IntField(default=3)
+    worker_id = fields.CharField(max_length=255, null=True)
+    lease_expires_at = fields.DatetimeField(null=True)
+    heartbeat_at = fields.DatetimeField(null=True)
+    error = fields.TextField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    started_at = fields.DatetimeField(null=True)
+    finished_at = fields.DatetimeField(null=True)
+    
+    class Meta:
+        table = "generation_jobs"
+        ordering = ["created_at"]
+    
+    def __str__(self):
+        return f"GenerationJob({self.kind}, {self.status})"
+
+
+class GenerationRun(models.Model):
+    """Timing and token report of one generation run."""
+    
+    id = fields.UUIDField(pk=True, default=uuid.uuid4)
+    project = fields.ForeignKeyField(
+        "models.Project",
+        related_name="runs",
+        on_delete=fields.CASCADE
+    )
+    job_id = fields.UUIDField(null=True)
+    kind = fields.CharField(
+        max_length=20,
+        description="generate | regenerate | resume"
+    )
+    status = fields.CharField(
+        max_length=20,
+        description="DONE | FAILED | INTERRUPTED"
+    )
+    started_at = fields.DatetimeField()
+    finished_at = fields.DatetimeField(null=True)
+    wall_seconds = fields.FloatField(default=0)
+    queue_wait_seconds = fields.FloatField(default=0)
+    llm_calls = fields.IntField(default=0)
+    cache_hits = fields.IntField(default=0)
+    prompt_tokens = fields.IntField(default=0)
+    completion_tokens = fields.IntField(default=0)
+    report = fields.JSONField(
+        default=dict,
+        description="Per-stage and per-file timings and token counts"
+    )
+    
+    class Meta:
+        table = "generation_runs"
+        ordering = ["-started_at"]
+    
+    def __str__(self):
+        return f"GenerationRun({self.kind}, {self.status}, {self.wall_seconds:.1f}s)"
+
+
 # Pydantic models for API responses
 Project_Pydantic = pydantic_model_creator(Project, name="Project")
 ProjectIn_Pydantic = pydantic_model_creator(Project, name="ProjectIn", exclude_readonly=True)
 ProjectSpec_Pydantic = pydantic_model_creator(ProjectSpec, name="ProjectSpec")
 ProjectFile_Pydantic = pydantic_model_creator(ProjectFile, name="ProjectFile")
 GenerationLog_Pydantic = pydantic_model_creator(GenerationLog, name="GenerationLog")
+Blueprint_Pydantic = pydantic_model_creator(Blueprint, name="Blueprint")
+GenerationJob_Pydantic = pydantic_model_creator(GenerationJob, name="GenerationJob")
+GenerationRun_Pydantic = pydantic_model_creator(GenerationRun, name="GenerationRun")
@@ -2,29 +2,54 @@
 Main FastAPI application for AutoPilot project generator.
 Initializes the app, database, and routes.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from contextlib import asynccontextmanager
+import time
 
 from app.config import settings
 from app.db import init_db, close_db
 from app.routes import projects_router
+from app.services.groq_client import groq_client
+from app.services.rate_limiter import rate_limiter
+from app.services.llm_cache import llm_cache
+from app.services.generation_worker import GenerationWorker
+from app.services.job_queue import job_queue
+from app.services.log_sink import log_sink
+from app.services.metrics import render_metrics, http_request_duration
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager.
-    Handles startup and shutdown events for database initialization.
+    Handles startup and shutdown events for the database, the shared
+    Groq HTTP client and the embedded generation worker.
     """
     # Startup
     print("Initializing database connection...")
     await init_db()
     print("Database initialized successfully!")
+    await groq_client.start()
+    
+    # Without dedicated workers (python -m app.worker), run generations in-process
+    worker = None
+    if settings.job_embedded_worker:
+        worker = GenerationWorker(settings.job_worker_concurrency)
+        await worker.start()
     
     yield
     
     # Shutdown
+    if worker:
+        print("Stopping embedded generation worker...")
+        await worker.stop()
+    print("Flushing generation logs...")
+    await log_sink.close()
+    print("Closing Groq HTTP client...")
+    await groq_client.close()
     print("Closing database connection...")
     await close_db()
     print("Database connection closed.")
@@ -47,6 +72,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe request latency by route template (not raw path, to bound label values)."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_duration.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status_code)
+        ).observe(time.perf_counter() - started)
+
+
 # Include routers
 app.include_router(projects_router)
 
@@ -63,5 +107,16 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint, including Groq rate limit, cache and job queue stats."""
+    return {
+        "status": "healthy",
+        "jobs": await job_queue.depth(),
+        "rate_limits": rate_limiter.saturation(),
+        "llm_cache": llm_cache.stats()
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics of this process."""
+    return Response(await render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -2,18 +2,27 @@
 Project routes for the AutoPilot project generator.
 Handles project creation and management.
 """
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Header, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from tortoise.transactions import in_transaction
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pathlib import Path
 import uuid
 import zipfile
 import io
+import json
 
-from app.db.models import Project, Project_Pydantic
-from app.services import storage_service, excel_parser, spec_service, project_generator, get_ai_optimizer
+from app.db.models import Project, Project_Pydantic, GenerationRun
+from app.services import storage_service, excel_parser, spec_service, get_ai_optimizer
+from app.services.checkpoint_service import checkpoint_service
+from app.services.job_queue import job_queue
+from app.services.log_sink import log_sink
+from app.services.event_bus import progress_events
+from app.services.status_poller import status_poller
+from app.services.log_reader import log_reader, InvalidCursorError
+from app.config import settings
 from app.utils import build_file_tree, file_reader
 import re
 
@@ -162,6 +171,253 @@ async def get_project(project_id: uuid.UUID):
     return await Project_Pydantic.from_tortoise_orm(project)
 
 
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: uuid.UUID,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    since: Optional[str] = Query(None, description="Last event id received (for clients that cannot send Last-Event-ID)")
+):
+    """
+    Stream live generation progress as server-sent events.
+    
+    Events:
+    - status: {"status", "current_step"} on every status transition
+    - file: {"path", "state", "completed", "total", "succeeded", "failed"}
+    - log: {"step", "message", "timestamp"}
+    
+    A client reconnecting with Last-Event-ID (or ?since=) receives the events
+    it missed; if they are no longer available it gets a fresh status
+    snapshot. Events come from the in-process event bus; when the project's
+    run is not published in this process (e.g. it runs on a dedicated
+    worker), status changes come from the shared status poller, which
+    queries all such projects at once. The stream ends after DONE or FAILED.
+    
+    Args:
+        project_id: UUID of the project
+        last_event_id: Id of the last event received, sent by EventSource
+            on reconnect
+        since: Same as Last-Event-ID, as a query parameter
+    
+    Returns:
+        StreamingResponse of text/event-stream
+    """
+    project = await Project.filter(id=project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project with id {project_id} not found"
+        )
+    
+    final_statuses = ("DONE", "FAILED")
+    
+    def snapshot_event(current: Dict[str, Any]) -> str:
+        """Status snapshot, tagged with the latest event id for resuming."""
+        event_id = progress_events.last_event_id(project_id)
+        payload = json.dumps(current, default=str)
+        return (f"id: {event_id}\n" if event_id else "") + f"event: status\ndata: {payload}\n\n"
+    
+    async def event_stream():
+        # Subscribe before taking the snapshot so no event falls in between
+        with progress_events.subscribe(project_id, last_event_id or since) as subscription:
+            if subscription.replay is None:
+                latest = progress_events.last_event(project_id, "status")
+                # The bus is ahead of the database while status writes are coalesced
+                current = latest.data if latest else {
+                    "status": project.status,
+                    "current_step": project.current_step
+                }
+                yield snapshot_event(current)
+                last_file = progress_events.last_event(project_id, "file")
+                if last_file:
+                    yield last_file.to_sse()
+            else:
+                current = {"status": project.status, "current_step": project.current_step}
+                for event in subscription.replay:
+                    if event.type == "status":
+                        current = event.data
+                    yield event.to_sse()
+            
+            with status_poller.watch(project_id, current):
+                while current.get("status") not in final_statuses:
+                    event = await subscription.get(timeout=settings.sse_keepalive_seconds)
+                    
+                    if subscription.lagged:
+                        # Fell behind: drop the backlog and start over from a snapshot
+                        subscription.resync()
+                        latest = progress_events.last_event(project_id, "status")
+                        if latest:
+                            current = latest.data
+                        yield snapshot_event(current)
+                        continue
+                    
+                    if event is not None:
+                        if event.type == "status":
+                            current = event.data
+                        yield event.to_sse()
+                        continue
+                    
+                    yield ": keepalive\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+class LogEntry(BaseModel):
+    """A generation log line."""
+    id: uuid.UUID
+    step: str
+    message: str
+    timestamp: datetime
+
+
+class LogsPageResponse(BaseModel):
+    """Response model for a page of generation logs."""
+    project_id: uuid.UUID
+    logs: List[LogEntry]
+    next_cursor: Optional[str]
+    has_more: bool
+
+
+@router.get("/{project_id}/logs", response_model=LogsPageResponse)
+async def get_project_logs(
+    project_id: uuid.UUID,
+    since: Optional[str] = Query(None, description="Cursor of the last log line already read"),
+    step: Optional[str] = Query(None, description="Only log lines of this step"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum log lines per page")
+):
+    """
+    Get generation logs, oldest first, a page at a time.
+    
+    Pass `next_cursor` of a page as `since` to get the next one. For tailing,
+    keep polling with the last `next_cursor`: an empty page returns the same
+    cursor. Pages are keyset-paginated on (timestamp, id), so each costs the
+    same however many lines precede it.
+    
+    Args:
+        project_id: UUID of the project
+        since: Cursor to continue after
+        step: Step filter
+        limit: Page size
+    
+    Returns:
+        Page of log lines with the cursor to continue from
+    """
+    if not await Project.filter(id=project_id).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project with id {project_id} not found"
+        )
+    
+    try:
+        page = await log_reader.page(project_id, since=since, step=step, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return LogsPageResponse(
+        project_id=project_id,
+        logs=[LogEntry(**row) for row in page["logs"]],
+        next_cursor=page["next_cursor"],
+        has_more=page["has_more"]
+    )
+
+
+class RunSummary(BaseModel):
+    """Totals of one generation run."""
+    id: uuid.UUID
+    job_id: Optional[uuid.UUID]
+    kind: str
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime]
+    wall_seconds: float
+    queue_wait_seconds: float
+    llm_calls: int
+    cache_hits: int
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class RunReportResponse(RunSummary):
+    """Full report of a generation run."""
+    stages: Dict[str, Dict[str, Any]]
+    files: Dict[str, Dict[str, Any]]
+    llm: Dict[str, Any]
+    models: Dict[str, Dict[str, Any]]
+
+
+RUN_SUMMARY_FIELDS = list(RunSummary.model_fields)
+
+
+@router.get("/{project_id}/runs", response_model=List[RunSummary])
+async def list_project_runs(
+    project_id: uuid.UUID,
+    limit: int = Query(20, ge=1, le=100, description="Maximum runs returned")
+):
+    """
+    List the generation runs of a project, latest first.
+    
+    Args:
+        project_id: UUID of the project
+        limit: Maximum runs returned
+    
+    Returns:
+        Run totals (wall time, queue wait, AI calls, cache hits, tokens)
+    """
+    if not await Project.filter(id=project_id).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project with id {project_id} not found"
+        )
+    
+    rows = await GenerationRun.filter(project_id=project_id).order_by("-started_at").limit(limit).values(
+        *RUN_SUMMARY_FIELDS
+    )
+    return [RunSummary(**row) for row in rows]
+
+
+@router.get("/{project_id}/runs/{run_id}", response_model=RunReportResponse)
+async def get_project_run(project_id: uuid.UUID, run_id: uuid.UUID):
+    """
+    Get the report of a generation run: wall time per stage, per file the
+    model, time spent, slot queue wait, AI calls, cache hits and tokens, and
+    AI usage per model.
+    
+    Stages may nest (e.g. "db.checkpoint" writes happen during "files"), so
+    their times do not add up to the run's wall time.
+    
+    Args:
+        project_id: UUID of the project
+        run_id: UUID of the run
+    
+    Returns:
+        Run totals with per-stage, per-file and per-model breakdowns
+    """
+    run = await GenerationRun.filter(id=run_id, project_id=project_id).first()
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Run {run_id} of project {project_id} not found"
+        )
+    
+    report = run.report or {}
+    return RunReportResponse(
+        **{name: getattr(run, name) for name in RUN_SUMMARY_FIELDS},
+        stages=report.get("stages", {}),
+        files=report.get("files", {}),
+        llm=report.get("llm", {}),
+        models=report.get("models", {})
+    )
+
+
 class UploadSpecsResponse(BaseModel):
     """Response model for spec upload."""
     project_id: uuid.UUID
@@ -198,8 +454,7 @@ async def upload_specs(
         Upload status and list of processed files
     """
     # Validate project exists
-    project = await Project.filter(id=project_id).first()
-    if not project:
+    if not await Project.filter(id=project_id).exists():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Project with id {project_id} not found"
@@ -222,9 +477,10 @@ async def upload_specs(
     
     try:
         # Update project status to PARSING
-        project.status = "PARSING"
-        project.current_step = "Parsing Excel specs"
-        await project.save()
+        await Project.filter(id=project_id).update(
+            status="PARSING",
+            current_step="Parsing Excel specs"
+        )
         
         # Save uploaded files
         saved_paths = {}
@@ -236,12 +492,13 @@ async def upload_specs(
                 saved_paths[filename] = file_path
                 uploaded_files.append(filename)
         
-        # Parse Excel files
+        # Parse Excel files (None keeps the previously uploaded spec for
+        # categories that were not re-uploaded)
         parsed_data = {
-            "features": {},
-            "apis": {},
-            "database": {},
-            "tech_stack": {}
+            "features": None,
+            "apis": None,
+            "database": None,
+            "tech_stack": None
         }
         
         if "features.xlsx" in saved_paths:
@@ -274,22 +531,21 @@ async def upload_specs(
         )
         
         # Update project status to PARSED (or back to PENDING)
-        project.status = "PENDING"  # Or use "PARSED" if you prefer
-        project.current_step = None
-        await project.save()
+        await Project.filter(id=project_id).update(status="PENDING", current_step=None)
         
         return UploadSpecsResponse(
             project_id=project_id,
-            status=project.status,
+            status="PENDING",
             message="Excel specifications uploaded and parsed successfully",
             uploaded_files=uploaded_files
         )
     
     except Exception as e:
         # Rollback status on error
-        project.status = "FAILED"
-        project.current_step = f"Error: {str(e)}"
-        await project.save()
+        await Project.filter(id=project_id).update(
+            status="FAILED",
+            current_step=f"Error: {str(e)}"
+        )
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -304,18 +560,41 @@ class GenerateProjectResponse(BaseModel):
     status: str
 
 
+async def queue_generation(project_id: uuid.UUID, kind: str, options: Dict[str, Any]) -> None:
+    """
+    Mark a project as queued and enqueue its run in one transaction.
+    Only the status columns are written, and the job becomes visible to
+    workers together with them, so a worker that claims and finishes the
+    run quickly is never overwritten with GENERATING afterwards.
+    
+    Args:
+        project_id: UUID of the project
+        kind: Job kind (generate, regenerate, resume)
+        options: Keyword arguments for the generator method
+    """
+    async with in_transaction():
+        await Project.filter(id=project_id).update(
+            status="GENERATING",
+            current_step="Queued for generation"
+        )
+        await job_queue.enqueue(project_id, kind, options)
+
+
 @router.post("/{project_id}/generate", response_model=GenerateProjectResponse)
 async def generate_project(
     project_id: uuid.UUID,
-    background_tasks: BackgroundTasks
+    use_cache: bool = True,
+    force_replan: bool = False
 ):
     """
     Generate project files from specifications.
-    Runs generation as a background task.
+    Queues generation for a worker.
     
     Args:
         project_id: UUID of the project
-        background_tasks: FastAPI background tasks
+        use_cache: Set to false to bypass cached AI responses
+        force_replan: Set to true to plan a new blueprint even if one is
+            memoized for unchanged specs
         
     Returns:
         Confirmation that generation has started
@@ -351,10 +630,11 @@ async def generate_project(
         )
     
     try:
-        # Add generation task to background
-        background_tasks.add_task(
-            project_generator.generate_project,
-            project_id
+        # Hand the run to a generation worker
+        await queue_generation(
+            project_id,
+            "generate",
+            {"use_cache": use_cache, "force_replan": force_replan}
         )
         
         return GenerateProjectResponse(
@@ -370,6 +650,126 @@ async def generate_project(
         )
 
 
+@router.post("/{project_id}/regenerate", response_model=GenerateProjectResponse)
+async def regenerate_project(
+    project_id: uuid.UUID,
+    use_cache: bool = True
+):
+    """
+    Regenerate only the files affected by spec changes since the last
+    successful generation. Upload the changed Excel files first.
+    Queues regeneration for a worker.
+    
+    Args:
+        project_id: UUID of the project
+        use_cache: Set to false to bypass cached AI responses
+    
+    Returns:
+        Confirmation that regeneration has started
+    """
+    # Validate project exists
+    project = await Project.filter(id=project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project with id {project_id} not found"
+        )
+    
+    from app.db.models import ProjectSpec
+    spec = await ProjectSpec.filter(project_id=project_id).first()
+    if not spec:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Project specifications not found. Please upload Excel files first."
+        )
+    
+    if not spec.generated_snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Project has not been generated yet. Use /generate first."
+        )
+    
+    if project.status in ("GENERATING", "PARSING"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Project is busy. Current status: {project.status}"
+        )
+    
+    try:
+        # Hand the run to a generation worker
+        await queue_generation(project_id, "regenerate", {"use_cache": use_cache})
+        
+        return GenerateProjectResponse(
+            message="Project regeneration started",
+            project_id=project_id,
+            status="GENERATING"
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start project regeneration: {str(e)}"
+        )
+
+
+@router.post("/{project_id}/resume", response_model=GenerateProjectResponse)
+async def resume_project(
+    project_id: uuid.UUID,
+    use_cache: bool = True
+):
+    """
+    Resume a failed or interrupted generation from its checkpoint.
+    Files already generated and unchanged on disk are skipped.
+    Queues the remaining generation for a worker.
+    
+    Args:
+        project_id: UUID of the project
+        use_cache: Set to false to bypass cached AI responses
+    
+    Returns:
+        Confirmation that generation has resumed
+    """
+    # Validate project exists
+    project = await Project.filter(id=project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project with id {project_id} not found"
+        )
+    
+    from app.db.models import ProjectSpec
+    spec = await ProjectSpec.filter(project_id=project_id).first()
+    if not spec or not spec.blueprint_json:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No generation checkpoint found. Use /generate first."
+        )
+    
+    # A GENERATING project without a queued or live job was interrupted
+    interrupted = project.status == "GENERATING" and not await job_queue.has_active_job(project_id)
+    if project.status != "FAILED" and not interrupted:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Only failed or interrupted generations can be resumed. Current status: {project.status}"
+        )
+    
+    try:
+        # Hand the run to a generation worker
+        await queue_generation(project_id, "resume", {"use_cache": use_cache})
+        
+        return GenerateProjectResponse(
+            message="Project generation resumed",
+            project_id=project_id,
+            status="GENERATING"
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to resume project generation: {str(e)}"
+        )
+
+
 @router.get("/{project_id}/files")
 async def get_project_files(project_id: uuid.UUID) -> List[Dict[str, Any]]:
     """
@@ -471,6 +871,7 @@ class OptimizeFilesRequest(BaseModel):
     """Request model for file optimization."""
     files: List[str] = Field(..., description="List of file paths to optimize")
     custom_instructions: Optional[str] = Field(default="", description="Optional custom optimization instructions from user")
+    use_cache: bool = Field(default=True, description="Set to false to bypass cached AI responses")
 
 
 class OptimizedFileResult(BaseModel):
@@ -521,7 +922,7 @@ async def optimize_project_files(
     results = []
     
     # Import models for optimization tracking
-    from app.db.models import ProjectFile, GenerationLog
+    from app.db.models import ProjectFile
     
     for file_path in request.files:
         try:
@@ -577,16 +978,16 @@ Code:
 Return ONLY the optimized code without explanations."""
             
             # Log optimization start
-            await GenerationLog.create(
-                project_id=project_id,
-                step="optimization",
-                message=f"Starting AI optimization for {file_path}" + (f" with custom instructions: {request.custom_instructions[:50]}..." if request.custom_instructions else "")
+            await log_sink.log(
+                project_id,
+                "optimization",
+                f"Starting AI optimization for {file_path}" + (f" with custom instructions: {request.custom_instructions[:50]}..." if request.custom_instructions else "")
             )
             
             # Call AI optimizer
             try:
                 ai_optimizer = get_ai_optimizer()
-                optimized_content = await ai_optimizer.optimize_code(prompt)
+                optimized_content = await ai_optimizer.optimize_code(prompt, use_cache=request.use_cache)
                 
                 # Detect if language has changed based on content
                 detected_language = detect_language_from_code(optimized_content)
@@ -623,10 +1024,10 @@ Return ONLY the optimized code without explanations."""
                         old_full_path.unlink()
                         file_was_renamed = True
                         
-                        await GenerationLog.create(
-                            project_id=project_id,
-                            step="optimization",
-                            message=f"Renamed {file_path} to {new_file_path} (detected language: {detected_language})"
+                        await log_sink.log(
+                            project_id,
+                            "optimization",
+                            f"Renamed {file_path} to {new_file_path} (detected language: {detected_language})"
                         )
                 else:
                     # Write optimized content back to same file
@@ -651,8 +1052,13 @@ Return ONLY the optimized code without explanations."""
                 ).first()
                 
                 if project_file:
-                    project_file.is_optimized = True
-                    await project_file.save()
+                    changes = {"is_optimized": True}
+                    if project_file.status == "DONE":
+                        # Keep the generation checkpoint valid for resume
+                        changes["content_hash"] = checkpoint_service.content_hash(
+                            optimized_content.encode('utf-8')
+                        )
+                    await ProjectFile.filter(id=project_file.id).update(**changes)
                 else:
                     # Determine file type from path
                     if "backend" in final_path:
@@ -672,10 +1078,10 @@ Return ONLY the optimized code without explanations."""
                     )
                 
                 # Log success
-                await GenerationLog.create(
-                    project_id=project_id,
-                    step="optimization",
-                    message=f"Successfully optimized {final_path}"
+                await log_sink.log(
+                    project_id,
+                    "optimization",
+                    f"Successfully optimized {final_path}"
                 )
                 
                 results.append(OptimizedFileResult(
@@ -688,10 +1094,10 @@ Return ONLY the optimized code without explanations."""
                 error_message = f"AI optimization failed: {str(ai_error)}"
                 
                 # Log failure
-                await GenerationLog.create(
-                    project_id=project_id,
-                    step="optimization_error",
-                    message=f"Failed to optimize {file_path}: {error_message}"
+                await log_sink.log(
+                    project_id,
+                    "optimization_error",
+                    f"Failed to optimize {file_path}: {error_message}"
                 )
                 
                 results.append(OptimizedFileResult(
@@ -707,6 +1113,12 @@ Return ONLY the optimized code without explanations."""
                 message=f"Unexpected error: {str(e)}"
             ))
     
+    # Write the request's log lines in one INSERT before responding
+    try:
+        await log_sink.flush(project_id)
+    except Exception as e:
+        print(f"Failed to flush optimization logs: {e}")
+    
     return OptimizeFilesResponse(
         project_id=project_id,
         optimized=results
@@ -2,121 +2,207 @@
 AI-powered code generation service using Groq API.
 Generates actual code files based on specifications.
 """
-import httpx
+from contextlib import aclosing
+from pathlib import Path
+import time
 from typing import Dict, Any, Optional
 from app.config import settings
+from app.services.groq_client import groq_client
+from app.services.model_router import model_router
+from app.services.prompt_context import FilePromptSections
+from app.utils.streaming import FenceStripper, StreamingFileWriter
+from app.utils.multi_file import FILE_START, FILE_END, split_multi_file_output
+from app.services.run_metrics import add_stage
+
+
+SYSTEM_PROMPT = """You are a senior software engineer writing production code.
+
+CRITICAL RULES:
+1. Return ONLY the code - NO explanations, NO markdown
+2. NO code block markers (no ```python, ```typescript, etc.)
+3. NO comments explaining what you did
+4. Just pure, raw, executable code
+5. Code must be production-ready, not a placeholder
+6. Follow best practices for the language/framework
+7. Include necessary imports and proper structure
+8. Match the specifications EXACTLY
+
+Your response should start with the first line of code and end with the last line of code."""
+
+
+BATCH_SYSTEM_PROMPT = f"""You are a senior software engineer writing production code.
+You generate several small project files in one response.
+
+CRITICAL RULES:
+1. Output EVERY requested file, in the requested order, and nothing else
+2. Wrap each file exactly like this, with the markers on their own lines:
+{FILE_START.format(path="<path as given>")}
+<file content>
+{FILE_END}
+3. NO explanations and NO markdown code block markers
+4. File content must be complete and production-ready, not a placeholder
+5. Match the specifications EXACTLY"""
 
 
 class AICodeGenerator:
     """Generates actual code for project files using AI."""
     
-    GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-    
     def __init__(self):
-        """Initialize HTTP client."""
+        """Validate Groq configuration."""
         if not settings.groq_api_key:
             raise ValueError(
                 "GROQ_API_KEY is not configured. Please set GROQ_API_KEY in your .env file."
             )
-        self.api_key = settings.groq_api_key
-        self.model = settings.groq_model
     
-    async def generate_file_code(
+    async def stream_file_code(
         self,
+        destination: Path,
         file_path: str,
         file_purpose: str,
         project_name: str,
         framework: str,
-        features_json: Dict[str, Any],
-        apis_json: Dict[str, Any],
-        database_json: Dict[str, Any],
-        tech_stack_json: Dict[str, Any],
-        related_files: Optional[Dict[str, str]] = None
+        sections: FilePromptSections,
+        dependency_outputs: Optional[Dict[str, str]] = None,
+        use_cache: bool = True
     ) -> str:
         """
-        Generate code for a specific file.
+        Generate code for a specific file, streaming it to disk as it is
+        produced. Content goes to `<destination>.partial` and is renamed to
+        `destination` once complete; on failure the partial file is removed
+        and any previous version of the file is left untouched.
         
         Args:
-            file_path: Path of the file to generate (e.g., "src/App.tsx")
+            destination: Absolute path the file is written to
+            file_path: Path of the file within its section
             file_purpose: Purpose description from blueprint
             project_name: Name of the project
-            framework: Framework being used (e.g., "React", "FastAPI")
-            features_json: Features from specs
-            apis_json: API definitions from specs
-            database_json: Database schema from specs
-            tech_stack_json: Tech stack details from specs
-            related_files: Dict of related file paths and their purposes
+            framework: Framework being used
+            sections: Pre-serialized spec slices and related files of this
+                file, from the run's PromptContext
+            dependency_outputs: Dict of already generated prerequisite files
+                and their code
+            use_cache: Whether a cached response for an identical prompt may be used
             
         Returns:
-            Generated code as string
+            SHA-256 of the written content
         """
-        prompt = self._build_code_generation_prompt(
+        payload = self._build_payload(
             file_path,
             file_purpose,
             project_name,
             framework,
-            features_json,
-            apis_json,
-            database_json,
-            tech_stack_json,
-            related_files
+            sections,
+            dependency_outputs
         )
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        stripper = FenceStripper()
+        writer = StreamingFileWriter(destination)
+        # Time spent writing to disk, as opposed to waiting for the model
+        write_seconds = 0.0
+        try:
+            stream = groq_client.stream_chat_completion(payload, timeout=90.0, use_cache=use_cache)
+            async with aclosing(stream):
+                async for delta in stream:
+                    started = time.perf_counter()
+                    writer.write(stripper.feed(delta))
+                    write_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            writer.write(stripper.finish())
+            content_hash = writer.commit()
+            write_seconds += time.perf_counter() - started
+            return content_hash
+        except BaseException:
+            writer.abort()
+            raise
+        finally:
+            add_stage("fs.write", write_seconds)
+    
+    async def generate_file_batch(
+        self,
+        files: Dict[str, str],
+        project_name: str,
+        framework: str,
+        sections: FilePromptSections,
+        dependency_outputs: Optional[Dict[str, str]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, str]:
+        """
+        Generate several small files of one section with a single completion.
+        The files are returned in the delimited multi-file format and split
+        apart; files missing from the output are left out of the result.
         
+        Args:
+            files: Dict of file path (within the section) to purpose
+            project_name: Name of the project
+            framework: Framework of the section
+            sections: Spec sections shared by the files (only the summary,
+                tech stack and related files are used)
+            dependency_outputs: Dict of already generated prerequisite files
+                and their code
+            use_cache: Whether a cached response for an identical prompt may be used
+            
+        Returns:
+            Dict of file path to content, fences stripped, unvalidated
+        """
         payload = {
-            "model": self.model,
+            "model": model_router.route_batch(files, framework, sections.tech_stack),
             "messages": [
                 {
                     "role": "system",
-                    "content": """You are a senior software engineer writing production code.
-
-CRITICAL RULES:
-1. Return ONLY the code - NO explanations, NO markdown
-2. NO code block markers (no ```python, ```typescript, etc.)
-3. NO comments explaining what you did
-4. Just pure, raw, executable code
-5. Code must be production-ready, not a placeholder
-6. Follow best practices for the language/framework
-7. Include necessary imports and proper structure
-8. Match the specifications EXACTLY
-
-Your response should start with the first line of code and end with the last line of code."""
+                    "content": BATCH_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": self._build_batch_prompt(
+                        files,
+                        project_name,
+                        framework,
+                        sections,
+                        dependency_outputs
+                    )
                 }
             ],
             "temperature": 0.2,
             "max_tokens": 4096
         }
+        result = await groq_client.chat_completion(payload, timeout=90.0, use_cache=use_cache)
+        return split_multi_file_output(result["choices"][0]["message"]["content"], files)
+    
+    def _build_payload(
+        self,
+        file_path: str,
+        file_purpose: str,
+        project_name: str,
+        framework: str,
+        sections: FilePromptSections,
+        dependency_outputs: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Build the chat completion payload for a file, on the model routed for its category."""
+        prompt = self._build_code_generation_prompt(
+            file_path,
+            file_purpose,
+            project_name,
+            framework,
+            sections,
+            dependency_outputs
+        )
         
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            response = await client.post(
-                self.GROQ_API_URL,
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            code = result["choices"][0]["message"]["content"].strip()
-            
-            # Clean up any markdown that might have slipped through
-            if code.startswith("```"):
-                # Find the first newline after ```
-                first_newline = code.find("\n")
-                if first_newline != -1:
-                    code = code[first_newline + 1:]
-            if code.endswith("```"):
-                code = code[:-3]
-            
-            code = code.strip()
-            return code
+        model, _ = model_router.route(file_path, framework, sections.tech_stack)
+        return {
+            "model": model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.2,
+            "max_tokens": 4096
+        }
     
     def _build_code_generation_prompt(
         self,
@@ -124,11 +210,8 @@ Your response should start with the first line of code and end with the last lin
         file_purpose: str,
         project_name: str,
         framework: str,
-        features_json: Dict[str, Any],
-        apis_json: Dict[str, Any],
-        database_json: Dict[str, Any],
-        tech_stack_json: Dict[str, Any],
-        related_files: Optional[Dict[str, str]]
+        sections: FilePromptSections,
+        dependency_outputs: Optional[Dict[str, str]] = None
     ) -> str:
         """Build the prompt for code generation."""
         
@@ -148,34 +231,49 @@ FRAMEWORK: {framework}
 
 """
         
-        # Add relevant specs based on file type
+        if sections.summary:
+            prompt += f"""PROJECT SUMMARY (all features, endpoints and tables):
+{sections.summary}
+
+"""
+        
+        # Specs below are sliced to this file when a summary is given
+        empty = "(nothing specific to this file, see PROJECT SUMMARY)" if sections.summary else "(none specified)"
+        
+        # Add relevant specs based on file type (compact JSON)
         if is_backend or is_frontend:
             prompt += f"""FEATURES TO IMPLEMENT:
-{self._format_json_section(features_json)}
+{sections.features or empty}
 
 """
         
         if is_backend or file_path.endswith((".py", ".js", ".ts")):
             prompt += f"""API ENDPOINTS:
-{self._format_json_section(apis_json)}
+{sections.apis or empty}
 
 """
         
         if is_database or is_backend:
             prompt += f"""DATABASE SCHEMA:
-{self._format_json_section(database_json)}
+{sections.database or empty}
 
 """
         
         if is_config or is_readme:
             prompt += f"""TECH STACK:
-{self._format_json_section(tech_stack_json)}
+{sections.tech_stack or "(none specified)"}
 
 """
         
-        if related_files:
+        if sections.related_files:
             prompt += f"""RELATED FILES IN PROJECT:
-{self._format_related_files(related_files)}
+{sections.related_files}
+
+"""
+        
+        if dependency_outputs:
+            prompt += f"""ALREADY GENERATED FILES THIS FILE DEPENDS ON (reuse their exact names, fields and exports):
+{self._format_dependency_outputs(dependency_outputs)}
 
 """
         
@@ -197,19 +295,70 @@ FRAMEWORK: {framework}
         
         return prompt
     
-    def _format_json_section(self, data: Dict[str, Any]) -> str:
-        """Format JSON data for the prompt."""
-        import json
-        if not data:
-            return "(none specified)"
-        return json.dumps(data, indent=2)
+    def _build_batch_prompt(
+        self,
+        files: Dict[str, str],
+        project_name: str,
+        framework: str,
+        sections: FilePromptSections,
+        dependency_outputs: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Build the prompt for a batch of small files."""
+        file_list = "\n".join(f"- {path}: {purpose}" for path, purpose in files.items())
+        prompt = f"""Generate these {len(files)} files:
+{file_list}
+
+PROJECT: {project_name}
+FRAMEWORK: {framework}
+
+"""
+        
+        if sections.summary:
+            prompt += f"""PROJECT SUMMARY (all features, endpoints and tables):
+{sections.summary}
+
+"""
+        
+        prompt += f"""TECH STACK:
+{sections.tech_stack or "(none specified)"}
+
+"""
+        
+        if sections.related_files:
+            prompt += f"""RELATED FILES IN PROJECT:
+{sections.related_files}
+
+"""
+        
+        if dependency_outputs:
+            prompt += f"""ALREADY GENERATED FILES THESE FILES DEPEND ON (reuse their exact names and exports):
+{self._format_dependency_outputs(dependency_outputs)}
+
+"""
+        
+        # One set of instructions per kind of file in the batch
+        instructions = []
+        for path in files:
+            if path.endswith("__init__.py"):
+                text = self._get_package_init_instructions()
+            elif path.lower().endswith(".md"):
+                text = self._get_readme_instructions()
+            else:
+                text = self._get_config_instructions(path)
+            if text not in instructions:
+                instructions.append(text)
+        prompt += "\n".join(instructions)
+        
+        prompt += f"\nGenerate all {len(files)} files now, each wrapped in its markers."
+        
+        return prompt
     
-    def _format_related_files(self, files: Dict[str, str]) -> str:
-        """Format related files list."""
-        lines = []
-        for path, purpose in files.items():
-            lines.append(f"- {path}: {purpose}")
-        return "\n".join(lines) if lines else "(no related files)"
+    def _format_dependency_outputs(self, outputs: Dict[str, str]) -> str:
+        """Format generated prerequisite files."""
+        blocks = []
+        for path, code in outputs.items():
+            blocks.append(f"--- {path} ---\n{code}")
+        return "\n\n".join(blocks)
     
     def _get_backend_instructions(self) -> str:
         """Get instructions for backend files."""
@@ -270,6 +419,14 @@ FRAMEWORK: {framework}
 - Add comments explaining options
 - Use environment variables where appropriate
 - Follow best practices for this config type
+"""
+    
+    def _get_package_init_instructions(self) -> str:
+        """Get instructions for Python package markers."""
+        return """__INIT__.PY INSTRUCTIONS:
+- Re-export the public names of the package's modules if useful
+- Leave the file empty if there is nothing to export
+- Only import names that exist in the generated modules
 """
     
     def _get_readme_instructions(self) -> str:
@@ -3,15 +3,14 @@ AI-powered code optimization service using Groq API via direct HTTP calls.
 """
 import httpx
 from app.config import settings
+from app.services.groq_client import groq_client
 
 
 class AIOptimizerService:
     """Handles AI-powered code optimization using Groq REST API."""
     
-    GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-    
     def __init__(self):
-        """Initialize HTTP client."""
+        """Validate Groq configuration."""
         if not settings.groq_api_key:
             raise ValueError(
                 "GROQ_API_KEY is not configured. Please set GROQ_API_KEY in your .env file to use AI optimization."
@@ -19,21 +18,17 @@ class AIOptimizerService:
         self.api_key = settings.groq_api_key
         self.model = settings.groq_model
     
-    async def optimize_code(self, prompt: str) -> str:
+    async def optimize_code(self, prompt: str, use_cache: bool = True) -> str:
         """
         Optimize code using Groq AI via direct HTTP request.
         
         Args:
             prompt: The prompt containing code to optimize
+            use_cache: Whether a cached response for an identical prompt may be used
             
         Returns:
             Optimized code as plain text
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": [
@@ -50,32 +45,22 @@ class AIOptimizerService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.GROQ_API_URL,
-                    json=payload,
-                    headers=headers,
-                    timeout=60.0
-                )
-                
-                if response.status_code != 200:
-                    error_text = response.text
-                    raise Exception(f"Groq API error (status {response.status_code}): {error_text}")
-                
-                result = response.json()
-                optimized_code = result["choices"][0]["message"]["content"]
-                
-                # Remove markdown code blocks if present
-                if optimized_code.startswith("```"):
-                    lines = optimized_code.split("\n")
-                    if lines[0].startswith("```"):
-                        lines = lines[1:]
-                    if lines and lines[-1].strip() == "```":
-                        lines = lines[:-1]
-                    optimized_code = "\n".join(lines)
-                
-                return optimized_code
+            result = await groq_client.chat_completion(payload, timeout=60.0, use_cache=use_cache, service="optimizer")
+            optimized_code = result["choices"][0]["message"]["content"]
+            
+            # Remove markdown code blocks if present
+            if optimized_code.startswith("```"):
+                lines = optimized_code.split("\n")
+                if lines[0].startswith("```"):
+                    lines = lines[1:]
+                if lines and lines[-1].strip() == "```":
+                    lines = lines[:-1]
+                optimized_code = "\n".join(lines)
+            
+            return optimized_code
         
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Groq API error (status {e.response.status_code}): {e.response.text}")
         except httpx.HTTPError as e:
             raise Exception(f"HTTP request failed: {str(e)}")
         except KeyError as e:
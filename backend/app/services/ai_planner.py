@@ -2,19 +2,17 @@
 AI-powered project planning service using Groq API.
 Generates project blueprints from specifications.
 """
-import httpx
 import json
 from typing import Dict, Any
 from app.config import settings
+from app.services.groq_client import groq_client
 
 
 class AIProjectPlanner:
     """Generates project blueprints using AI based on specifications."""
     
-    GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-    
     def __init__(self):
-        """Initialize HTTP client."""
+        """Validate Groq configuration."""
         if not settings.groq_api_key:
             raise ValueError(
                 "GROQ_API_KEY is not configured. Please set GROQ_API_KEY in your .env file."
@@ -29,7 +27,9 @@ class AIProjectPlanner:
         features_json: Dict[str, Any],
         apis_json: Dict[str, Any],
         database_json: Dict[str, Any],
-        tech_stack_json: Dict[str, Any]
+        tech_stack_json: Dict[str, Any],
+        use_cache: bool = True,
+        fallback_on_error: bool = True
     ) -> Dict[str, Any]:
         """
         Generate a project blueprint using AI.
@@ -41,6 +41,9 @@ class AIProjectPlanner:
             apis_json: API definitions from Excel
             database_json: Database schema from Excel
             tech_stack_json: Tech stack details from Excel
+            use_cache: Whether a cached response for an identical prompt may be used
+            fallback_on_error: Return a minimal fallback blueprint when the AI
+                response is not valid JSON; if False, raise ValueError instead
             
         Returns:
             Blueprint dict with structure:
@@ -78,11 +81,6 @@ class AIProjectPlanner:
             tech_stack_json
         )
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": [
@@ -132,35 +130,29 @@ Your output must be parseable by json.loads(). Start with { and end with }."""
             "max_tokens": 4096
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                self.GROQ_API_URL,
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            ai_response = result["choices"][0]["message"]["content"].strip()
-            
-            # Clean up potential markdown formatting
-            if ai_response.startswith("```json"):
-                ai_response = ai_response[7:]
-            if ai_response.startswith("```"):
-                ai_response = ai_response[3:]
-            if ai_response.endswith("```"):
-                ai_response = ai_response[:-3]
-            ai_response = ai_response.strip()
-            
-            # Parse JSON
-            try:
-                blueprint = json.loads(ai_response)
-                return blueprint
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse blueprint JSON: {e}")
-                print(f"AI Response: {ai_response[:500]}")
-                # Return minimal fallback blueprint
-                return self._get_fallback_blueprint(tech_stack)
+        result = await groq_client.chat_completion(payload, timeout=60.0, use_cache=use_cache, service="planner")
+        ai_response = result["choices"][0]["message"]["content"].strip()
+        
+        # Clean up potential markdown formatting
+        if ai_response.startswith("```json"):
+            ai_response = ai_response[7:]
+        if ai_response.startswith("```"):
+            ai_response = ai_response[3:]
+        if ai_response.endswith("```"):
+            ai_response = ai_response[:-3]
+        ai_response = ai_response.strip()
+        
+        # Parse JSON
+        try:
+            blueprint = json.loads(ai_response)
+            return blueprint
+        except json.JSONDecodeError as e:
+            print(f"Failed to parse blueprint JSON: {e}")
+            print(f"AI Response: {ai_response[:500]}")
+            if not fallback_on_error:
+                raise ValueError(f"AI returned an invalid blueprint: {e}")
+            # Return minimal fallback blueprint
+            return self._get_fallback_blueprint(tech_stack)
     
     def _build_blueprint_prompt(
         self,
@@ -0,0 +1,273 @@
+"""
+Dependency graph for blueprint files.
+Turns the flat planner blueprint into a DAG (models -> schemas -> routes -> main)
+and schedules generation so independent files run in parallel while dependents
+wait for the files they build on.
+"""
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Dict, Any, List, Set, Callable, Awaitable, Optional
+import asyncio
+import re
+
+
+@dataclass
+class FileJob:
+    """A single blueprint file scheduled for generation."""
+    
+    section_name: str
+    framework: str
+    file_path: str
+    file_purpose: str
+    section_files: Dict[str, str]
+    depends_on: Set[str] = field(default_factory=set)
+    dependents: Set[str] = field(default_factory=set)
+    
+    @property
+    def key(self) -> str:
+        """Path of the file relative to the project root; unique per graph."""
+        if self.section_name == "root":
+            return self.file_path
+        return f"{self.section_name}/{self.file_path}"
+
+
+class BlueprintGraph:
+    """Dependency graph over the files of a blueprint."""
+    
+    # Order in which blueprint sections are scheduled
+    SECTION_ORDER = ("frontend", "backend", "database", "root")
+    
+    # Layers within a section, lowest first. A file depends on files of the
+    # nearest lower layer present in its section. Files matching no layer
+    # (config, docs, assets) are independent leaves.
+    LAYERS = (
+        ("core", ("config", "settings", "database", "db", "core", "utils", "util", "helpers", "constants", "lib")),
+        ("models", ("models", "model", "entities", "entity")),
+        ("schemas", ("schemas", "schema", "dto", "dtos", "serializers", "types", "interfaces")),
+        ("services", ("services", "service", "crud", "repositories", "repository", "api", "hooks", "store", "context")),
+        ("routes", ("routes", "route", "routers", "router", "controllers", "controller", "endpoints", "components")),
+        ("pages", ("pages", "page", "views", "view", "screens")),
+        ("entry", ("main", "app", "index", "server", "__main__", "wsgi", "asgi")),
+    )
+    
+    # Extensions of files that are generated from code context; anything
+    # else (json, yaml, md, env, ...) is treated as an independent leaf.
+    CODE_EXTENSIONS = (".py", ".ts", ".tsx", ".js", ".jsx", ".java", ".go", ".cs", ".rb", ".php", ".kt", ".rs")
+    
+    def __init__(self, blueprint: Dict[str, Any]):
+        """
+        Build the graph from a planner blueprint.
+        
+        Args:
+            blueprint: Blueprint returned by the AI planner
+        """
+        self.nodes: Dict[str, FileJob] = {}
+        self._layers: Dict[str, Optional[int]] = {}
+        
+        for section_name in self.SECTION_ORDER:
+            section_data = blueprint.get(section_name)
+            if not isinstance(section_data, dict):
+                continue
+            files = section_data.get("files", {})
+            framework = section_data.get("framework", "Unknown")
+            for file_path, file_purpose in files.items():
+                job = FileJob(
+                    section_name=section_name,
+                    framework=framework,
+                    file_path=file_path,
+                    file_purpose=file_purpose,
+                    section_files=files
+                )
+                self.nodes[job.key] = job
+                self._layers[job.key] = self._classify_layer(file_path)
+        
+        self._link_sections()
+    
+    def __len__(self) -> int:
+        return len(self.nodes)
+    
+    def layer_name(self, key: str) -> Optional[str]:
+        """Return the layer name of a file ("models", "routes", ...) or None for leaves."""
+        layer = self._layers.get(key)
+        return self.LAYERS[layer][0] if layer is not None else None
+    
+    def _classify_layer(self, file_path: str) -> Optional[int]:
+        """Return the layer index for a file, or None for independent leaves."""
+        path = PurePosixPath(file_path.lower())
+        if path.suffix not in self.CODE_EXTENSIONS:
+            return None
+        
+        stem = path.stem
+        
+        # The file name is the strongest signal (e.g. "main.py", "user_model.py")
+        for index in reversed(range(len(self.LAYERS))):
+            _, keywords = self.LAYERS[index]
+            if stem in keywords:
+                return index
+        for index in reversed(range(len(self.LAYERS))):
+            _, keywords = self.LAYERS[index]
+            if any(part in keywords for part in re.split(r"[_.\-]", stem)):
+                return index
+        # Fall back to the innermost directory that names a layer
+        for part in reversed(path.parts[:-1]):
+            for index, (_, keywords) in enumerate(self.LAYERS):
+                if part in keywords:
+                    return index
+        return None
+    
+    def _add_edge(self, prerequisite: str, dependent: str) -> None:
+        self.nodes[dependent].depends_on.add(prerequisite)
+        self.nodes[prerequisite].dependents.add(dependent)
+    
+    def _link_sections(self) -> None:
+        """Add dependency edges within and across sections."""
+        for section_name in self.SECTION_ORDER:
+            by_layer: Dict[int, List[str]] = {}
+            for key, job in self.nodes.items():
+                layer = self._layers[key]
+                if job.section_name == section_name and layer is not None:
+                    by_layer.setdefault(layer, []).append(key)
+            
+            present = sorted(by_layer)
+            for lower, upper in zip(present, present[1:]):
+                for dependent in by_layer[upper]:
+                    for prerequisite in self._match_prerequisites(dependent, by_layer[lower]):
+                        self._add_edge(prerequisite, dependent)
+        
+        # Backend models follow the database schema, frontend API clients
+        # follow the backend routes they call.
+        self._link_across("database", None, "backend", "models")
+        self._link_across("backend", "routes", "frontend", "services")
+    
+    def _link_across(
+        self,
+        source_section: str,
+        source_layer: Optional[str],
+        target_section: str,
+        target_layer: str
+    ) -> None:
+        """Make every file of a target layer depend on a source layer."""
+        layer_names = [name for name, _ in self.LAYERS]
+        target_index = layer_names.index(target_layer)
+        source_index = layer_names.index(source_layer) if source_layer else None
+        
+        sources = [
+            key for key, job in self.nodes.items()
+            if job.section_name == source_section
+            and (source_index is None or self._layers[key] == source_index)
+        ]
+        targets = [
+            key for key, job in self.nodes.items()
+            if job.section_name == target_section and self._layers[key] == target_index
+        ]
+        for dependent in targets:
+            for prerequisite in sources:
+                self._add_edge(prerequisite, dependent)
+    
+    def _match_prerequisites(self, dependent: str, candidates: List[str]) -> List[str]:
+        """
+        Pick the prerequisites of a file from the layer below it.
+        Prefers files about the same resource (routes/users.py -> schemas/user.py)
+        and falls back to the whole layer when nothing matches by name.
+        """
+        dependent_terms = self._resource_terms(dependent)
+        matched = [
+            candidate for candidate in candidates
+            if dependent_terms & self._resource_terms(candidate)
+        ]
+        return matched or candidates
+    
+    def _resource_terms(self, key: str) -> Set[str]:
+        """Resource names in a file stem, singularised ("users_router" -> {"user"})."""
+        stem = PurePosixPath(key.lower()).stem
+        layer_words = {word for _, keywords in self.LAYERS for word in keywords}
+        terms = set()
+        for part in re.split(r"[_.\-]", stem):
+            if not part or part in layer_words:
+                continue
+            terms.add(part[:-1] if part.endswith("s") and len(part) > 3 else part)
+        return terms
+
+
+class DagScheduler:
+    """Runs graph nodes as soon as all of their prerequisites have finished."""
+    
+    def __init__(
+        self,
+        graph: BlueprintGraph,
+        run_job: Callable[[FileJob], Awaitable[bool]]
+    ):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            graph: Blueprint dependency graph
+            run_job: Coroutine generating one file; concurrency limits are
+                applied by the caller inside this coroutine
+        """
+        self.graph = graph
+        self.run_job = run_job
+    
+    async def run(self, only: Optional[Set[str]] = None) -> None:
+        """
+        Run every node of the graph, or only the given subset.
+        A failed prerequisite still releases its dependents so a single
+        bad file cannot block the rest of the project.
+        
+        Args:
+            only: Keys to run; prerequisites outside the subset are treated
+                as already finished
+        """
+        selected = set(self.graph.nodes) if only is None else set(only) & set(self.graph.nodes)
+        waiting = {
+            key: len(self.graph.nodes[key].depends_on & selected)
+            for key in self.graph.nodes if key in selected
+        }
+        running: Dict[asyncio.Task, str] = {}
+        
+        def release(key: str) -> None:
+            task = asyncio.create_task(self.run_job(self.graph.nodes[key]))
+            running[task] = key
+        
+        for key, count in waiting.items():
+            if count == 0:
+                release(key)
+        
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key = running.pop(task)
+                    for dependent in self.graph.nodes[key].dependents & selected:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            release(dependent)
+        finally:
+            for task in running:
+                task.cancel()
+
+
+def summarize_generated_code(code: str, max_chars: int = 3000) -> str:
+    """
+    Reduce a generated file to its interface: imports and top-level
+    declarations, which is what dependents need to stay consistent with it.
+    
+    Args:
+        code: Generated file content
+        max_chars: Upper bound on the summary length
+    
+    Returns:
+        Summary text
+    """
+    if len(code) <= max_chars:
+        return code
+    
+    declaration = re.compile(
+        r"^(import |from |class |def |async def |export |interface |type |"
+        r"public |@|[A-Za-z_][A-Za-z0-9_]* *= *[A-Za-z_]*(Router|APIRouter|FastAPI|Blueprint|Base)\b)"
+    )
+    lines = [line.rstrip() for line in code.splitlines() if declaration.match(line)]
+    summary = "\n".join(lines) if lines else code
+    if len(summary) > max_chars:
+        summary = summary[:max_chars] + "\n..."
+    return summary
@@ -0,0 +1,98 @@
+"""
+Blueprint memoization service.
+Reuses a previously generated blueprint when a project's specs, tech stack
+and model are unchanged, skipping the planning round trip.
+"""
+from typing import Dict, Any, Tuple
+from tortoise.exceptions import IntegrityError
+
+from app.db.models import Project, ProjectSpec, Blueprint
+from app.services.ai_planner import get_ai_planner
+from app.services.spec_service import spec_service
+
+
+class BlueprintService:
+    """Looks up, generates and persists blueprints keyed by spec fingerprint."""
+    
+    def __init__(self):
+        """Initialize with the AI planner."""
+        self.ai_planner = get_ai_planner()
+    
+    async def get_blueprint(
+        self,
+        project: Project,
+        spec: ProjectSpec,
+        force_replan: bool = False,
+        use_cache: bool = True
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Get the blueprint for a project, planning it only if needed.
+        
+        Args:
+            project: Project being generated
+            spec: Parsed specifications of the project
+            force_replan: Ignore memoized blueprints and cached AI responses
+            use_cache: Whether a cached AI response may be used when planning
+        
+        Returns:
+            Tuple of (blueprint, reused) where reused is True if the
+            blueprint came from the memo table
+        """
+        fingerprint = spec.fingerprint
+        if not fingerprint:
+            # Specs stored before fingerprints existed
+            fingerprint = spec_service.fingerprint_of(spec)
+            spec.fingerprint = fingerprint
+            await spec.save(update_fields=["fingerprint"])
+        
+        model = self.ai_planner.model
+        
+        if not force_replan:
+            memoized = await Blueprint.filter(
+                fingerprint=fingerprint,
+                tech_stack=project.tech_stack,
+                model=model
+            ).first()
+            if memoized:
+                return memoized.blueprint_json, True
+        
+        try:
+            blueprint = await self.ai_planner.generate_blueprint(
+                project_name=project.name,
+                tech_stack=project.tech_stack,
+                features_json=spec.features_json or {},
+                apis_json=spec.apis_json or {},
+                database_json=spec.database_json or {},
+                tech_stack_json=spec.tech_stack_json or {},
+                use_cache=use_cache and not force_replan,
+                fallback_on_error=False
+            )
+        except ValueError:
+            # Never memoize the fallback blueprint
+            return self.ai_planner._get_fallback_blueprint(project.tech_stack), False
+        
+        await self._save(fingerprint, project.tech_stack, model, blueprint)
+        return blueprint, False
+    
+    async def _save(
+        self,
+        fingerprint: str,
+        tech_stack: str,
+        model: str,
+        blueprint: Dict[str, Any]
+    ) -> None:
+        """Persist a blueprint, replacing any previous one for the same key."""
+        try:
+            await Blueprint.update_or_create(
+                defaults={"blueprint_json": blueprint},
+                fingerprint=fingerprint,
+                tech_stack=tech_stack,
+                model=model
+            )
+        except IntegrityError:
+            # Another project with the same specs saved it concurrently
+            pass
+
+
+# Global blueprint service instance
+blueprint_service = BlueprintService()
@@ -0,0 +1,161 @@
+"""
+Generation checkpoint service.
+Persists the completion state of every blueprint file as generation proceeds,
+so an interrupted run can resume where it stopped.
+"""
+from pathlib import Path
+from typing import Iterable, Optional, Set
+import asyncio
+import hashlib
+import uuid
+
+from app.db.models import ProjectFile
+from app.services.blueprint_graph import BlueprintGraph
+
+
+class CheckpointService:
+    """Tracks per-file generation state in ProjectFile rows."""
+    
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """
+        Hash file content.
+        
+        Args:
+            data: File content as written to disk
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        return hashlib.sha256(data).hexdigest()
+    
+    @staticmethod
+    def _file_type(section_name: str, file_path: str) -> str:
+        """File type for a blueprint file (see ProjectFile.file_type)."""
+        if section_name != "root":
+            return section_name
+        return "docs" if file_path.lower().endswith(".md") else "config"
+    
+    @staticmethod
+    async def start_run(
+        project_id: uuid.UUID,
+        graph: BlueprintGraph,
+        reset: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Record the files of a run before generating them.
+        
+        Args:
+            project_id: UUID of the project
+            graph: Blueprint graph of the run
+            reset: Files to mark as pending (all blueprint files if None)
+        """
+        existing = set(
+            await ProjectFile.filter(project_id=project_id).values_list("path", flat=True)
+        )
+        missing = [
+            ProjectFile(
+                project_id=project_id,
+                path=key,
+                file_type=CheckpointService._file_type(job.section_name, job.file_path),
+                status="PENDING"
+            )
+            for key, job in graph.nodes.items()
+            if key not in existing
+        ]
+        if missing:
+            await ProjectFile.bulk_create(missing)
+        
+        reset_paths = list(graph.nodes) if reset is None else list(reset)
+        if reset_paths:
+            await ProjectFile.filter(
+                project_id=project_id,
+                path__in=reset_paths
+            ).update(status="PENDING", content_hash=None)
+    
+    @staticmethod
+    async def mark_done(project_id: uuid.UUID, path: str, content_hash: str) -> None:
+        """
+        Record a file as generated.
+        
+        Args:
+            project_id: UUID of the project
+            path: File path relative to the project root
+            content_hash: Hash of the content written to disk
+        """
+        await ProjectFile.filter(project_id=project_id, path=path).update(
+            status="DONE",
+            content_hash=content_hash
+        )
+    
+    @staticmethod
+    async def mark_failed(project_id: uuid.UUID, path: str) -> None:
+        """
+        Record a file as failed.
+        
+        Args:
+            project_id: UUID of the project
+            path: File path relative to the project root
+        """
+        await ProjectFile.filter(project_id=project_id, path=path).update(
+            status="FAILED",
+            content_hash=None
+        )
+    
+    @staticmethod
+    async def forget_files(project_id: uuid.UUID, project_path: Path, paths: Iterable[str]) -> None:
+        """
+        Delete files that are no longer part of the blueprint, on disk and
+        in the checkpoint.
+        
+        Args:
+            project_id: UUID of the project
+            project_path: Project directory
+            paths: File paths relative to the project root
+        """
+        paths = list(paths)
+        if not paths:
+            return
+        
+        def remove() -> None:
+            for path in paths:
+                (project_path / path).unlink(missing_ok=True)
+        
+        await asyncio.to_thread(remove)
+        await ProjectFile.filter(project_id=project_id, path__in=paths).delete()
+    
+    @staticmethod
+    async def verified_files(project_id: uuid.UUID, project_path: Path) -> Set[str]:
+        """
+        Get the files recorded as generated whose content on disk still
+        matches the recorded hash.
+        
+        Args:
+            project_id: UUID of the project
+            project_path: Project directory
+        
+        Returns:
+            Set of file paths relative to the project root
+        """
+        recorded = await ProjectFile.filter(
+            project_id=project_id,
+            status="DONE",
+            content_hash__isnull=False
+        ).values_list("path", "content_hash")
+        
+        def verify() -> Set[str]:
+            verified = set()
+            for path, expected in recorded:
+                try:
+                    data = (project_path / path).read_bytes()
+                except OSError:
+                    continue
+                if CheckpointService.content_hash(data) == expected:
+                    verified.add(path)
+            return verified
+        
+        return await asyncio.to_thread(verify)
+
+
+# Global checkpoint service instance
+checkpoint_service = CheckpointService()
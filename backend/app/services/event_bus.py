@@ -0,0 +1,276 @@
+"""
+In-process event bus for live generation progress.
+The generator publishes status transitions, per-file progress and log lines
+per project; SSE subscribers receive them without touching the database.
+A short per-project history lets reconnecting clients resume from the last
+event they saw.
+"""
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+import asyncio
+import json
+import time
+import uuid
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """One progress event of a project."""
+    
+    id: str
+    type: str  # status | file | log
+    data: Dict[str, Any]
+    
+    def to_sse(self) -> str:
+        """Encode as a server-sent event."""
+        payload = json.dumps(self.data, ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+@dataclass
+class _Channel:
+    """Events and subscribers of one project."""
+    
+    history: Deque[ProgressEvent]
+    sequence: int = 0
+    subscribers: Set["Subscription"] = field(default_factory=set)
+    # A run is publishing to this channel in this process
+    active: bool = False
+
+
+class Subscription:
+    """Queue of events delivered to one subscriber."""
+    
+    def __init__(self, bus: "ProgressEventBus", project_id: uuid.UUID, replay: Optional[List[ProgressEvent]]):
+        """
+        Create a subscription; use ProgressEventBus.subscribe().
+        
+        Args:
+            bus: Bus the subscription belongs to
+            project_id: Project subscribed to
+            replay: Events missed since the client's last event, or None if
+                the client has to start from a fresh snapshot
+        """
+        self.bus = bus
+        self.project_id = project_id
+        self.replay = replay
+        # Set when the subscriber fell too far behind and events were dropped
+        self.lagged = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=bus.queue_size)
+    
+    def _deliver(self, event: ProgressEvent) -> None:
+        """Queue an event; a full queue marks the subscription as lagged."""
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+    
+    async def get(self, timeout: float) -> Optional[ProgressEvent]:
+        """
+        Wait for the next event.
+        
+        Args:
+            timeout: Seconds to wait
+        
+        Returns:
+            The event, or None on timeout
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def resync(self) -> None:
+        """Drop queued events after a lag; the caller sends a fresh snapshot."""
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self.lagged = False
+    
+    def __enter__(self) -> "Subscription":
+        """Use as a context manager that unsubscribes on exit."""
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        """Unsubscribe."""
+        self.bus._unsubscribe(self)
+
+
+class ProgressEventBus:
+    """Per-project publish/subscribe of progress events within this process."""
+    
+    def __init__(self, history_size: int = 500, queue_size: int = 1000, max_channels: int = 1000):
+        """
+        Initialize the bus.
+        
+        Args:
+            history_size: Events kept per project for resuming clients
+            queue_size: Events buffered per subscriber before it must resync
+            max_channels: Idle project channels kept before the oldest are dropped
+        """
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.max_channels = max_channels
+        # Event ids are "<boot>-<sequence>"; ids from an earlier process
+        # cannot be resumed and get a fresh snapshot instead
+        self._boot = format(int(time.time() * 1000), "x")
+        self._channels: "OrderedDict[uuid.UUID, _Channel]" = OrderedDict()
+    
+    def _channel(self, project_id: uuid.UUID) -> _Channel:
+        """Get or create the channel of a project."""
+        channel = self._channels.get(project_id)
+        if channel is None:
+            channel = _Channel(history=deque(maxlen=self.history_size))
+            self._channels[project_id] = channel
+            self._evict()
+        else:
+            self._channels.move_to_end(project_id)
+        return channel
+    
+    def _evict(self) -> None:
+        """Drop the least recently used channels nobody listens to or publishes on."""
+        for project_id in list(self._channels):
+            if len(self._channels) <= self.max_channels:
+                return
+            channel = self._channels[project_id]
+            if not channel.subscribers and not channel.active:
+                del self._channels[project_id]
+    
+    def publish(
+        self,
+        project_id: uuid.UUID,
+        type: str,
+        data: Dict[str, Any],
+        remote: bool = False
+    ) -> ProgressEvent:
+        """
+        Publish an event to the subscribers of a project.
+        
+        Args:
+            project_id: UUID of the project
+            type: Event type (status, file, log)
+            data: JSON-compatible payload
+            remote: The event was observed from a run on another process
+                (see status_poller); it does not mark a run as publishing here
+        
+        Returns:
+            The published event
+        """
+        channel = self._channel(project_id)
+        channel.sequence += 1
+        event = ProgressEvent(id=f"{self._boot}-{channel.sequence}", type=type, data=data)
+        channel.history.append(event)
+        if type == "status" and not remote:
+            channel.active = data.get("status") not in ("DONE", "FAILED")
+        for subscription in channel.subscribers:
+            subscription._deliver(event)
+        return event
+    
+    def subscribe(self, project_id: uuid.UUID, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Subscribe to a project's events.
+        
+        Args:
+            project_id: UUID of the project
+            last_event_id: Id of the last event the client received
+        
+        Returns:
+            Subscription; its `replay` holds the missed events, or None if the
+            client needs a fresh snapshot
+        """
+        channel = self._channel(project_id)
+        subscription = Subscription(self, project_id, self._replay(channel, last_event_id))
+        channel.subscribers.add(subscription)
+        return subscription
+    
+    def _replay(self, channel: _Channel, last_event_id: Optional[str]) -> Optional[List[ProgressEvent]]:
+        """Events after last_event_id, if they are all still in the history."""
+        if not last_event_id:
+            return None
+        boot, _, sequence = last_event_id.rpartition("-")
+        if boot != self._boot or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > channel.sequence:
+            return None
+        missed = channel.sequence - sequence
+        if missed > len(channel.history):
+            # Part of the gap has already left the history
+            return None
+        return list(channel.history)[len(channel.history) - missed:] if missed else []
+    
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription from its channel."""
+        channel = self._channels.get(subscription.project_id)
+        if channel is not None:
+            channel.subscribers.discard(subscription)
+    
+    def last_event_id(self, project_id: uuid.UUID) -> Optional[str]:
+        """
+        Id of the latest event of a project, for snapshots.
+        
+        Args:
+            project_id: UUID of the project
+        
+        Returns:
+            Event id, or None if nothing was published yet
+        """
+        channel = self._channels.get(project_id)
+        if channel is None or not channel.sequence:
+            return None
+        return f"{self._boot}-{channel.sequence}"
+    
+    def last_event(self, project_id: uuid.UUID, type: str) -> Optional[ProgressEvent]:
+        """
+        Latest event of a type still in a project's history.
+        
+        Args:
+            project_id: UUID of the project
+            type: Event type
+        
+        Returns:
+            The event, or None
+        """
+        channel = self._channels.get(project_id)
+        if channel is None:
+            return None
+        for event in reversed(channel.history):
+            if event.type == type:
+                return event
+        return None
+    
+    def is_active(self, project_id: uuid.UUID) -> bool:
+        """
+        Whether a run of the project publishes to this process's bus. When it
+        does not (e.g. it runs on a dedicated worker), its status is polled
+        from the database by the status poller.
+        
+        Args:
+            project_id: UUID of the project
+        
+        Returns:
+            True while a run is publishing
+        """
+        channel = self._channels.get(project_id)
+        return channel is not None and channel.active
+    
+    def end_run(self, project_id: uuid.UUID) -> None:
+        """
+        Mark a project's run as no longer publishing, e.g. after it was
+        interrupted without reaching DONE or FAILED.
+        
+        Args:
+            project_id: UUID of the project
+        """
+        channel = self._channels.get(project_id)
+        if channel is not None:
+            channel.active = False
+
+
+# Global progress event bus
+progress_events = ProgressEventBus(
+    history_size=settings.progress_event_history,
+    queue_size=settings.progress_event_queue_size
+)
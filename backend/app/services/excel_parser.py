@@ -6,6 +6,9 @@ import pandas as pd
 from pathlib import Path
 from typing import Dict, Any, List
 import json
+import time
+
+from app.services.metrics import excel_parse_duration
 
 
 class ExcelParserService:
@@ -26,6 +29,7 @@ class ExcelParserService:
         if not file_path.exists():
             raise FileNotFoundError(f"Excel file not found: {file_path}")
         
+        started = time.perf_counter()
         try:
             # Read all sheets from the Excel file
             excel_data = pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
@@ -40,9 +44,11 @@ class ExcelParserService:
                 sheet_data = df.to_dict(orient='records')
                 result[sheet_name] = sheet_data
             
+            excel_parse_duration.labels(outcome="ok").observe(time.perf_counter() - started)
             return result
         
         except Exception as e:
+            excel_parse_duration.labels(outcome="error").observe(time.perf_counter() - started)
             # Return error information in a structured format
             return {
                 "error": str(e),
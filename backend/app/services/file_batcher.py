@@ -0,0 +1,141 @@
+"""
+Batching of small blueprint files into shared completions.
+Tiny files (ignore files, env templates, manifests, package markers, section
+READMEs) do not need a full round trip each: files of the same section that
+become ready together are collected briefly and generated by one call.
+"""
+from pathlib import PurePosixPath
+from typing import Dict, List, Tuple, Callable, Awaitable, Set
+import asyncio
+
+from app.services.blueprint_graph import FileJob
+
+
+# File names generated in batches regardless of extension
+SMALL_FILE_NAMES = {
+    ".gitignore", ".dockerignore", ".gitkeep", ".editorconfig", ".nvmrc",
+    ".env", ".env.example", ".env.local", ".env.sample",
+    ".prettierrc", ".eslintrc", ".eslintrc.json", ".babelrc", ".flake8",
+    "__init__.py", "requirements.txt", "requirements-dev.txt", "runtime.txt", "procfile",
+    "package.json", "tsconfig.json", "jsconfig.json", "next-env.d.ts",
+    "next.config.js", "next.config.mjs", "postcss.config.js", "postcss.config.mjs",
+    "tailwind.config.js", "tailwind.config.ts", "vite.config.ts", "vite.config.js",
+    "babel.config.js", "jest.config.js", "pyproject.toml", "setup.cfg", "alembic.ini",
+}
+
+# Extensions of config files that are small whatever their name
+SMALL_FILE_EXTENSIONS = (".txt", ".ini", ".cfg", ".toml", ".yml", ".yaml")
+
+
+def is_small_file(job: FileJob) -> bool:
+    """
+    Whether a blueprint file is small enough to share a completion.
+    
+    Args:
+        job: Blueprint file
+    
+    Returns:
+        True for config/boilerplate files and section READMEs
+    """
+    name = PurePosixPath(job.file_path).name.lower()
+    if name in SMALL_FILE_NAMES:
+        return True
+    if name == "readme.md":
+        # The project README documents everything; it gets its own call
+        return job.key.lower() != "readme.md"
+    return name.endswith(SMALL_FILE_EXTENSIONS)
+
+
+class SmallFileBatcher:
+    """
+    Collects small files submitted by the DAG scheduler and runs them in
+    batches per section. Files released in the same scheduling step are
+    submitted within a few milliseconds of each other, so a short window is
+    enough to gather them.
+    """
+    
+    def __init__(
+        self,
+        run_batch: Callable[[List[FileJob]], Awaitable[Dict[str, bool]]],
+        max_files: int,
+        window: float = 0.05
+    ):
+        """
+        Collect small files for batched generation.
+        
+        Args:
+            run_batch: Generates a batch; returns success per file key
+            max_files: Most files per batch
+            window: Seconds to wait for more files of a section before
+                running a partial batch
+        """
+        self.run_batch = run_batch
+        self.max_files = max(1, max_files)
+        self.window = window
+        self._pending: Dict[str, List[Tuple[FileJob, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def accepts(self, job: FileJob) -> bool:
+        """Whether the job is batched rather than generated on its own."""
+        return self.max_files > 1 and is_small_file(job)
+    
+    async def submit(self, job: FileJob) -> bool:
+        """
+        Add a file to its section's batch and wait for the batch to finish.
+        
+        Args:
+            job: Small file to generate
+        
+        Returns:
+            True if the file was generated and written
+        """
+        future = asyncio.get_running_loop().create_future()
+        group = self._pending.setdefault(job.section_name, [])
+        group.append((job, future))
+        
+        if len(group) >= self.max_files:
+            self._flush(job.section_name)
+        elif job.section_name not in self._timers:
+            self._timers[job.section_name] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, job.section_name
+            )
+        return await future
+    
+    def _flush(self, section_name: str) -> None:
+        """Start the pending batch of a section."""
+        timer = self._timers.pop(section_name, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._pending.pop(section_name, [])
+        if not group:
+            return
+        task = asyncio.create_task(self._run(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, group: List[Tuple[FileJob, asyncio.Future]]) -> None:
+        """Run one batch and resolve the futures of its files."""
+        try:
+            results = await self.run_batch([job for job, _ in group])
+        except Exception as e:
+            print(f"Batch generation failed: {e}")
+            results = {}
+        for job, future in group:
+            if not future.done():
+                future.set_result(results.get(job.key, False))
+    
+    async def close(self) -> None:
+        """Drop files still waiting for a batch and cancel running batches."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for group in self._pending.values():
+            for _, future in group:
+                if not future.done():
+                    future.cancel()
+        self._pending.clear()
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,213 @@
+"""
+Generation worker.
+Claims jobs from the durable job queue and runs up to N generations at once,
+heartbeating each job so that a crashed worker's jobs are picked up again.
+"""
+from typing import Dict, Any, Optional
+import asyncio
+import os
+import socket
+import uuid
+
+from app.config import settings
+from app.db.models import Project
+from app.services.generator import project_generator
+from app.services.job_queue import job_queue
+from app.services.log_sink import log_sink
+from app.services.run_metrics import RunMetrics, bind_run
+from app.services.metrics import generations_in_flight
+
+
+class GenerationWorker:
+    """Runs queued generation jobs with bounded concurrency."""
+    
+    def __init__(
+        self,
+        concurrency: int,
+        worker_id: Optional[str] = None,
+        poll_interval: float = settings.job_poll_interval,
+        heartbeat_seconds: float = settings.job_heartbeat_seconds
+    ):
+        """
+        Initialize the worker.
+        
+        Args:
+            concurrency: Maximum number of jobs run at once
+            worker_id: Identifier recorded on claimed jobs (host:pid:random
+                by default)
+            poll_interval: Seconds between polls while the queue is empty
+            heartbeat_seconds: Seconds between lease extensions of a running job
+        """
+        self.concurrency = max(1, concurrency)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.heartbeat_seconds = heartbeat_seconds
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._tasks: Dict[uuid.UUID, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+        self._run_task: Optional[asyncio.Task] = None
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently running."""
+        return len(self._tasks)
+    
+    async def start(self) -> None:
+        """Run the worker in the background of the current event loop."""
+        self._run_task = asyncio.create_task(self.run())
+    
+    async def stop(self) -> None:
+        """Stop a worker started with start(), handing running jobs back to the queue."""
+        self.abort()
+        if self._run_task:
+            await self._run_task
+            self._run_task = None
+    
+    def request_stop(self) -> None:
+        """Stop claiming new jobs; running jobs are allowed to finish."""
+        self._stopping.set()
+    
+    def abort(self) -> None:
+        """Stop claiming and cancel running jobs, which are released to the queue."""
+        self._stopping.set()
+        for task in self._tasks.values():
+            task.cancel()
+    
+    async def run(self) -> None:
+        """Claim and run jobs until stopped, then wait for running jobs."""
+        print(f"Generation worker {self.worker_id} started (concurrency {self.concurrency})")
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            if self._stopping.is_set():
+                self._slots.release()
+                break
+            
+            try:
+                job = await job_queue.claim(self.worker_id)
+                if job is None:
+                    await job_queue.reap_expired()
+            except Exception as e:
+                print(f"Failed to claim generation job: {e}")
+                job = None
+            
+            if job is None:
+                self._slots.release()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            self._tasks[job["id"]] = asyncio.create_task(self._execute(job))
+        
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        print(f"Generation worker {self.worker_id} stopped")
+    
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        """Run one job while heartbeating its lease, then settle it."""
+        job_id = job["id"]
+        project_id = job["project_id"]
+        print(f"Worker {self.worker_id} running {job['kind']} job {job_id} for project {project_id}")
+        
+        generations_in_flight.inc()
+        run = asyncio.create_task(self._dispatch(job))
+        try:
+            while not run.done():
+                await asyncio.wait({run}, timeout=self.heartbeat_seconds)
+                if run.done():
+                    break
+                try:
+                    owned = await job_queue.heartbeat(job_id, self.worker_id)
+                except Exception as e:
+                    print(f"Failed to heartbeat job {job_id}: {e}")
+                    continue
+                if not owned:
+                    # Lease expired and another worker took over the job
+                    print(f"Lost lease on job {job_id}, abandoning it")
+                    run.cancel()
+                    await asyncio.gather(run, return_exceptions=True)
+                    return
+            
+            error = None
+            try:
+                run.result()
+            except Exception as e:
+                error = str(e)
+            if error is None:
+                project = await Project.filter(id=project_id).first()
+                if project and project.status == "FAILED":
+                    error = project.current_step or "Generation failed"
+            
+            await job_queue.finish(
+                job_id,
+                self.worker_id,
+                "FAILED" if error else "DONE",
+                error
+            )
+        
+        except asyncio.CancelledError:
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            try:
+                await job_queue.release(job_id, self.worker_id)
+            except Exception as e:
+                print(f"Failed to release job {job_id}: {e}")
+        
+        except Exception as e:
+            print(f"Failed to settle job {job_id}: {e}")
+        
+        finally:
+            generations_in_flight.dec()
+            # A run that did not reach DONE/FAILED leaves no in-memory state behind
+            project_generator.discard_run_state(project_id)
+            try:
+                await log_sink.flush(project_id)
+            except Exception as e:
+                print(f"Failed to flush logs of job {job_id}: {e}")
+            self._tasks.pop(job_id, None)
+            self._slots.release()
+    
+    async def _dispatch(self, job: Dict[str, Any]) -> None:
+        """
+        Call the generator method for a job. An interrupted generation (its
+        previous worker died or shut down) resumes from its checkpoint instead
+        of starting over; an interrupted regeneration simply diffs again.
+        
+        Timings and AI usage of the run are collected into a RunMetrics bound
+        to this task and stored as a GenerationRun when it ends.
+        """
+        project_id = job["project_id"]
+        options = job.get("options") or {}
+        use_cache = options.get("use_cache", True)
+        
+        if job["kind"] == "resume" or (job["kind"] == "generate" and job.get("interrupted")):
+            kind = "resume"
+        else:
+            kind = job["kind"]
+        metrics = RunMetrics(project_id, kind, job_id=job["id"], queue_wait=job.get("queue_wait"))
+        bind_run(metrics)
+        
+        try:
+            if kind == "resume":
+                await project_generator.resume_project(project_id, use_cache=use_cache)
+            elif kind == "regenerate":
+                await project_generator.regenerate_project(project_id, use_cache=use_cache)
+            else:
+                await project_generator.generate_project(
+                    project_id,
+                    use_cache=use_cache,
+                    force_replan=options.get("force_replan", False)
+                )
+        except asyncio.CancelledError:
+            metrics.status = "INTERRUPTED"
+            raise
+        except Exception:
+            metrics.status = "FAILED"
+            raise
+        finally:
+            metrics.finish(metrics.status or "INTERRUPTED")
+            try:
+                await asyncio.shield(metrics.save())
+            except Exception as e:
+                print(f"Failed to store run report of job {job['id']}: {e}")
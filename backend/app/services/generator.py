@@ -3,19 +3,80 @@ Project generation service for AutoPilot.
 Handles background project generation from specifications using AI.
 """
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set
+from dataclasses import dataclass, field, replace
+import asyncio
+import time
 import uuid
 import traceback
 from datetime import datetime
 
-from app.db.models import Project, ProjectSpec, GenerationLog
-from app.services.ai_planner import get_ai_planner
+from tortoise import timezone
+
+from app.config import settings
+from app.db.models import Project, ProjectSpec
 from app.services.ai_code_generator import get_ai_code_generator
+from app.services.blueprint_service import blueprint_service
+from app.services.spec_service import spec_service
+from app.services.spec_diff import diff_specs, affected_files, structural_changes
+from app.services.checkpoint_service import checkpoint_service
+from app.services.log_sink import log_sink
+from app.services.event_bus import progress_events
+from app.services.run_metrics import current_run, stage, file_scope
+from app.services.prompt_context import PromptContext, compact_json
+from app.services.blueprint_graph import BlueprintGraph, DagScheduler, FileJob, summarize_generated_code
+from app.services.file_batcher import SmallFileBatcher
+from app.services.template_registry import template_registry, TemplateContext, TemplateRule
+from app.utils.multi_file import validate_generated_file
+from app.utils.streaming import StreamingFileWriter
+
+
+@dataclass
+class GenerationProgress:
+    """Progress counters shared by the concurrent file tasks of one run."""
+    
+    total: int
+    started: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    # Files written so far, keyed by path relative to the project root
+    written: Dict[str, Path] = field(default_factory=dict)
+    # Small files generated through shared completions, and those calls
+    batched: int = 0
+    batch_calls: int = 0
+    # Files rendered from local templates without an AI call
+    templated: int = 0
+    
+    @property
+    def completed(self) -> int:
+        """Number of files that finished, successfully or not."""
+        return self.succeeded + self.failed
+
+
+@dataclass
+class ProjectRunState:
+    """Status of a running project as the generator sees it, and as persisted."""
+    
+    status: Optional[str] = None
+    current_step: Optional[str] = None
+    # Values last written to the projects row; unknown until the first write
+    persisted_status: Optional[str] = None
+    persisted_step: Optional[str] = None
+    persisted: bool = False
+    # Pending coalesced write of a step-only change
+    pending_write: Optional[asyncio.TimerHandle] = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
 
 class ProjectGeneratorService:
     """Handles AI-driven project generation from specifications."""
     
+    # Upper bound on prerequisite code included in a single file prompt
+    MAX_DEPENDENCY_CONTEXT_CHARS = 12000
+    
+    # Statuses that end a run; they are written immediately
+    FINAL_STATUSES = ("DONE", "FAILED")
+    
     def __init__(self, base_path: str = "storage/generated_projects"):
         """
         Initialize generator service.
@@ -25,8 +86,12 @@ class ProjectGeneratorService:
         """
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
-        self.ai_planner = get_ai_planner()
         self.ai_code_generator = get_ai_code_generator()
+        # Process-wide cap on concurrent file generations across all projects
+        self._global_slots = asyncio.Semaphore(max(1, settings.generation_max_concurrency))
+        # In-memory status of the runs in this process, by project
+        self._run_states: Dict[uuid.UUID, ProjectRunState] = {}
+        self._status_tasks: Set[asyncio.Task] = set()
     
     def get_project_path(self, project_id: uuid.UUID) -> Path:
         """
@@ -47,18 +112,20 @@ class ProjectGeneratorService:
         message: str
     ) -> None:
         """
-        Log a generation step.
+        Log a generation step. Lines are buffered and bulk-inserted by the
+        log sink; they are flushed at the latest on the next status change.
         
         Args:
             project_id: UUID of the project
             step: Current generation step
             message: Log message
         """
-        await GenerationLog.create(
-            project_id=project_id,
-            step=step,
-            message=message
-        )
+        progress_events.publish(project_id, "log", {
+            "step": step,
+            "message": message,
+            "timestamp": timezone.now().isoformat()
+        })
+        await log_sink.log(project_id, step, message)
     
     async def update_status(
         self,
@@ -69,23 +136,139 @@ class ProjectGeneratorService:
         """
         Update project status.
         
+        The run state is kept in memory and only changed columns are written,
+        with a single UPDATE. Status changes are written immediately; changes
+        of the current step alone are coalesced for a short interval, so
+        back-to-back steps cost one write.
+        
         Args:
             project_id: UUID of the project
             status: New status
             current_step: Current step description
         """
-        project = await Project.get(id=project_id)
-        project.status = status
-        project.current_step = current_step
-        await project.save()
+        progress_events.publish(project_id, "status", {"status": status, "current_step": current_step})
+        run = current_run()
+        if run is not None and status in self.FINAL_STATUSES:
+            run.status = status
+        state = self._run_states.setdefault(project_id, ProjectRunState())
+        state.status = status
+        state.current_step = current_step
+        
+        if (
+            state.persisted
+            and status == state.persisted_status
+            and status not in self.FINAL_STATUSES
+        ):
+            if state.pending_write is None and current_step != state.persisted_step:
+                state.pending_write = asyncio.get_running_loop().call_later(
+                    settings.status_coalesce_interval,
+                    self._write_status_later,
+                    project_id,
+                    state
+                )
+            return
+        
+        await self._write_status(project_id, state)
+        if status in self.FINAL_STATUSES and self._run_states.get(project_id) is state:
+            del self._run_states[project_id]
+    
+    async def _write_status(self, project_id: uuid.UUID, state: ProjectRunState) -> None:
+        """Persist the columns of a run state that differ from the row."""
+        async with state.lock:
+            if state.pending_write is not None:
+                state.pending_write.cancel()
+                state.pending_write = None
+            if self._run_states.get(project_id) is not state:
+                # The run ended or was discarded meanwhile
+                return
+            
+            changes = {}
+            if not state.persisted or state.status != state.persisted_status:
+                changes["status"] = state.status
+            if not state.persisted or state.current_step != state.persisted_step:
+                changes["current_step"] = state.current_step
+            if not changes:
+                return
+            
+            # Logs leading up to a status change are visible along with it
+            await log_sink.flush(project_id)
+            with stage("db.status"):
+                await Project.filter(id=project_id).update(**changes, updated_at=timezone.now())
+            state.persisted_status = state.status
+            state.persisted_step = state.current_step
+            state.persisted = True
+    
+    def _write_status_later(self, project_id: uuid.UUID, state: ProjectRunState) -> None:
+        """Timer callback: write a coalesced step change in the background."""
+        state.pending_write = None
+        task = asyncio.create_task(self._write_status_quietly(project_id, state))
+        self._status_tasks.add(task)
+        task.add_done_callback(self._status_tasks.discard)
+    
+    async def _write_status_quietly(self, project_id: uuid.UUID, state: ProjectRunState) -> None:
+        """Background status write; a failure leaves it to the next update."""
+        try:
+            await self._write_status(project_id, state)
+        except Exception as e:
+            print(f"Failed to update status of project {project_id}: {e}")
+    
+    def discard_run_state(self, project_id: uuid.UUID) -> None:
+        """
+        Forget the in-memory state of a run that was interrupted, dropping
+        any coalesced write still pending.
+        
+        Args:
+            project_id: UUID of the project
+        """
+        state = self._run_states.pop(project_id, None)
+        if state is not None and state.pending_write is not None:
+            state.pending_write.cancel()
+        progress_events.end_run(project_id)
+    
+    def _publish_file(
+        self,
+        project_id: uuid.UUID,
+        job: FileJob,
+        state: str,
+        progress: GenerationProgress
+    ) -> None:
+        """
+        Publish per-file progress to live subscribers.
+        
+        Args:
+            project_id: UUID of the project
+            job: File the event is about
+            state: generating | done | failed
+            progress: Progress of the current run
+        """
+        progress_events.publish(project_id, "file", {
+            "path": job.key,
+            "state": state,
+            "completed": progress.completed,
+            "total": progress.total,
+            "succeeded": progress.succeeded,
+            "failed": progress.failed
+        })
     
-    async def generate_project(self, project_id: uuid.UUID) -> None:
+    async def generate_project(
+        self,
+        project_id: uuid.UUID,
+        use_cache: bool = True,
+        force_replan: bool = False,
+        previous_blueprint: Optional[Dict[str, Any]] = None
+    ) -> None:
         """
         Generate project files from specifications using AI.
-        This runs as a background task.
+        This runs in a generation worker (see app.services.generation_worker).
         
         Args:
             project_id: UUID of the project
+            use_cache: Whether cached AI responses for identical prompts may be used
+            force_replan: Plan a new blueprint even if one is memoized for
+                these specs
+            previous_blueprint: Blueprint of an earlier generation; its files
+                that the new blueprint no longer contains are removed once
+                the new files have been generated
         """
         try:
             # Get project and specs
@@ -107,12 +290,6 @@ class ProjectGeneratorService:
                 f"Starting AI generation for project: {project.name}"
             )
             
-            # Extract specs
-            features_json = spec.features_json or {}
-            apis_json = spec.apis_json or {}
-            database_json = spec.database_json or {}
-            tech_stack_json = spec.tech_stack_json or {}
-            
             # Step 1: Generate project blueprint using AI
             await self.update_status(
                 project_id,
@@ -125,20 +302,25 @@ class ProjectGeneratorService:
                 "Generating project architecture blueprint..."
             )
             
-            blueprint = await self.ai_planner.generate_blueprint(
-                project_name=project.name,
-                tech_stack=project.tech_stack,
-                features_json=features_json,
-                apis_json=apis_json,
-                database_json=database_json,
-                tech_stack_json=tech_stack_json
-            )
+            with stage("planning"):
+                blueprint, reused = await blueprint_service.get_blueprint(
+                    project,
+                    spec,
+                    force_replan=force_replan,
+                    use_cache=use_cache
+                )
             
             await self.log_message(
                 project_id,
                 "planning",
+                f"Reused blueprint for unchanged specs with {self._count_files(blueprint)} files"
+                if reused else
                 f"Blueprint generated with {self._count_files(blueprint)} files"
             )
+            with stage("db.checkpoint"):
+                spec.blueprint_json = blueprint
+                await spec.save(update_fields=["blueprint_json"])
+                await checkpoint_service.start_run(project_id, BlueprintGraph(blueprint))
             
             # Step 2: Create project directory structure
             await self.update_status(
@@ -156,133 +338,308 @@ class ProjectGeneratorService:
                 f"Created project directory: {project_path}"
             )
             
-            # Step 3: Generate files for each section
+            # Step 3: Generate files in dependency order, independent files in parallel
             total_files = self._count_files(blueprint)
-            files_generated = 0
+            progress = GenerationProgress(total=total_files)
             
-            # Generate frontend files
-            if "frontend" in blueprint:
-                await self.update_status(
-                    project_id,
-                    "GENERATING",
-                    "Generating frontend code with AI"
-                )
-                files_generated = await self._generate_section_files(
+            await self.update_status(
+                project_id,
+                "GENERATING",
+                f"Generating {total_files} files with AI"
+            )
+            with stage("files"):
+                await self._generate_files_concurrently(
                     project_id=project_id,
                     project_path=project_path,
-                    section_name="frontend",
-                    section_data=blueprint["frontend"],
+                    blueprint=blueprint,
                     project_name=project.name,
-                    features_json=features_json,
-                    apis_json=apis_json,
-                    database_json=database_json,
-                    tech_stack_json=tech_stack_json,
-                    files_generated=files_generated,
-                    total_files=total_files
+                    spec=spec,
+                    progress=progress,
+                    use_cache=use_cache
                 )
             
-            # Generate backend files
-            if "backend" in blueprint:
-                await self.update_status(
+            # Finalize
+            await self.update_status(
+                project_id,
+                "GENERATING",
+                "Finalizing project"
+            )
+            await self.log_message(
+                project_id,
+                "finalization",
+                f"Generated {progress.succeeded}/{total_files} files successfully"
+                + (f" ({progress.failed} failed)" if progress.failed else "")
+                + self._describe_savings(progress)
+            )
+            
+            if previous_blueprint is not None:
+                await self._remove_stale_files(project_id, previous_blueprint, blueprint)
+            
+            # Remember what the files were generated from for incremental regeneration
+            with stage("db.snapshot"):
+                spec.generated_snapshot = spec_service.snapshot_of(spec)
+                await spec.save(update_fields=["generated_snapshot"])
+            
+            await self.log_message(
+                project_id,
+                "complete",
+                f"Project '{project.name}' generated successfully with AI at {project_path}"
+            )
+            
+            # Mark as DONE
+            await self.update_status(project_id, "DONE", None)
+            
+        except Exception as e:
+            await self._mark_failed(project_id, f"Generation failed: {str(e)}")
+    
+    async def regenerate_project(self, project_id: uuid.UUID, use_cache: bool = True) -> None:
+        """
+        Regenerate only the files affected by spec changes since the last
+        successful generation. Files whose specs did not change are left on
+        disk untouched. Falls back to a full generation if the project has
+        never been generated, or if a language, framework or database of the
+        tech stack changed (the old blueprint no longer fits).
+        This runs in a generation worker (see app.services.generation_worker).
+        
+        Args:
+            project_id: UUID of the project
+            use_cache: Whether cached AI responses for identical prompts may be used
+        """
+        try:
+            project = await Project.get(id=project_id)
+            spec = await ProjectSpec.filter(project_id=project_id).first()
+            
+            if not spec:
+                raise Exception("Project specifications not found")
+            
+            if not spec.generated_snapshot or not spec.blueprint_json:
+                await self.log_message(
                     project_id,
-                    "GENERATING",
-                    "Generating backend code with AI"
-                )
-                files_generated = await self._generate_section_files(
-                    project_id=project_id,
-                    project_path=project_path,
-                    section_name="backend",
-                    section_data=blueprint["backend"],
-                    project_name=project.name,
-                    features_json=features_json,
-                    apis_json=apis_json,
-                    database_json=database_json,
-                    tech_stack_json=tech_stack_json,
-                    files_generated=files_generated,
-                    total_files=total_files
+                    "initialization",
+                    "No previous generation found, running full generation"
                 )
+                await self.generate_project(project_id, use_cache=use_cache)
+                return
             
-            # Generate database files
-            if "database" in blueprint:
-                await self.update_status(
+            await self.update_status(
+                project_id,
+                "GENERATING",
+                "Comparing specifications with last generation"
+            )
+            
+            blueprint = spec.blueprint_json
+            with stage("diff"):
+                changes = diff_specs(spec.generated_snapshot, spec_service.snapshot_of(spec))
+                structural = structural_changes(changes)
+                affected = set() if structural else affected_files(blueprint, changes)
+                if changes and not structural and settings.generation_templates_enabled:
+                    # Templates (e.g. the project README) render from the specs
+                    # without AI calls, so they are refreshed on any change
+                    tech_stack = compact_json(spec.tech_stack_json) if spec.tech_stack_json else ""
+                    affected |= {
+                        key for key, job in BlueprintGraph(blueprint).nodes.items()
+                        if template_registry.match(job, tech_stack) is not None
+                    }
+            
+            if structural:
+                await self.log_message(
                     project_id,
-                    "GENERATING",
-                    "Generating database schema with AI"
-                )
-                files_generated = await self._generate_section_files(
-                    project_id=project_id,
-                    project_path=project_path,
-                    section_name="database",
-                    section_data=blueprint["database"],
-                    project_name=project.name,
-                    features_json=features_json,
-                    apis_json=apis_json,
-                    database_json=database_json,
-                    tech_stack_json=tech_stack_json,
-                    files_generated=files_generated,
-                    total_files=total_files
+                    "diff",
+                    "Tech stack changed ("
+                    + "; ".join(change.describe() for change in structural[:5])
+                    + "), planning a new blueprint and regenerating all files"
                 )
+                await self.generate_project(project_id, use_cache=use_cache, previous_blueprint=blueprint)
+                return
             
-            # Generate root files
-            if "root" in blueprint:
+            await self.log_message(
+                project_id,
+                "diff",
+                f"Found {len(changes)} changed spec rows affecting "
+                f"{len(affected)}/{self._count_files(blueprint)} files"
+            )
+            for change in changes[:50]:
+                await self.log_message(project_id, "diff", change.describe())
+            
+            project_path = self.get_project_path(project_id)
+            project_path.mkdir(parents=True, exist_ok=True)
+            progress = GenerationProgress(total=len(affected))
+            
+            if affected:
+                await checkpoint_service.start_run(
+                    project_id,
+                    BlueprintGraph(blueprint),
+                    reset=affected
+                )
                 await self.update_status(
                     project_id,
                     "GENERATING",
-                    "Generating project documentation with AI"
+                    f"Regenerating {len(affected)} changed files with AI"
                 )
-                files_generated = await self._generate_section_files(
-                    project_id=project_id,
-                    project_path=project_path,
-                    section_name="root",
-                    section_data=blueprint["root"],
-                    project_name=project.name,
-                    features_json=features_json,
-                    apis_json=apis_json,
-                    database_json=database_json,
-                    tech_stack_json=tech_stack_json,
-                    files_generated=files_generated,
-                    total_files=total_files
+                with stage("files"):
+                    await self._generate_files_concurrently(
+                        project_id=project_id,
+                        project_path=project_path,
+                        blueprint=blueprint,
+                        project_name=project.name,
+                        spec=spec,
+                        progress=progress,
+                        use_cache=use_cache,
+                        only=affected
+                    )
+            
+            # Failed files keep their changes pending, so the next
+            # regeneration retries them
+            if not progress.failed:
+                with stage("db.snapshot"):
+                    spec.generated_snapshot = spec_service.snapshot_of(spec)
+                    await spec.save(update_fields=["generated_snapshot"])
+            
+            await self.log_message(
+                project_id,
+                "complete",
+                f"Regenerated {progress.succeeded}/{len(affected)} files"
+                + (f" ({progress.failed} failed, retried by the next regeneration)" if progress.failed else "")
+                + self._describe_savings(progress)
+            )
+            await self.update_status(project_id, "DONE", None)
+            
+        except Exception as e:
+            await self._mark_failed(project_id, f"Regeneration failed: {str(e)}")
+    
+    async def resume_project(self, project_id: uuid.UUID, use_cache: bool = True) -> None:
+        """
+        Resume an interrupted or failed run from its checkpoint.
+        The persisted blueprint is reused and files recorded as generated are
+        skipped if their content on disk still matches the recorded hash;
+        everything else is generated again. Falls back to a full generation
+        if the run never got past planning.
+        This runs in a generation worker (see app.services.generation_worker).
+        
+        Args:
+            project_id: UUID of the project
+            use_cache: Whether cached AI responses for identical prompts may be used
+        """
+        try:
+            project = await Project.get(id=project_id)
+            spec = await ProjectSpec.filter(project_id=project_id).first()
+            
+            if not spec:
+                raise Exception("Project specifications not found")
+            
+            if not spec.blueprint_json:
+                await self.log_message(
+                    project_id,
+                    "initialization",
+                    "No checkpoint found, running full generation"
                 )
+                await self.generate_project(project_id, use_cache=use_cache)
+                return
             
-            # Finalize
             await self.update_status(
                 project_id,
                 "GENERATING",
-                "Finalizing project"
+                "Resuming generation from checkpoint"
             )
+            
+            blueprint = spec.blueprint_json
+            graph = BlueprintGraph(blueprint)
+            project_path = self.get_project_path(project_id)
+            project_path.mkdir(parents=True, exist_ok=True)
+            
+            with stage("verify"):
+                await checkpoint_service.start_run(project_id, graph, reset=[])
+                verified = await checkpoint_service.verified_files(project_id, project_path)
+            remaining = set(graph.nodes) - verified
+            
             await self.log_message(
                 project_id,
-                "finalization",
-                f"Generated {files_generated} files successfully"
+                "resume",
+                f"Resuming with {len(verified & set(graph.nodes))} files already generated, "
+                f"{len(remaining)} remaining"
             )
             
-            # Mark as DONE
-            await self.update_status(project_id, "DONE", None)
+            progress = GenerationProgress(total=len(remaining))
+            if remaining:
+                await checkpoint_service.start_run(project_id, graph, reset=remaining)
+                await self.update_status(
+                    project_id,
+                    "GENERATING",
+                    f"Generating {len(remaining)} remaining files with AI"
+                )
+                with stage("files"):
+                    await self._generate_files_concurrently(
+                        project_id=project_id,
+                        project_path=project_path,
+                        blueprint=blueprint,
+                        project_name=project.name,
+                        spec=spec,
+                        progress=progress,
+                        use_cache=use_cache,
+                        only=remaining
+                    )
+            
+            with stage("db.snapshot"):
+                spec.generated_snapshot = spec_service.snapshot_of(spec)
+                await spec.save(update_fields=["generated_snapshot"])
+            
             await self.log_message(
                 project_id,
                 "complete",
-                f"Project '{project.name}' generated successfully with AI at {project_path}"
+                f"Resumed run generated {progress.succeeded}/{len(remaining)} remaining files"
+                + (f" ({progress.failed} failed)" if progress.failed else "")
+                + self._describe_savings(progress)
             )
+            await self.update_status(project_id, "DONE", None)
             
         except Exception as e:
-            # Log error and update status to FAILED
-            error_msg = f"Generation failed: {str(e)}"
-            print(f"Error generating project {project_id}: {error_msg}")
-            print(traceback.format_exc())
-            
-            try:
-                await self.update_status(
-                    project_id,
-                    "FAILED",
-                    error_msg
-                )
-                await self.log_message(
-                    project_id,
-                    "error",
-                    error_msg
-                )
-            except Exception as log_error:
-                print(f"Failed to log error: {log_error}")
+            await self._mark_failed(project_id, f"Resume failed: {str(e)}")
+    
+    async def _mark_failed(self, project_id: uuid.UUID, error_msg: str) -> None:
+        """
+        Log an error and update status to FAILED.
+        
+        Args:
+            project_id: UUID of the project
+            error_msg: Error description
+        """
+        print(f"Error generating project {project_id}: {error_msg}")
+        print(traceback.format_exc())
+        
+        try:
+            await self.update_status(
+                project_id,
+                "FAILED",
+                error_msg
+            )
+            await self.log_message(
+                project_id,
+                "error",
+                error_msg
+            )
+            await log_sink.flush(project_id)
+        except Exception as log_error:
+            print(f"Failed to log error: {log_error}")
+    
+    async def _remove_stale_files(
+        self,
+        project_id: uuid.UUID,
+        previous_blueprint: Dict[str, Any],
+        blueprint: Dict[str, Any]
+    ) -> None:
+        """
+        Delete the files of a previous blueprint that the current one no
+        longer contains (e.g. Python modules after switching to Express).
+        
+        Args:
+            project_id: UUID of the project
+            previous_blueprint: Blueprint the old files were generated from
+            blueprint: Blueprint the project was just generated from
+        """
+        stale = set(BlueprintGraph(previous_blueprint).nodes) - set(BlueprintGraph(blueprint).nodes)
+        if stale:
+            await checkpoint_service.forget_files(project_id, self.get_project_path(project_id), stale)
+            await self.log_message(project_id, "cleanup", f"Removed {len(stale)} files of the previous blueprint")
     
     def _count_files(self, blueprint: Dict[str, Any]) -> int:
         """Count total files in blueprint."""
@@ -292,97 +649,416 @@ class ProjectGeneratorService:
                 count += len(section_data["files"])
         return count
     
-    async def _generate_section_files(
+    def _describe_savings(self, progress: GenerationProgress) -> str:
+        """Summary of the AI calls saved by templates and batching."""
+        parts = []
+        if progress.templated:
+            parts.append(f"{progress.templated} rendered from templates")
+        if progress.batch_calls:
+            parts.append(f"{progress.batched} small files shared {progress.batch_calls} AI calls")
+        if not parts:
+            return ""
+        skipped = progress.templated + progress.batched - progress.batch_calls
+        return f"; {', '.join(parts)}, {skipped} AI calls skipped"
+    
+    async def _generate_files_concurrently(
+        self,
+        project_id: uuid.UUID,
+        project_path: Path,
+        blueprint: Dict[str, Any],
+        project_name: str,
+        spec: ProjectSpec,
+        progress: GenerationProgress,
+        use_cache: bool = True,
+        only: Optional[Set[str]] = None
+    ) -> None:
+        """
+        Generate every blueprint file following the blueprint dependency graph.
+        
+        A file is released as soon as its prerequisites have finished, and up
+        to the configured number of released files run in parallel. Each file
+        holds a per-project slot and a process-wide slot while its AI call is
+        in flight, so one large project cannot starve the others. Boilerplate
+        files with a registered template are rendered locally, and small files
+        released together are generated in shared calls (see
+        SmallFileBatcher), which hold one slot per call.
+        
+        Args:
+            project_id: Project UUID
+            project_path: Base path for project
+            blueprint: Blueprint returned by the AI planner
+            project_name: Name of the project
+            spec: Parsed specifications of the project
+            progress: Shared progress counters for this run
+            use_cache: Whether cached AI responses may be used
+            only: Generate only these files (paths relative to the project
+                root); the others are expected to exist on disk already
+        """
+        graph = BlueprintGraph(blueprint)
+        if only is not None:
+            # Unchanged files serve as prerequisite context for changed ones
+            for key in graph.nodes:
+                existing = project_path / key
+                if key not in only and existing.is_file():
+                    progress.written[key] = existing
+        
+        # Serialize specs and file listings once; each file prompt reuses
+        # them and only carries the spec rows relevant to it
+        prompt_context = PromptContext.from_spec(project_name, spec, graph)
+        
+        project_slots = asyncio.Semaphore(max(1, settings.generation_project_concurrency))
+        
+        async def run_single(job: FileJob) -> bool:
+            released = time.perf_counter()
+            async with project_slots:
+                async with self._global_slots:
+                    with file_scope(job.key, "ai", queue_wait=time.perf_counter() - released):
+                        return await self._generate_file(
+                            project_id=project_id,
+                            project_path=project_path,
+                            job=job,
+                            project_name=project_name,
+                            prompt_context=prompt_context,
+                            progress=progress,
+                            use_cache=use_cache
+                        )
+        
+        async def run_batch(jobs: List[FileJob]) -> Dict[str, bool]:
+            if len(jobs) == 1:
+                return {jobs[0].key: await run_single(jobs[0])}
+            released = time.perf_counter()
+            label = "batch: " + ", ".join(job.key for job in jobs)
+            async with project_slots:
+                async with self._global_slots:
+                    with file_scope(label, "batch", queue_wait=time.perf_counter() - released):
+                        results = await self._generate_batch(
+                            project_id=project_id,
+                            project_path=project_path,
+                            jobs=jobs,
+                            project_name=project_name,
+                            prompt_context=prompt_context,
+                            progress=progress,
+                            use_cache=use_cache
+                        )
+            # Files the shared call did not produce are generated on their own
+            retry = [job for job in jobs if job.key not in results]
+            outcomes = await asyncio.gather(*(run_single(job) for job in retry))
+            results.update({job.key: outcome for job, outcome in zip(retry, outcomes)})
+            return results
+        
+        batcher = SmallFileBatcher(
+            run_batch,
+            max_files=settings.generation_batch_max_files,
+            window=settings.generation_batch_window
+        )
+        
+        template_context = TemplateContext(
+            project_name=project_name,
+            framework="",
+            tech_stack=compact_json(spec.tech_stack_json) if spec.tech_stack_json else "",
+            specs=spec_service.snapshot_of(spec),
+            blueprint=blueprint
+        )
+        
+        async def run(job: FileJob) -> bool:
+            template = (
+                template_registry.match(job, template_context.tech_stack)
+                if settings.generation_templates_enabled else None
+            )
+            if template is not None:
+                with file_scope(job.key, "template"):
+                    return await self._render_template(
+                        project_id=project_id,
+                        project_path=project_path,
+                        job=job,
+                        template=template,
+                        context=replace(template_context, framework=job.framework),
+                        progress=progress
+                    )
+            if batcher.accepts(job):
+                return await batcher.submit(job)
+            return await run_single(job)
+        
+        try:
+            await DagScheduler(graph, run).run(only=only)
+        finally:
+            await batcher.close()
+    
+    async def _generate_file(
         self,
         project_id: uuid.UUID,
         project_path: Path,
-        section_name: str,
-        section_data: Dict[str, Any],
+        job: FileJob,
         project_name: str,
-        features_json: Dict[str, Any],
-        apis_json: Dict[str, Any],
-        database_json: Dict[str, Any],
-        tech_stack_json: Dict[str, Any],
-        files_generated: int,
-        total_files: int
-    ) -> int:
+        prompt_context: PromptContext,
+        progress: GenerationProgress,
+        use_cache: bool = True
+    ) -> bool:
         """
-        Generate files for a section of the project.
+        Generate a single file. Errors are logged and never propagate, so one
+        failing file does not abort the rest of the run.
         
         Args:
             project_id: Project UUID
             project_path: Base path for project
-            section_name: Name of section (frontend, backend, database, root)
-            section_data: Section data from blueprint
+            job: File to generate
             project_name: Name of the project
-            features_json: Features specs
-            apis_json: API specs
-            database_json: Database specs
-            tech_stack_json: Tech stack specs
-            files_generated: Number of files already generated
-            total_files: Total files to generate
+            prompt_context: Prompt material shared by the run
+            progress: Shared progress counters for this run
+            use_cache: Whether cached AI responses may be used
             
         Returns:
-            Updated files_generated count
+            True if the file was generated and written
         """
-        files = section_data.get("files", {})
-        framework = section_data.get("framework", "Unknown")
+        section_name = job.section_name
+        file_path = job.file_path
+        progress.started += 1
+        self._publish_file(project_id, job, "generating", progress)
         
-        for file_path, file_purpose in files.items():
-            files_generated += 1
+        try:
+            await self.log_message(
+                project_id,
+                section_name,
+                f"Generating {file_path} ({progress.started}/{progress.total})"
+            )
             
+            # Determine full file path
+            full_path = project_path / job.key
+            
+            # Create parent directories
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Generate code using AI, streaming it into place
+            content_hash = await self.ai_code_generator.stream_file_code(
+                destination=full_path,
+                file_path=file_path,
+                file_purpose=job.file_purpose,
+                project_name=project_name,
+                framework=job.framework,
+                sections=prompt_context.sections_for(job.key),
+                dependency_outputs=self._collect_dependency_outputs(job, progress),
+                use_cache=use_cache
+            )
+            with stage("db.checkpoint"):
+                await checkpoint_service.mark_done(project_id, job.key, content_hash)
+            
+            progress.written[job.key] = full_path
+            progress.succeeded += 1
+            self._publish_file(project_id, job, "done", progress)
             await self.log_message(
                 project_id,
                 section_name,
-                f"Generating {file_path} ({files_generated}/{total_files})"
+                f"✓ Generated {file_path} ({progress.completed}/{progress.total})"
             )
+            return True
             
+        except Exception as e:
+            progress.failed += 1
+            self._publish_file(project_id, job, "failed", progress)
+            error_msg = f"Failed to generate {file_path}: {str(e)}"
+            print(error_msg)
             try:
-                # Determine full file path
-                if section_name == "root":
-                    full_path = project_path / file_path
-                else:
-                    full_path = project_path / section_name / file_path
-                
-                # Create parent directories
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Get all files in this section for context
-                related_files = {fp: fp_purpose for fp, fp_purpose in files.items() if fp != file_path}
-                
-                # Generate code using AI
-                code = await self.ai_code_generator.generate_file_code(
-                    file_path=file_path,
-                    file_purpose=file_purpose,
-                    project_name=project_name,
-                    framework=framework,
-                    features_json=features_json,
-                    apis_json=apis_json,
-                    database_json=database_json,
-                    tech_stack_json=tech_stack_json,
-                    related_files=related_files
-                )
-                
-                # Write file
-                full_path.write_text(code, encoding='utf-8')
-                
+                await checkpoint_service.mark_failed(project_id, job.key)
                 await self.log_message(
                     project_id,
                     section_name,
-                    f"✓ Generated {file_path}"
+                    f"✗ {error_msg}"
                 )
+            except Exception as log_error:
+                print(f"Failed to log error: {log_error}")
+            # Continue with other files even if one fails
+            return False
+    
+    async def _render_template(
+        self,
+        project_id: uuid.UUID,
+        project_path: Path,
+        job: FileJob,
+        template: TemplateRule,
+        context: TemplateContext,
+        progress: GenerationProgress
+    ) -> bool:
+        """
+        Write a boilerplate file from its template, without an AI call.
+        
+        Args:
+            project_id: Project UUID
+            project_path: Base path for project
+            job: File to render
+            template: Template rule matching the file
+            context: Values available to the template
+            progress: Shared progress counters for this run
+            
+        Returns:
+            True if the file was rendered and written
+        """
+        progress.started += 1
+        try:
+            full_path = project_path / job.key
+            writer = StreamingFileWriter(full_path)
+            with stage("fs.write"):
+                try:
+                    writer.write(template.render(context))
+                    content_hash = writer.commit()
+                except BaseException:
+                    writer.abort()
+                    raise
+            with stage("db.checkpoint"):
+                await checkpoint_service.mark_done(project_id, job.key, content_hash)
+            
+            progress.written[job.key] = full_path
+            progress.succeeded += 1
+            progress.templated += 1
+            self._publish_file(project_id, job, "done", progress)
+            await self.log_message(
+                project_id,
+                job.section_name,
+                f"✓ Rendered {job.file_path} from template ({progress.completed}/{progress.total})"
+            )
+            return True
+        except Exception as e:
+            progress.failed += 1
+            self._publish_file(project_id, job, "failed", progress)
+            error_msg = f"Failed to render {job.file_path}: {str(e)}"
+            print(error_msg)
+            try:
+                await checkpoint_service.mark_failed(project_id, job.key)
+                await self.log_message(project_id, job.section_name, f"✗ {error_msg}")
+            except Exception as log_error:
+                print(f"Failed to log error: {log_error}")
+            return False
+    
+    async def _generate_batch(
+        self,
+        project_id: uuid.UUID,
+        project_path: Path,
+        jobs: List[FileJob],
+        project_name: str,
+        prompt_context: PromptContext,
+        progress: GenerationProgress,
+        use_cache: bool = True
+    ) -> Dict[str, bool]:
+        """
+        Generate several small files of one section with a single AI call.
+        Every file is validated on its own; files that are missing from the
+        output or invalid are left out of the result so the caller can
+        generate them individually.
+        
+        Args:
+            project_id: Project UUID
+            project_path: Base path for project
+            jobs: Small files of one section
+            project_name: Name of the project
+            prompt_context: Prompt material shared by the run
+            progress: Shared progress counters for this run
+            use_cache: Whether cached AI responses may be used
+            
+        Returns:
+            Dict of file key to True for every file generated and written
+        """
+        section_name = jobs[0].section_name
+        paths = ", ".join(job.file_path for job in jobs)
+        for job in jobs:
+            self._publish_file(project_id, job, "generating", progress)
+        
+        try:
+            await self.log_message(
+                project_id,
+                section_name,
+                f"Generating {len(jobs)} small files in one call: {paths}"
+            )
+            
+            dependency_outputs: Dict[str, str] = {}
+            for job in jobs:
+                dependency_outputs.update(self._collect_dependency_outputs(job, progress))
+            
+            contents = await self.ai_code_generator.generate_file_batch(
+                files={job.file_path: job.file_purpose for job in jobs},
+                project_name=project_name,
+                framework=jobs[0].framework,
+                sections=prompt_context.sections_for(jobs[0].key),
+                dependency_outputs=dependency_outputs,
+                use_cache=use_cache
+            )
+        except Exception as e:
+            print(f"Batch generation of {paths} failed: {e}")
+            return {}
+        
+        progress.batch_calls += 1
+        results = {}
+        for job in jobs:
+            content = contents.get(job.file_path)
+            error = "missing from output" if content is None else validate_generated_file(job.file_path, content)
+            if error:
+                print(f"Batched {job.key} rejected ({error}), generating it individually")
+                continue
+            
+            progress.started += 1
+            try:
+                full_path = project_path / job.key
+                writer = StreamingFileWriter(full_path)
+                with stage("fs.write"):
+                    try:
+                        writer.write(content)
+                        content_hash = writer.commit()
+                    except BaseException:
+                        writer.abort()
+                        raise
+                with stage("db.checkpoint"):
+                    await checkpoint_service.mark_done(project_id, job.key, content_hash)
                 
-            except Exception as e:
-                error_msg = f"Failed to generate {file_path}: {str(e)}"
-                print(error_msg)
+                progress.written[job.key] = full_path
+                progress.succeeded += 1
+                progress.batched += 1
+                results[job.key] = True
+                self._publish_file(project_id, job, "done", progress)
                 await self.log_message(
                     project_id,
                     section_name,
-                    f"✗ {error_msg}"
+                    f"✓ Generated {job.file_path} ({progress.completed}/{progress.total})"
                 )
-                # Continue with other files even if one fails
+            except Exception as e:
+                progress.failed += 1
+                results[job.key] = False
+                self._publish_file(project_id, job, "failed", progress)
+                error_msg = f"Failed to generate {job.file_path}: {str(e)}"
+                print(error_msg)
+                try:
+                    await checkpoint_service.mark_failed(project_id, job.key)
+                    await self.log_message(project_id, section_name, f"✗ {error_msg}")
+                except Exception as log_error:
+                    print(f"Failed to log error: {log_error}")
+        return results
+    
+    def _collect_dependency_outputs(
+        self,
+        job: FileJob,
+        progress: GenerationProgress
+    ) -> Dict[str, str]:
+        """
+        Read back what the prerequisites of a file actually produced.
         
-        return files_generated
+        Args:
+            job: File about to be generated
+            progress: Progress of the current run
+            
+        Returns:
+            Dict of prerequisite path to (summarized) generated code
+        """
+        outputs = {}
+        budget = self.MAX_DEPENDENCY_CONTEXT_CHARS
+        for key in sorted(job.depends_on):
+            path = progress.written.get(key)
+            if path is None or budget <= 0:
+                continue
+            try:
+                code = path.read_text(encoding='utf-8')
+            except OSError:
+                continue
+            summary = summarize_generated_code(code, max_chars=min(budget, 3000))
+            outputs[key] = summary
+            budget -= len(summary)
+        return outputs
 
 
 # Global generator service instance
@@ -0,0 +1,359 @@
+"""
+Shared HTTP client for Groq API calls.
+One pooled, keep-alive (HTTP/2 capable) connection pool is used by the planner,
+code generator and optimizer instead of a new client per request. Every call is
+served from the LLM response cache when possible, otherwise paced by the
+process-wide rate limiter and retried on 429. Completions can also be
+streamed as they are produced. Identical concurrent calls share one upstream
+request (see single_flight.py) and slow calls can be hedged (see hedging.py).
+"""
+import json
+from contextlib import aclosing
+import time
+import httpx
+from typing import Dict, Any, AsyncIterator, Optional
+from app.config import settings
+from app.services.rate_limiter import rate_limiter, parse_retry_after
+from app.services.llm_cache import llm_cache
+from app.services.hedging import request_hedger
+from app.services.single_flight import single_flight
+from app.services.run_metrics import record_llm_call
+from app.services.metrics import llm_request_duration, llm_cache_hits, llm_shared_requests, record_llm_usage
+
+
+class GroqClient:
+    """Application-scoped client for the Groq chat completions API."""
+    
+    def __init__(self):
+        """Initialize without opening connections; see start()."""
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client from settings."""
+        return httpx.AsyncClient(
+            http2=settings.groq_http2,
+            limits=httpx.Limits(
+                max_connections=settings.groq_max_connections,
+                max_keepalive_connections=settings.groq_max_keepalive_connections,
+                keepalive_expiry=settings.groq_keepalive_expiry
+            ),
+            timeout=httpx.Timeout(settings.groq_timeout, connect=10.0),
+            headers={
+                "Authorization": f"Bearer {settings.groq_api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+    
+    async def start(self) -> None:
+        """Open the connection pool. Called from the application lifespan."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+    
+    async def close(self) -> None:
+        """Close the connection pool and release all sockets."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Get the pooled HTTP client.
+        Created on first use when running outside the FastAPI lifespan
+        (scripts, workers).
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    async def chat_completion(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        service: str = "codegen"
+    ) -> Dict[str, Any]:
+        """
+        Send a chat completion request.
+        Waits for rate limiter capacity first, and on HTTP 429 backs off for
+        the provider's Retry-After before trying again.
+        
+        Args:
+            payload: OpenAI-compatible chat completion payload
+            timeout: Optional per-request timeout in seconds
+            use_cache: Serve an identical earlier request from the LLM cache
+            service: Calling service for metrics (planner, codegen, optimizer)
+        
+        Returns:
+            Parsed JSON response
+        
+        Raises:
+            httpx.HTTPStatusError: If Groq returns a non-2xx status (after
+                retries for 429)
+        """
+        started = time.perf_counter()
+        model = payload.get("model", settings.groq_model)
+        cache_key = llm_cache.make_key(payload)
+        if use_cache:
+            cached = await llm_cache.get(cache_key)
+            if cached is not None:
+                record_llm_call(None, time.perf_counter() - started, cached=True, model=model)
+                llm_cache_hits.labels(service=service).inc()
+                return cached
+        
+        estimated_tokens = rate_limiter.estimate_tokens(payload)
+        
+        async def request() -> Dict[str, Any]:
+            # Reserved before hedging, so attempts are timed from here
+            rate_limit_wait = await rate_limiter.acquire(model, estimated_tokens)
+            result = await request_hedger.call(
+                (service, model),
+                lambda: self._post_completion(payload, timeout, service, started, rate_limit_wait),
+                reserve=lambda: rate_limiter.try_acquire(model, estimated_tokens)
+            )
+            await llm_cache.set(cache_key, result)
+            return result
+        
+        return await single_flight.call(
+            cache_key,
+            request,
+            shared=lambda: self._record_shared(service, model, started)
+        )
+    
+    def _record_shared(self, service: str, model: str, started: float) -> None:
+        """Account a call answered by an identical call already in flight."""
+        record_llm_call(None, time.perf_counter() - started, cached=True, model=model)
+        llm_shared_requests.labels(service=service).inc()
+    
+    async def _post_completion(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float],
+        service: str,
+        started: float,
+        rate_limit_wait: float
+    ) -> Dict[str, Any]:
+        """
+        One attempt of chat_completion() without the cache: sent on rate
+        limit capacity the caller reserved, retried on 429 and recorded in
+        the metrics.
+        
+        Args:
+            payload: OpenAI-compatible chat completion payload
+            timeout: Optional per-request timeout in seconds
+            service: Calling service for metrics
+            started: perf_counter() when the call started
+            rate_limit_wait: Seconds the caller waited for the reservation
+        
+        Returns:
+            Parsed JSON response
+        """
+        model = payload.get("model", settings.groq_model)
+        estimated_tokens = rate_limiter.estimate_tokens(payload)
+        
+        for attempt in range(settings.groq_max_retries + 1):
+            if attempt:
+                rate_limit_wait += await rate_limiter.acquire(model, estimated_tokens)
+            sent = time.perf_counter()
+            try:
+                response = await self.client.post(
+                    settings.groq_api_url,
+                    json=payload,
+                    timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+                )
+            except Exception:
+                llm_request_duration.labels(service=service, status="error").observe(time.perf_counter() - sent)
+                rate_limiter.record_usage(model, estimated_tokens, 0)
+                raise
+            llm_request_duration.labels(service=service, status=str(response.status_code)).observe(time.perf_counter() - sent)
+            
+            if response.status_code == 429 and attempt < settings.groq_max_retries:
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                if retry_after is None:
+                    retry_after = 2.0 ** attempt
+                rate_limiter.record_usage(model, estimated_tokens, 0)
+                rate_limiter.penalize(model, retry_after)
+                print(f"Groq rate limit hit for {model}, retrying in {retry_after:.1f}s")
+                continue
+            
+            if response.is_error:
+                rate_limiter.record_usage(model, estimated_tokens, 0)
+                response.raise_for_status()
+            
+            result = response.json()
+            usage = result.get("usage") or {}
+            rate_limiter.record_usage(
+                model,
+                estimated_tokens,
+                usage.get("total_tokens", estimated_tokens)
+            )
+            record_llm_call(usage, time.perf_counter() - started, rate_limit_wait, model=model)
+            record_llm_usage(service, usage)
+            return result
+        
+        # Unreachable: the last attempt either returns or raises
+        raise RuntimeError("Groq request retries exhausted")
+    
+    async def stream_chat_completion(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        service: str = "codegen"
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+        A cached response is yielded as a single chunk. 429s received before
+        the stream starts are retried like chat_completion(); errors after
+        the first chunk propagate to the caller.
+        
+        Args:
+            payload: OpenAI-compatible chat completion payload
+            timeout: Optional per-request timeout in seconds
+            use_cache: Serve an identical earlier request from the LLM cache
+            service: Calling service for metrics (planner, codegen, optimizer)
+        
+        Yields:
+            Content deltas
+        
+        Raises:
+            httpx.HTTPStatusError: If Groq returns a non-2xx status (after
+                retries for 429)
+        """
+        started = time.perf_counter()
+        model = payload.get("model", settings.groq_model)
+        cache_key = llm_cache.make_key(payload)
+        if use_cache:
+            cached = await llm_cache.get(cache_key)
+            if cached is not None:
+                record_llm_call(None, time.perf_counter() - started, cached=True, model=model)
+                llm_cache_hits.labels(service=service).inc()
+                yield cached["choices"][0]["message"]["content"]
+                return
+        
+        estimated_tokens = rate_limiter.estimate_tokens(payload)
+        
+        async def request() -> AsyncIterator[str]:
+            # Reserved before hedging, so attempts are timed from here
+            rate_limit_wait = await rate_limiter.acquire(model, estimated_tokens)
+            hedged = request_hedger.stream(
+                (service, model),
+                lambda: self._stream_completion(payload, timeout, service, started, cache_key, rate_limit_wait),
+                reserve=lambda: rate_limiter.try_acquire(model, estimated_tokens)
+            )
+            async with aclosing(hedged):
+                async for delta in hedged:
+                    yield delta
+        
+        stream = single_flight.stream(
+            cache_key,
+            request,
+            shared=lambda: self._record_shared(service, model, started)
+        )
+        async with aclosing(stream):
+            async for delta in stream:
+                yield delta
+    
+    async def _stream_completion(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float],
+        service: str,
+        started: float,
+        cache_key: str,
+        rate_limit_wait: float
+    ) -> AsyncIterator[str]:
+        """
+        One attempt of stream_chat_completion(): sent on rate limit capacity
+        the caller reserved, retried on 429 before the stream starts,
+        recorded in the metrics and cached once complete.
+        
+        Args:
+            payload: OpenAI-compatible chat completion payload
+            timeout: Optional per-request timeout in seconds
+            service: Calling service for metrics
+            started: perf_counter() when the call started
+            cache_key: LLM cache key of the payload
+            rate_limit_wait: Seconds the caller waited for the reservation
+        
+        Yields:
+            Content deltas
+        """
+        model = payload.get("model", settings.groq_model)
+        estimated_tokens = rate_limiter.estimate_tokens(payload)
+        
+        for attempt in range(settings.groq_max_retries + 1):
+            if attempt:
+                rate_limit_wait += await rate_limiter.acquire(model, estimated_tokens)
+            actual_tokens = 0
+            sent = time.perf_counter()
+            status = "error"
+            try:
+                async with self.client.stream(
+                    "POST",
+                    settings.groq_api_url,
+                    json={**payload, "stream": True},
+                    timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+                ) as response:
+                    status = str(response.status_code)
+                    if response.status_code == 429 and attempt < settings.groq_max_retries:
+                        retry_after = parse_retry_after(response.headers.get("retry-after"))
+                        if retry_after is None:
+                            retry_after = 2.0 ** attempt
+                        rate_limiter.penalize(model, retry_after)
+                        print(f"Groq rate limit hit for {model}, retrying in {retry_after:.1f}s")
+                        continue
+                    
+                    if response.is_error:
+                        await response.aread()
+                        response.raise_for_status()
+                    
+                    # The tokens were spent once the stream started
+                    actual_tokens = estimated_tokens
+                    # Only collected when the response is cached
+                    parts = [] if llm_cache.enabled else None
+                    finish_reason = None
+                    usage = None
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        # Groq reports usage on the last chunk under x_groq
+                        usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                        for choice in chunk.get("choices") or []:
+                            finish_reason = choice.get("finish_reason") or finish_reason
+                            delta = (choice.get("delta") or {}).get("content")
+                            if delta:
+                                if parts is not None:
+                                    parts.append(delta)
+                                yield delta
+                    
+                    actual_tokens = (usage or {}).get("total_tokens", estimated_tokens)
+                    record_llm_call(usage, time.perf_counter() - started, rate_limit_wait, model=model)
+                    record_llm_usage(service, usage)
+                    if parts is not None:
+                        # Store in the non-streaming response shape
+                        await llm_cache.set(cache_key, {
+                            "model": model,
+                            "choices": [{
+                                "index": 0,
+                                "message": {"role": "assistant", "content": "".join(parts)},
+                                "finish_reason": finish_reason
+                            }],
+                            "usage": usage or {}
+                        })
+                    return
+            finally:
+                # A stream is timed until its last chunk (or the failure)
+                llm_request_duration.labels(service=service, status=status).observe(time.perf_counter() - sent)
+                rate_limiter.record_usage(model, estimated_tokens, actual_tokens)
+        
+        # Unreachable: the last attempt either returns or raises
+        raise RuntimeError("Groq request retries exhausted")
+
+
+# Global Groq client instance
+groq_client = GroqClient()
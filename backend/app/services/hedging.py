@@ -0,0 +1,296 @@
+"""
+Hedged requests for Groq API calls.
+When a call takes longer than a percentile of recently observed latency, a
+duplicate is issued; the first response wins and the other is cancelled.
+Hedges are paid for from a budget that grows with ordinary requests, which
+caps the extra load they add. Callers reserve rate limit capacity before the
+race, so attempts are timed from when they are sent; a hedge is only issued
+when the limiter has capacity for it right away. Streams are hedged on their first chunk: once
+content has started arriving, the stream is committed to.
+"""
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+import asyncio
+import time
+
+from app.config import settings
+from app.services.metrics import llm_hedges
+
+
+# Returned by a stream's first step when it ended without content
+_END = object()
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies."""
+    
+    def __init__(self, window: int):
+        """
+        Create an empty tracker.
+        
+        Args:
+            window: Latencies kept
+        """
+        self._samples: Deque[float] = deque(maxlen=max(1, window))
+    
+    def observe(self, seconds: float) -> None:
+        """Record a latency."""
+        self._samples.append(seconds)
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the window (0 when empty)."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(len(ordered) * percent / 100.0 + 0.5) - 1))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """Credits for hedges: every ordinary request earns `ratio` of one hedge."""
+    
+    def __init__(self, ratio: float, max_credits: float = 10.0):
+        """
+        Create an empty budget.
+        
+        Args:
+            ratio: Hedges allowed per ordinary request (0.05: at most 5%
+                extra requests)
+            max_credits: Credits saved up for bursts of slow calls
+        """
+        self.ratio = ratio
+        self.max_credits = max_credits
+        self.credits = 0.0
+    
+    def deposit(self) -> None:
+        """Earn credit for an ordinary request."""
+        self.credits = min(self.max_credits, self.credits + self.ratio)
+    
+    def available(self) -> bool:
+        """Whether there is credit for one hedge."""
+        return self.credits >= 1.0
+    
+    def spend(self) -> None:
+        """Take the credit for one hedge."""
+        self.credits -= 1.0
+
+
+class RequestHedger:
+    """Races a duplicate against calls slower than their recent percentile."""
+    
+    def __init__(
+        self,
+        enabled: bool,
+        percentile: float = 95.0,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay: float = 1.0,
+        budget: float = 0.05
+    ):
+        """
+        Initialize the hedger.
+        
+        Args:
+            enabled: Hedge at all; when False calls pass straight through
+            percentile: Latency percentile after which a hedge is issued
+            window: Recent latencies kept per service and model
+            min_samples: Latencies needed before hedging starts
+            min_delay: Never hedge sooner than this many seconds
+            budget: Hedges allowed per ordinary request
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget = HedgeBudget(budget)
+        self._trackers: Dict[Hashable, LatencyTracker] = {}
+    
+    def hedge_delay(self, key: Hashable) -> Optional[float]:
+        """
+        Seconds after which a call should be hedged.
+        
+        Args:
+            key: Latency population, e.g. (kind, service, model)
+        
+        Returns:
+            Delay, or None while too few latencies are known
+        """
+        tracker = self._trackers.get(key)
+        if tracker is None or len(tracker) < self.min_samples:
+            return None
+        return max(self.min_delay, tracker.percentile(self.percentile))
+    
+    def observe(self, key: Hashable, seconds: float) -> None:
+        """Record the latency of a completed call."""
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = self._trackers[key] = LatencyTracker(self.window)
+        tracker.observe(seconds)
+    
+    async def call(
+        self,
+        key: Tuple[str, str],
+        start: Callable[[], Awaitable[Any]],
+        reserve: Callable[[], bool]
+    ) -> Any:
+        """
+        Await a call, hedging it if it runs long.
+        
+        Args:
+            key: (service, model) the call belongs to
+            start: Starts one attempt of the call, with its rate limit
+                capacity already reserved
+            reserve: Reserves rate limit capacity for a hedge without
+                waiting; returns False when there is none
+        
+        Returns:
+            Result of the first attempt to succeed
+        """
+        if not self.enabled:
+            return await start()
+        result, _ = await self._race(("completion",) + key, lambda: (start(), None), _no_cleanup, reserve)
+        return result
+    
+    async def stream(
+        self,
+        key: Tuple[str, str],
+        start: Callable[[], AsyncIterator[str]],
+        reserve: Callable[[], bool]
+    ) -> AsyncIterator[str]:
+        """
+        Iterate a stream, hedging it if its first chunk runs long.
+        
+        Args:
+            key: (service, model) the stream belongs to
+            start: Opens one attempt of the stream, with its rate limit
+                capacity already reserved
+            reserve: Reserves rate limit capacity for a hedge without
+                waiting; returns False when there is none
+        
+        Yields:
+            Chunks of the stream that produced a chunk first
+        """
+        if not self.enabled:
+            stream = start()
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+            return
+        
+        def launch():
+            stream = start()
+            return _first_chunk(stream), stream
+        
+        first, stream = await self._race(("first_chunk",) + key, launch, _close_stream, reserve)
+        try:
+            if first is _END:
+                return
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    async def _race(
+        self,
+        key: Tuple[str, ...],
+        launch: Callable[[], Tuple[Awaitable[Any], Any]],
+        cleanup: Callable[[Any], Awaitable[None]],
+        reserve: Callable[[], bool]
+    ) -> Tuple[Any, Any]:
+        """
+        Run an attempt and, if it is slower than the hedge delay and both
+        the budget and the rate limiter allow, a second one; return the
+        first to succeed.
+        
+        Args:
+            key: Latency population (kind, service, model)
+            launch: Starts an attempt, returning its awaitable and a handle
+            cleanup: Releases the handle of an attempt that lost or failed
+            reserve: Reserves rate limit capacity for the second attempt
+        
+        Returns:
+            Tuple of (result, handle) of the winning attempt
+        """
+        self.budget.deposit()
+        delay = self.hedge_delay(key)
+        attempts: Dict[asyncio.Future, Tuple[Any, float, bool]] = {}
+        
+        def begin(is_hedge: bool) -> None:
+            awaitable, handle = launch()
+            attempts[asyncio.ensure_future(awaitable)] = (handle, time.perf_counter(), is_hedge)
+        
+        begin(False)
+        started = time.perf_counter()
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while attempts:
+                timeout = None
+                if delay is not None and not hedged:
+                    timeout = max(0.0, delay - (time.perf_counter() - started))
+                done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The call is slower than usual; a hedge that would queue
+                    # behind the rate limiter could not win
+                    if self.budget.available() and reserve():
+                        self.budget.spend()
+                        begin(True)
+                        hedged = True
+                    else:
+                        llm_hedges.labels(service=key[1], outcome="skipped").inc()
+                        delay = None
+                    continue
+                
+                for task in done:
+                    handle, began, is_hedge = attempts.pop(task)
+                    if task.exception() is None:
+                        self.observe(key, time.perf_counter() - began)
+                        if hedged:
+                            llm_hedges.labels(service=key[1], outcome="won" if is_hedge else "lost").inc()
+                        return task.result(), handle
+                    error = error or task.exception()
+                    await cleanup(handle)
+            raise error
+        finally:
+            # Cancel the attempt that lost
+            for task in attempts:
+                task.cancel()
+            if attempts:
+                await asyncio.gather(*attempts, return_exceptions=True)
+                for handle, _, _ in attempts.values():
+                    await cleanup(handle)
+
+
+async def _first_chunk(stream: AsyncIterator[str]) -> Any:
+    """First chunk of a stream, or _END if it ended without one."""
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+async def _close_stream(stream: AsyncIterator[str]) -> None:
+    """Close a losing or failed stream."""
+    await stream.aclose()
+
+
+async def _no_cleanup(handle: Any) -> None:
+    """Nothing to release for plain calls."""
+
+
+# Global request hedger
+request_hedger = RequestHedger(
+    enabled=settings.groq_hedging_enabled,
+    percentile=settings.groq_hedge_percentile,
+    window=settings.groq_hedge_window,
+    min_samples=settings.groq_hedge_min_samples,
+    min_delay=settings.groq_hedge_min_delay,
+    budget=settings.groq_hedge_budget
+)
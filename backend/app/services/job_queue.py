@@ -0,0 +1,249 @@
+"""
+Durable generation job queue backed by PostgreSQL.
+Jobs are claimed with FOR UPDATE SKIP LOCKED, kept alive by heartbeats that
+extend a lease, and re-queued when a worker dies and its lease expires.
+"""
+from typing import Dict, Any, List, Optional
+import json
+import uuid
+
+from tortoise import connections
+
+from app.config import settings
+from app.db.models import GenerationJob, Project
+
+
+# Job kinds and the generator method each one runs
+JOB_KINDS = ("generate", "regenerate", "resume")
+
+
+class JobQueue:
+    """Enqueues, claims and settles generation jobs."""
+    
+    def __init__(self, lease_seconds: int, max_attempts: int):
+        """
+        Initialize the queue.
+        
+        Args:
+            lease_seconds: How long a claimed job stays owned without a heartbeat
+            max_attempts: Claims allowed before an expiring job is failed
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+    
+    @staticmethod
+    def _connection():
+        return connections.get("default")
+    
+    async def enqueue(
+        self,
+        project_id: uuid.UUID,
+        kind: str,
+        options: Optional[Dict[str, Any]] = None
+    ) -> GenerationJob:
+        """
+        Queue a generation run.
+        
+        Args:
+            project_id: UUID of the project
+            kind: One of JOB_KINDS
+            options: Keyword arguments for the generator method
+        
+        Returns:
+            The created job
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        return await GenerationJob.create(
+            project_id=project_id,
+            kind=kind,
+            options=options or {},
+            max_attempts=self.max_attempts
+        )
+    
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim the oldest runnable job: a queued one, or a running one whose
+        lease expired because its worker stopped heartbeating.
+        
+        Args:
+            worker_id: Identifier of the claiming worker
+        
+        Returns:
+            Dict with id, project_id, kind, options, attempts, interrupted
+            (True if an earlier claim started the job) and queue_wait (seconds
+            since the job was enqueued, None for a re-claimed job), or None if
+            there is nothing to run
+        """
+        rows = await self._connection().execute_query_dict(
+            """
+            WITH next AS (
+                SELECT id, started_at FROM generation_jobs
+                WHERE (status = 'QUEUED'
+                       OR (status = 'RUNNING' AND lease_expires_at < NOW()))
+                  AND attempts < max_attempts
+                ORDER BY created_at
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            UPDATE generation_jobs AS job
+            SET status = 'RUNNING',
+                worker_id = $1,
+                attempts = job.attempts + 1,
+                heartbeat_at = NOW(),
+                lease_expires_at = NOW() + ($2::integer * INTERVAL '1 second'),
+                started_at = COALESCE(job.started_at, NOW())
+            FROM next
+            WHERE job.id = next.id
+            RETURNING job.id, job.project_id, job.kind, job.options, job.attempts,
+                      next.started_at IS NOT NULL AS interrupted,
+                      CASE WHEN next.started_at IS NULL
+                           THEN EXTRACT(EPOCH FROM (NOW() - job.created_at))::float8
+                      END AS queue_wait
+            """,
+            [worker_id, self.lease_seconds]
+        )
+        if not rows:
+            return None
+        job = dict(rows[0])
+        if isinstance(job["options"], str):
+            job["options"] = json.loads(job["options"])
+        return job
+    
+    async def heartbeat(self, job_id: uuid.UUID, worker_id: str) -> bool:
+        """
+        Extend the lease of a running job.
+        
+        Args:
+            job_id: UUID of the job
+            worker_id: Worker that claimed the job
+        
+        Returns:
+            False if the worker no longer owns the job (its lease expired and
+            another worker claimed it)
+        """
+        rows = await self._connection().execute_query_dict(
+            """
+            UPDATE generation_jobs
+            SET heartbeat_at = NOW(),
+                lease_expires_at = NOW() + ($3::integer * INTERVAL '1 second')
+            WHERE id = $1 AND worker_id = $2 AND status = 'RUNNING'
+            RETURNING id
+            """,
+            [job_id, worker_id, self.lease_seconds]
+        )
+        return bool(rows)
+    
+    async def finish(
+        self,
+        job_id: uuid.UUID,
+        worker_id: str,
+        status: str,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Settle a job the worker still owns.
+        
+        Args:
+            job_id: UUID of the job
+            worker_id: Worker that claimed the job
+            status: DONE or FAILED
+            error: Failure description
+        """
+        await self._connection().execute_query(
+            """
+            UPDATE generation_jobs
+            SET status = $3, error = $4, finished_at = NOW(), lease_expires_at = NULL
+            WHERE id = $1 AND worker_id = $2 AND status = 'RUNNING'
+            """,
+            [job_id, worker_id, status, error]
+        )
+    
+    async def release(self, job_id: uuid.UUID, worker_id: str) -> None:
+        """
+        Hand a job back to the queue without counting the attempt, e.g.
+        when a worker shuts down mid-run.
+        
+        Args:
+            job_id: UUID of the job
+            worker_id: Worker that claimed the job
+        """
+        await self._connection().execute_query(
+            """
+            UPDATE generation_jobs
+            SET status = 'QUEUED', worker_id = NULL, lease_expires_at = NULL,
+                attempts = GREATEST(attempts - 1, 0)
+            WHERE id = $1 AND worker_id = $2 AND status = 'RUNNING'
+            """,
+            [job_id, worker_id]
+        )
+    
+    async def reap_expired(self) -> List[uuid.UUID]:
+        """
+        Fail jobs whose lease expired after their last allowed attempt and
+        mark their projects as failed.
+        
+        Returns:
+            Project UUIDs of the failed jobs
+        """
+        rows = await self._connection().execute_query_dict(
+            """
+            UPDATE generation_jobs
+            SET status = 'FAILED',
+                error = 'Worker lease expired after ' || attempts || ' attempts',
+                finished_at = NOW(),
+                lease_expires_at = NULL
+            WHERE status = 'RUNNING'
+              AND lease_expires_at < NOW()
+              AND attempts >= max_attempts
+            RETURNING project_id
+            """
+        )
+        project_ids = [row["project_id"] for row in rows]
+        if project_ids:
+            await Project.filter(id__in=project_ids, status="GENERATING").update(
+                status="FAILED",
+                current_step="Generation worker stopped responding"
+            )
+        return project_ids
+    
+    async def has_active_job(self, project_id: uuid.UUID) -> bool:
+        """
+        Check whether a project has a queued job or one held by a live worker.
+        
+        Args:
+            project_id: UUID of the project
+        
+        Returns:
+            True if a run is queued or in progress
+        """
+        rows = await self._connection().execute_query_dict(
+            """
+            SELECT 1 FROM generation_jobs
+            WHERE project_id = $1
+              AND (status = 'QUEUED'
+                   OR (status = 'RUNNING' AND lease_expires_at >= NOW()))
+            LIMIT 1
+            """,
+            [project_id]
+        )
+        return bool(rows)
+    
+    async def depth(self) -> Dict[str, int]:
+        """
+        Count jobs waiting and running.
+        
+        Returns:
+            Dict with queued and running counts
+        """
+        return {
+            "queued": await GenerationJob.filter(status="QUEUED").count(),
+            "running": await GenerationJob.filter(status="RUNNING").count()
+        }
+
+
+# Global job queue instance
+job_queue = JobQueue(
+    lease_seconds=settings.job_lease_seconds,
+    max_attempts=settings.job_max_attempts
+)
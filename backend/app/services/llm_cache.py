@@ -0,0 +1,259 @@
+"""
+Content-addressed cache for LLM responses.
+Responses are keyed by a hash of the model, prompts and sampling parameters,
+stored on disk with a byte budget and TTL, and fronted by an in-memory LRU.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import settings
+
+
+class LLMCache:
+    """Two-level (memory LRU + disk) cache of chat completion responses."""
+    
+    # Payload fields that never influence the completion content
+    IGNORED_FIELDS = ("stream", "stream_options", "user")
+    
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        memory_max_bytes: int,
+        ttl_seconds: int,
+        enabled: bool = True
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            directory: Directory for cache entries
+            max_bytes: Byte budget for entries on disk
+            memory_max_bytes: Byte budget for the in-memory LRU front
+            ttl_seconds: Entry lifetime in seconds (0 = no expiry)
+            enabled: Disable to turn every lookup into a miss
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        
+        # key -> (stored_at, size, response)
+        self._memory: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._eviction_lock = asyncio.Lock()
+        
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @classmethod
+    def make_key(cls, payload: Dict[str, Any]) -> str:
+        """
+        Build the content address of a chat completion request.
+        
+        Args:
+            payload: Chat completion payload (model, messages, sampling params)
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        material = {k: v for k, v in payload.items() if k not in cls.IGNORED_FIELDS}
+        canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def _path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+    
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+    
+    def _remember(self, key: str, stored_at: float, size: int, response: Dict[str, Any]) -> None:
+        """Insert into the memory LRU, evicting least recently used entries."""
+        if size > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous:
+            self._memory_bytes -= previous[1]
+        self._memory[key] = (stored_at, size, response)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _, (_, evicted_size, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+    
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry:
+            self._memory_bytes -= entry[1]
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Key from make_key()
+        
+        Returns:
+            Cached response, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, _, response = entry
+            if not self._expired(stored_at):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return response
+            self._forget(key)
+        
+        loaded = await asyncio.to_thread(self._read_disk, key)
+        if loaded is None:
+            self.misses += 1
+            return None
+        
+        stored_at, size, response = loaded
+        self._remember(key, stored_at, size, response)
+        self.hits += 1
+        return response
+    
+    async def set(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response.
+        
+        Args:
+            key: Key from make_key()
+            response: Parsed chat completion response
+        """
+        if not self.enabled:
+            return
+        
+        stored_at = time.time()
+        data = json.dumps({"stored_at": stored_at, "response": response}, ensure_ascii=False).encode("utf-8")
+        self._remember(key, stored_at, len(data), response)
+        
+        try:
+            written = await asyncio.to_thread(self._write_disk, key, data)
+        except OSError as e:
+            print(f"Failed to write LLM cache entry {key}: {e}")
+            return
+        
+        if self._disk_bytes is not None:
+            self._disk_bytes += written
+        if self._disk_bytes is None or self._disk_bytes > self.max_bytes:
+            async with self._eviction_lock:
+                evicted = await asyncio.to_thread(self._evict_disk)
+            for evicted_key in evicted:
+                self._forget(evicted_key)
+    
+    def _read_disk(self, key: str) -> Optional[Tuple[float, int, Dict[str, Any]]]:
+        path = self._path_for(key)
+        try:
+            data = path.read_bytes()
+            entry = json.loads(data)
+        except (OSError, ValueError):
+            return None
+        
+        stored_at = entry.get("stored_at", 0)
+        if self._expired(stored_at):
+            self._unlink(path)
+            return None
+        
+        # Refresh mtime so disk eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return stored_at, len(data), entry["response"]
+    
+    def _write_disk(self, key: str, data: bytes) -> int:
+        """Write an entry atomically; returns the change in bytes on disk."""
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        previous = path.stat().st_size if path.exists() else 0
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return len(data) - previous
+    
+    def _unlink(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        if self._disk_bytes is not None:
+            self._disk_bytes -= size
+    
+    def _evict_disk(self) -> List[str]:
+        """
+        Drop expired entries, then least recently used ones, until under budget.
+        Runs in a worker thread; returns the evicted keys.
+        """
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        
+        # Leave some headroom so we do not rescan on every write
+        target = int(self.max_bytes * 0.9)
+        entries.sort()
+        evicted = []
+        for mtime, size, path in entries:
+            if total <= target and not (self.ttl_seconds > 0 and time.time() - mtime > self.ttl_seconds):
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+            evicted.append(path.stem)
+        self._disk_bytes = total
+        return evicted
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict with hit/miss counters and memory/disk usage
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes
+        }
+
+
+# Global LLM cache instance
+llm_cache = LLMCache(
+    directory=settings.llm_cache_dir,
+    max_bytes=settings.llm_cache_max_bytes,
+    memory_max_bytes=settings.llm_cache_memory_bytes,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    enabled=settings.llm_cache_enabled
+)
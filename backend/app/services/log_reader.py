@@ -0,0 +1,112 @@
+"""
+Keyset-paginated reads of generation logs.
+Pages are ordered by (timestamp, id) and continue from an opaque cursor, so
+each page is a range scan over the (project_id, timestamp, id) index
+regardless of how many log lines precede it.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import uuid
+
+from tortoise import connections
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(timestamp: datetime, log_id: uuid.UUID) -> str:
+    """
+    Encode the position of a log line as a cursor.
+    
+    Args:
+        timestamp: Timestamp of the log line
+        log_id: Id of the log line
+    
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{timestamp.isoformat()}|{log_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor from encode_cursor().
+    
+    Args:
+        cursor: Cursor string
+    
+    Returns:
+        Tuple of (timestamp, log id)
+    
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        timestamp, log_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), uuid.UUID(log_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+class GenerationLogReader:
+    """Reads pages of a project's generation logs."""
+    
+    @staticmethod
+    async def page(
+        project_id: uuid.UUID,
+        since: Optional[str] = None,
+        step: Optional[str] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Read the log lines after a cursor, oldest first.
+        
+        Args:
+            project_id: UUID of the project
+            since: Cursor of the last line already read (None: from the start)
+            step: Only lines of this step
+            limit: Maximum lines returned
+        
+        Returns:
+            Dict with "logs" (id, step, message, timestamp), "next_cursor"
+            (position after the page; the given cursor if the page is empty,
+            so tailing clients can keep polling with it) and "has_more"
+        
+        Raises:
+            InvalidCursorError: If `since` is malformed
+        """
+        conditions = ["project_id = $1"]
+        params: List[Any] = [project_id]
+        if step is not None:
+            params.append(step)
+            conditions.append(f"step = ${len(params)}")
+        if since:
+            timestamp, log_id = decode_cursor(since)
+            params.extend([timestamp, log_id])
+            # Row comparison keeps this a single index range scan
+            conditions.append(f"(timestamp, id) > (${len(params) - 1}, ${len(params)})")
+        params.append(limit + 1)
+        
+        rows = await connections.get("default").execute_query_dict(
+            f"""
+            SELECT id, step, message, timestamp
+            FROM generation_logs
+            WHERE {" AND ".join(conditions)}
+            ORDER BY timestamp, id
+            LIMIT ${len(params)}
+            """,
+            params
+        )
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"]) if rows else since
+        return {"logs": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+
+# Global log reader instance
+log_reader = GenerationLogReader()
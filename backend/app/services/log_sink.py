@@ -0,0 +1,148 @@
+"""
+Write-behind sink for generation logs.
+Log lines are buffered per project and written with one bulk INSERT when a
+buffer fills up or has waited long enough, and whenever a caller needs them
+to be visible (status changes, end of a run, shutdown).
+"""
+from typing import Dict, List, Optional
+import asyncio
+import uuid
+
+from tortoise import timezone
+
+from app.config import settings
+from app.db.models import GenerationLog
+from app.services.run_metrics import stage
+
+
+class GenerationLogSink:
+    """Buffers GenerationLog rows per project and bulk-inserts them."""
+    
+    def __init__(self, max_entries: int = 50, flush_interval: float = 1.0):
+        """
+        Initialize the sink.
+        
+        Args:
+            max_entries: Buffered lines of a project that trigger a flush
+            flush_interval: Seconds a line may wait before it is flushed
+        """
+        self.max_entries = max(1, max_entries)
+        self.flush_interval = flush_interval
+        self._buffers: Dict[uuid.UUID, List[GenerationLog]] = {}
+        self._timers: Dict[uuid.UUID, asyncio.TimerHandle] = {}
+        self._locks: Dict[uuid.UUID, asyncio.Lock] = {}
+        self._tasks: set = set()
+    
+    async def log(self, project_id: uuid.UUID, step: str, message: str) -> None:
+        """
+        Buffer a log line; flushes the project's buffer if it is full.
+        
+        Args:
+            project_id: UUID of the project
+            step: Generation step
+            message: Log message
+        """
+        buffer = self._buffers.setdefault(project_id, [])
+        # The timestamp is taken now, not when the row is inserted, so
+        # ordering by timestamp stays the order the lines were logged in
+        buffer.append(GenerationLog(
+            project_id=project_id,
+            step=step,
+            message=message,
+            timestamp=timezone.now()
+        ))
+        if len(buffer) >= self.max_entries:
+            await self.flush(project_id)
+        elif project_id not in self._timers:
+            self._timers[project_id] = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._flush_later, project_id
+            )
+    
+    def _flush_later(self, project_id: uuid.UUID) -> None:
+        """Timer callback: flush a project's buffer in the background."""
+        self._timers.pop(project_id, None)
+        task = asyncio.create_task(self._flush_quietly(project_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _flush_quietly(self, project_id: uuid.UUID) -> None:
+        """Background flush; failures are retried by the next flush."""
+        try:
+            await self.flush(project_id)
+        except Exception as e:
+            print(f"Failed to flush generation logs for {project_id}: {e}")
+    
+    async def flush(self, project_id: Optional[uuid.UUID] = None) -> None:
+        """
+        Write buffered lines to the database. Lines that fail to insert are
+        put back in front of the buffer and retried by the next flush.
+        
+        Args:
+            project_id: Flush only this project (default: all projects)
+        """
+        project_ids = [project_id] if project_id is not None else list(self._buffers)
+        error: Optional[BaseException] = None
+        for pid in project_ids:
+            timer = self._timers.pop(pid, None)
+            if timer is not None:
+                timer.cancel()
+            
+            # One flush per project at a time keeps retried lines in order
+            async with self._locks.setdefault(pid, asyncio.Lock()):
+                entries = self._buffers.pop(pid, [])
+                if not entries:
+                    continue
+                try:
+                    with stage("db.logs"):
+                        await GenerationLog.bulk_create(entries)
+                except BaseException as e:
+                    self._buffers[pid] = entries + self._buffers.get(pid, [])
+                    if pid not in self._timers:
+                        self._timers[pid] = asyncio.get_running_loop().call_later(
+                            self.flush_interval, self._flush_later, pid
+                        )
+                    if not isinstance(e, Exception):
+                        raise
+                    error = error or e
+        if error is not None:
+            raise error
+    
+    def pending(self, project_id: Optional[uuid.UUID] = None) -> int:
+        """
+        Number of buffered lines not yet written.
+        
+        Args:
+            project_id: Count only this project (default: all projects)
+        
+        Returns:
+            Number of lines
+        """
+        if project_id is not None:
+            return len(self._buffers.get(project_id, []))
+        return sum(len(entries) for entries in self._buffers.values())
+    
+    async def close(self) -> None:
+        """Flush everything on shutdown; lines that cannot be written are printed."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Failed to flush generation logs on shutdown: {e}")
+            for entries in self._buffers.values():
+                for entry in entries:
+                    print(f"[{entry.timestamp}] {entry.project_id} {entry.step}: {entry.message}")
+            self._buffers.clear()
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+
+# Global log sink instance
+log_sink = GenerationLogSink(
+    max_entries=settings.log_buffer_max_entries,
+    flush_interval=settings.log_flush_interval
+)
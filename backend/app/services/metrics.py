@@ -0,0 +1,149 @@
+"""
+Process metrics exported with prometheus_client.
+Counters, gauges and histograms live in the application's registry and are
+rendered by GET /metrics. Values that live elsewhere (job queue depth,
+database pool usage) are refreshed by collectors right before each scrape.
+"""
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from tortoise import connections
+
+from app.services.job_queue import job_queue
+
+
+# Upper bounds (seconds) of latency histogram buckets; +Inf is added
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0, 120.0)
+PARSE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Registry of the application's metrics (not the client's default registry,
+# so only these are exported)
+metrics_registry = CollectorRegistry()
+
+# Coroutine functions that update metrics before a scrape
+_collectors: List[Callable[[], Awaitable[None]]] = []
+
+
+def add_collector(collector: Callable[[], Awaitable[None]]) -> None:
+    """
+    Register a coroutine function that updates metrics before a scrape.
+    
+    Args:
+        collector: Refreshes gauges from their source; failures are
+            printed and leave the previous values in place
+    """
+    _collectors.append(collector)
+
+
+async def render_metrics() -> bytes:
+    """
+    Run the collectors and render every metric.
+    
+    Returns:
+        Prometheus text exposition format (CONTENT_TYPE_LATEST)
+    """
+    for collector in _collectors:
+        try:
+            await collector()
+        except Exception as e:
+            print(f"Metrics collector {collector.__name__} failed: {e}")
+    return generate_latest(metrics_registry)
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response starts, by route template",
+    ("method", "route", "status"),
+    buckets=HTTP_BUCKETS,
+    registry=metrics_registry
+)
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds",
+    "Latency of AI completion requests by calling service and HTTP status (error: no response)",
+    ("service", "status"),
+    buckets=LLM_BUCKETS,
+    registry=metrics_registry
+)
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the AI provider by calling service and kind (prompt, completion)",
+    ("service", "kind"),
+    registry=metrics_registry
+)
+llm_cache_hits = Counter(
+    "llm_cache_hits_total",
+    "AI completions served from the LLM cache by calling service",
+    ("service",),
+    registry=metrics_registry
+)
+llm_shared_requests = Counter(
+    "llm_shared_requests_total",
+    "AI completions answered by an identical request already in flight, by calling service",
+    ("service",),
+    registry=metrics_registry
+)
+llm_hedges = Counter(
+    "llm_hedges_total",
+    "Slow AI requests by calling service and hedge outcome (won, lost: the original answered first, "
+    "skipped: no hedge budget or rate limit capacity left)",
+    ("service", "outcome"),
+    registry=metrics_registry
+)
+excel_parse_duration = Histogram(
+    "excel_parse_duration_seconds",
+    "Time to parse one specification Excel file",
+    ("outcome",),
+    buckets=PARSE_BUCKETS,
+    registry=metrics_registry
+)
+generations_in_flight = Gauge(
+    "generations_in_flight",
+    "Generation jobs running in this process",
+    registry=metrics_registry
+)
+generation_queue_depth = Gauge(
+    "generation_queue_depth",
+    "Generation jobs in the durable queue by state (all workers)",
+    ("state",),
+    registry=metrics_registry
+)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Database connection pool of this process (size: open, idle: not checked out, max: limit)",
+    ("state",),
+    registry=metrics_registry
+)
+
+
+def record_llm_usage(service: str, usage: Optional[Dict[str, int]]) -> None:
+    """
+    Count the tokens of a completion.
+    
+    Args:
+        service: Calling service (planner, codegen, optimizer)
+        usage: Provider `usage` object
+    """
+    usage = usage or {}
+    llm_tokens.labels(service=service, kind="prompt").inc(int(usage.get("prompt_tokens") or 0))
+    llm_tokens.labels(service=service, kind="completion").inc(int(usage.get("completion_tokens") or 0))
+
+
+async def _collect_queue_depth() -> None:
+    """Refresh the job queue depth."""
+    for state, count in (await job_queue.depth()).items():
+        generation_queue_depth.labels(state=state).set(count)
+
+
+async def _collect_db_pool() -> None:
+    """Refresh database pool usage from the asyncpg pool, once it exists."""
+    pool = getattr(connections.get("default"), "_pool", None)
+    if pool is None:
+        return
+    db_pool_connections.labels(state="size").set(pool.get_size())
+    db_pool_connections.labels(state="idle").set(pool.get_idle_size())
+    db_pool_connections.labels(state="max").set(pool.get_max_size())
+
+
+add_collector(_collect_queue_depth)
+add_collector(_collect_db_pool)
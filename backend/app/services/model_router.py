@@ -0,0 +1,153 @@
+"""
+Model routing for code generation.
+Every generated file is classified (config, docs, database, backend,
+frontend, other) and the category picks the model of its completion:
+boilerplate such as manifests, env templates and READMEs goes to a small fast
+model while application code stays on the default model. Routes can be
+overridden per tech stack.
+"""
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from app.config import settings
+from app.services.file_batcher import SMALL_FILE_NAMES, SMALL_FILE_EXTENSIONS
+
+
+# Route targets naming a configured model rather than a model id
+DEFAULT_TARGET = "default"
+FAST_TARGET = "fast"
+
+# Extensions of source code, which always stays on a core model even when
+# the file configures something (next.config.js, app/core/config.py)
+CODE_EXTENSIONS = (".py", ".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".vue", ".svelte", ".sql")
+
+# Configuration files without an extension besides the small file names
+CONFIG_FILE_NAMES = {"dockerfile", "makefile"}
+
+
+def classify_file(file_path: str) -> str:
+    """
+    Category of a generated file.
+    Only exact manifest names, dotfiles and non-code extensions count as
+    config; source code is classified by its path and extension whatever its
+    name, so it never goes to the fast model by default.
+    
+    Args:
+        file_path: Path of the file within its section
+    
+    Returns:
+        One of config, docs, database, backend, frontend, other
+    """
+    lowered = file_path.lower()
+    name = PurePosixPath(lowered).name
+    if lowered.endswith((".md", ".rst")):
+        return "docs"
+    if not name.endswith(CODE_EXTENSIONS) and (
+        name in SMALL_FILE_NAMES
+        or name in CONFIG_FILE_NAMES
+        or name.startswith(".")
+        or name.endswith(SMALL_FILE_EXTENSIONS)
+    ):
+        return "config"
+    if "database" in lowered or lowered.endswith(".sql"):
+        return "database"
+    if "backend" in lowered or lowered.endswith(".py"):
+        return "backend"
+    if "frontend" in lowered or lowered.endswith((".tsx", ".ts", ".jsx", ".js")):
+        return "frontend"
+    return "other"
+
+
+class ModelRouter:
+    """Picks the model of a code generation call from its file category."""
+    
+    def __init__(
+        self,
+        default_model: str,
+        fast_model: str,
+        routes: Mapping[str, str],
+        stack_routes: Optional[Mapping[str, Mapping[str, str]]] = None
+    ):
+        """
+        Initialize the router.
+        
+        Args:
+            default_model: Model of unrouted categories
+            fast_model: Model behind the "fast" target
+            routes: File category to target ("fast", "default" or a model
+                id); empty disables routing
+            stack_routes: Tech stack keyword to route overrides, applied
+                when the keyword occurs in the framework or tech stack
+                (case-insensitive)
+        """
+        self.default_model = default_model
+        self.fast_model = fast_model
+        self.routes = dict(routes)
+        self.stack_routes = {keyword.lower(): dict(overrides) for keyword, overrides in (stack_routes or {}).items()}
+    
+    def _resolve(self, target: str) -> str:
+        """Model id of a route target."""
+        if target == FAST_TARGET:
+            return self.fast_model
+        if target == DEFAULT_TARGET:
+            return self.default_model
+        return target
+    
+    def routes_for(self, framework: str = "", tech_stack: str = "") -> Dict[str, str]:
+        """
+        Effective routes of a tech stack.
+        
+        Args:
+            framework: Framework of the file's section
+            tech_stack: Tech stack of the project as text
+        
+        Returns:
+            File category to target
+        """
+        routes = dict(self.routes)
+        stack = f"{framework} {tech_stack}".lower()
+        for keyword, overrides in self.stack_routes.items():
+            if keyword in stack:
+                routes.update(overrides)
+        return routes
+    
+    def route(self, file_path: str, framework: str = "", tech_stack: str = "") -> Tuple[str, str]:
+        """
+        Model of a file.
+        
+        Args:
+            file_path: Path of the file within its section
+            framework: Framework of the file's section
+            tech_stack: Tech stack of the project as text
+        
+        Returns:
+            Tuple of (model, category)
+        """
+        category = classify_file(file_path)
+        target = self.routes_for(framework, tech_stack).get(category, DEFAULT_TARGET)
+        return self._resolve(target), category
+    
+    def route_batch(self, file_paths: Iterable[str], framework: str = "", tech_stack: str = "") -> str:
+        """
+        Model of a batch of files sharing one completion: the routed model if
+        all files agree on it, otherwise the default model.
+        
+        Args:
+            file_paths: Paths of the files within their section
+            framework: Framework of the section
+            tech_stack: Tech stack of the project as text
+        
+        Returns:
+            Model id
+        """
+        models = {self.route(path, framework, tech_stack)[0] for path in file_paths}
+        return models.pop() if len(models) == 1 else self.default_model
+
+
+# Global model router
+model_router = ModelRouter(
+    default_model=settings.groq_model,
+    fast_model=settings.groq_fast_model,
+    routes=settings.groq_model_routes,
+    stack_routes=settings.groq_model_stack_routes
+)
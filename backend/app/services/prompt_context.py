@@ -0,0 +1,182 @@
+"""
+Per-run prompt context for code generation.
+Everything that is identical across the file prompts of a run (serialized spec
+sections, spec rows, the project summary, related-file listings) is computed
+once when the run starts and shared read-only by all file prompts.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
+import json
+
+from app.db.models import ProjectSpec
+from app.services.blueprint_graph import BlueprintGraph
+from app.services.spec_slicer import SpecIndex, SLICED_CATEGORIES
+
+
+def compact_json(data: Any) -> str:
+    """
+    Serialize to minified JSON for prompts. Empty cells (None) are dropped
+    from spec rows, since they carry no information for the model.
+    
+    Args:
+        data: JSON-compatible value
+    
+    Returns:
+        JSON without insignificant whitespace
+    """
+    return json.dumps(_drop_empty(data), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _drop_empty(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {key: _drop_empty(value) for key, value in data.items() if value is not None}
+    if isinstance(data, list):
+        return [_drop_empty(item) for item in data]
+    return data
+
+
+@dataclass(frozen=True)
+class FilePromptSections:
+    """Serialized prompt sections for one file."""
+    
+    features: str
+    apis: str
+    database: str
+    tech_stack: str
+    related_files: str
+    summary: str = ""
+
+
+@dataclass(frozen=True)
+class PromptContext:
+    """Immutable prompt material shared by every file prompt of a run."""
+    
+    project_name: str
+    summary: str
+    tech_stack: str
+    # category -> whole category, serialized
+    full_sections: Mapping[str, str]
+    # category -> serialized rows as (sheet, row json), in workbook order
+    row_sections: Mapping[str, Tuple[Tuple[str, str], ...]]
+    # file key -> listing of the other files in its section
+    related_files: Mapping[str, str]
+    spec_index: SpecIndex
+    
+    @classmethod
+    def build(
+        cls,
+        project_name: str,
+        specs: Dict[str, Any],
+        graph: BlueprintGraph
+    ) -> "PromptContext":
+        """
+        Serialize the specs and file listings of a run once.
+        
+        Args:
+            project_name: Name of the project
+            specs: Parsed specs keyed by category ("features", "apis",
+                "database", "tech_stack")
+            graph: Blueprint graph of the run
+        
+        Returns:
+            Prompt context for the run
+        """
+        spec_index = SpecIndex(specs, graph)
+        
+        full_sections = {}
+        row_sections = {}
+        for category in SLICED_CATEGORIES:
+            full_sections[category] = compact_json(specs.get(category)) if specs.get(category) else ""
+            row_sections[category] = tuple(
+                (sheet, compact_json(row)) for sheet, row, _ in spec_index.rows(category)
+            )
+        
+        # One listing per section; each file gets it without its own line
+        related_files = {}
+        lines_by_section: Dict[int, List[Tuple[str, str]]] = {}
+        for key, job in graph.nodes.items():
+            section = id(job.section_files)
+            if section not in lines_by_section:
+                lines_by_section[section] = [
+                    (path, f"- {path}: {purpose}") for path, purpose in job.section_files.items()
+                ]
+            related_files[key] = "\n".join(
+                line for path, line in lines_by_section[section] if path != job.file_path
+            )
+        
+        tech_stack = specs.get("tech_stack")
+        return cls(
+            project_name=project_name,
+            summary=spec_index.summary,
+            tech_stack=compact_json(tech_stack) if tech_stack else "",
+            full_sections=MappingProxyType(full_sections),
+            row_sections=MappingProxyType(row_sections),
+            related_files=MappingProxyType(related_files),
+            spec_index=spec_index
+        )
+    
+    @classmethod
+    def from_spec(cls, project_name: str, spec: ProjectSpec, graph: BlueprintGraph) -> "PromptContext":
+        """
+        Build the context from a project's stored specs.
+        
+        Args:
+            project_name: Name of the project
+            spec: Parsed specifications of the project
+            graph: Blueprint graph of the run
+        
+        Returns:
+            Prompt context for the run
+        """
+        return cls.build(
+            project_name,
+            {
+                "features": spec.features_json or {},
+                "apis": spec.apis_json or {},
+                "database": spec.database_json or {},
+                "tech_stack": spec.tech_stack_json or {}
+            },
+            graph
+        )
+    
+    def sections_for(self, key: str) -> FilePromptSections:
+        """
+        Get the prompt sections of one file: its spec slices, assembled from
+        pre-serialized rows, and its related-file listing.
+        
+        Args:
+            key: File path relative to the project root (FileJob.key)
+        
+        Returns:
+            Serialized sections ("" for nothing relevant)
+        """
+        sections = {}
+        for category, positions in self.spec_index.positions_for(key).items():
+            if positions is None:
+                sections[category] = self.full_sections[category]
+            else:
+                sections[category] = self._join_rows(category, positions)
+        
+        return FilePromptSections(
+            features=sections["features"],
+            apis=sections["apis"],
+            database=sections["database"],
+            tech_stack=self.tech_stack,
+            related_files=self.related_files.get(key, ""),
+            summary=self.summary
+        )
+    
+    def _join_rows(self, category: str, positions: List[int]) -> str:
+        """Concatenate serialized rows into {"sheet":[row,...],...} JSON."""
+        if not positions:
+            return ""
+        rows = self.row_sections[category]
+        sheets: Dict[str, List[str]] = {}
+        for position in positions:
+            sheet, row = rows[position]
+            sheets.setdefault(sheet, []).append(row)
+        return "{" + ",".join(
+            f"{json.dumps(sheet, ensure_ascii=False)}:[{','.join(items)}]"
+            for sheet, items in sheets.items()
+        ) + "}"
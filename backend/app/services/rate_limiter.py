@@ -0,0 +1,249 @@
+"""
+Process-wide rate limiter for Groq API calls.
+Paces requests against the provider's requests-per-minute and tokens-per-minute
+quotas with one pair of token buckets per model.
+"""
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from app.config import settings
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to a per-minute capacity."""
+    
+    def __init__(self, per_minute: int):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            per_minute: Bucket capacity, refilled evenly over 60 seconds
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def consume(self, amount: float) -> None:
+        """Take tokens; the balance may go negative to record debt."""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+    
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+    
+    @property
+    def saturation(self) -> float:
+        """Fraction of the bucket currently in use (1.0 = exhausted)."""
+        self._refill()
+        return max(0.0, min(1.0, 1.0 - self.tokens / self.capacity))
+
+
+class _ModelLimits:
+    """Buckets and FIFO queue for a single model."""
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        # asyncio.Lock wakes waiters in FIFO order, which gives fair queueing
+        self.queue = asyncio.Lock()
+        self.waiting = 0
+        self.blocked_until = 0.0
+        self.throttled = 0
+
+
+class RateLimiter:
+    """Fair, per-model RPM/TPM limiter shared by all AI services."""
+    
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        overrides: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        """
+        Initialize the limiter.
+        
+        Args:
+            requests_per_minute: Default request quota per model (0 disables)
+            tokens_per_minute: Default token quota per model (0 disables)
+            overrides: Optional per-model quotas, e.g.
+                {"llama-3.1-8b-instant": {"rpm": 30, "tpm": 20000}}
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.overrides = overrides or {}
+        self._models: Dict[str, _ModelLimits] = {}
+    
+    def _limits_for(self, model: str) -> _ModelLimits:
+        limits = self._models.get(model)
+        if limits is None:
+            override = self.overrides.get(model, {})
+            limits = _ModelLimits(
+                override.get("rpm", self.requests_per_minute),
+                override.get("tpm", self.tokens_per_minute)
+            )
+            self._models[model] = limits
+        return limits
+    
+    @staticmethod
+    def estimate_tokens(payload: Dict[str, Any]) -> int:
+        """
+        Estimate the tokens a chat completion will count against the quota:
+        prompt characters / 4 plus the requested completion budget.
+        """
+        prompt_chars = sum(len(message.get("content") or "") for message in payload.get("messages", []))
+        return prompt_chars // 4 + int(payload.get("max_tokens") or 1024)
+    
+    async def acquire(self, model: str, estimated_tokens: int) -> float:
+        """
+        Wait until a request for `model` fits within its quotas, then reserve it.
+        Callers are served in arrival order.
+        
+        Args:
+            model: Model the request is sent to
+            estimated_tokens: Tokens reserved for the request
+        
+        Returns:
+            Seconds spent waiting
+        """
+        limits = self._limits_for(model)
+        started = time.monotonic()
+        limits.waiting += 1
+        try:
+            async with limits.queue:
+                while True:
+                    delay = limits.blocked_until - time.monotonic()
+                    if limits.requests:
+                        delay = max(delay, limits.requests.wait_time(1))
+                    if limits.tokens:
+                        delay = max(delay, limits.tokens.wait_time(estimated_tokens))
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                
+                if limits.requests:
+                    limits.requests.consume(1)
+                if limits.tokens:
+                    limits.tokens.consume(estimated_tokens)
+        finally:
+            limits.waiting -= 1
+        return time.monotonic() - started
+    
+    def try_acquire(self, model: str, estimated_tokens: int) -> bool:
+        """
+        Reserve a request for `model` only if it fits within its quotas now,
+        without waiting or overtaking queued callers.
+        
+        Args:
+            model: Model the request is sent to
+            estimated_tokens: Tokens reserved for the request
+        
+        Returns:
+            True if the request was reserved
+        """
+        limits = self._limits_for(model)
+        if limits.waiting or limits.blocked_until > time.monotonic():
+            return False
+        if limits.requests and limits.requests.wait_time(1) > 0:
+            return False
+        if limits.tokens and limits.tokens.wait_time(estimated_tokens) > 0:
+            return False
+        if limits.requests:
+            limits.requests.consume(1)
+        if limits.tokens:
+            limits.tokens.consume(estimated_tokens)
+        return True
+    
+    def record_usage(self, model: str, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Reconcile a reservation with the tokens the provider actually counted.
+        
+        Args:
+            model: Model the request was sent to
+            estimated_tokens: Tokens reserved in acquire()
+            actual_tokens: Tokens reported in the response `usage` (0 if the
+                request was rejected)
+        """
+        limits = self._limits_for(model)
+        if limits.tokens:
+            limits.tokens.adjust(estimated_tokens - actual_tokens)
+    
+    def penalize(self, model: str, retry_after: float) -> None:
+        """
+        Pause all requests for `model` after the provider answered 429.
+        
+        Args:
+            model: Throttled model
+            retry_after: Seconds to wait, from the Retry-After header
+        """
+        limits = self._limits_for(model)
+        limits.throttled += 1
+        limits.blocked_until = max(limits.blocked_until, time.monotonic() + retry_after)
+    
+    def saturation(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current saturation per model.
+        
+        Returns:
+            Dict of model -> bucket usage (0.0-1.0), queued callers, 429 count
+            and remaining back-off in seconds
+        """
+        now = time.monotonic()
+        snapshot = {}
+        for model, limits in self._models.items():
+            snapshot[model] = {
+                "requests": round(limits.requests.saturation, 3) if limits.requests else None,
+                "tokens": round(limits.tokens.saturation, 3) if limits.tokens else None,
+                "waiting": limits.waiting,
+                "throttled": limits.throttled,
+                "blocked_for": round(max(0.0, limits.blocked_until - now), 3)
+            }
+        return snapshot
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta seconds or HTTP date).
+    
+    Args:
+        value: Header value
+    
+    Returns:
+        Seconds to wait, or None if missing or unparsable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(
+    requests_per_minute=settings.groq_requests_per_minute,
+    tokens_per_minute=settings.groq_tokens_per_minute,
+    overrides=settings.groq_model_rate_limits
+)
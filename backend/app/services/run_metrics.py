@@ -0,0 +1,289 @@
+"""
+Per-run timing and token accounting for generation runs.
+A RunMetrics collector is bound to the running task through a context
+variable, so stages of the generator, per-file work and every AI call made on
+behalf of the run (including from the concurrent file tasks it spawns) are
+attributed to it without threading it through every call. The collected
+report is stored as a GenerationRun row when the run ends.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, Optional
+import time
+import uuid
+
+from tortoise import timezone
+
+from app.db.models import GenerationRun
+
+
+@dataclass
+class StageTiming:
+    """Accumulated wall time of a stage."""
+    
+    count: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class ModelUsage:
+    """AI calls of a run made with one model."""
+    
+    llm_calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_seconds: float = 0.0
+
+
+@dataclass
+class FileMetrics:
+    """Work done for one blueprint file (or one batch of small files)."""
+    
+    mode: str = "ai"  # ai | batch | template
+    # Model of the file's AI calls (routed by file category)
+    model: str = ""
+    seconds: float = 0.0
+    # Time waiting for a concurrency slot after the file became ready
+    queue_wait: float = 0.0
+    llm_calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_seconds: float = 0.0
+    # Time waiting for rate limiter capacity
+    rate_limit_wait: float = 0.0
+
+
+class RunMetrics:
+    """Collects stage timings and AI usage of one generation run."""
+    
+    def __init__(
+        self,
+        project_id: uuid.UUID,
+        kind: str,
+        job_id: Optional[uuid.UUID] = None,
+        queue_wait: Optional[float] = None
+    ):
+        """
+        Start collecting for a run.
+        
+        Args:
+            project_id: UUID of the project
+            kind: Run kind (generate, regenerate, resume)
+            job_id: Queue job running this generation
+            queue_wait: Seconds the job waited in the queue before a worker
+                claimed it
+        """
+        self.id = uuid.uuid4()
+        self.project_id = project_id
+        self.kind = kind
+        self.job_id = job_id
+        self.queue_wait = queue_wait or 0.0
+        self.status: Optional[str] = None
+        self.started_at = timezone.now()
+        self._started = time.perf_counter()
+        self.wall_seconds = 0.0
+        self.stages: Dict[str, StageTiming] = {}
+        self.files: Dict[str, FileMetrics] = {}
+        self.llm = FileMetrics(mode="total")
+        self.models: Dict[str, ModelUsage] = {}
+    
+    def add_stage(self, name: str, seconds: float) -> None:
+        """Add wall time to a stage."""
+        timing = self.stages.setdefault(name, StageTiming())
+        timing.count += 1
+        timing.seconds += seconds
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+    
+    def file(self, key: str, mode: str = "ai") -> FileMetrics:
+        """Get the metrics entry of a file, creating it on first use."""
+        entry = self.files.get(key)
+        if entry is None:
+            entry = self.files[key] = FileMetrics(mode=mode)
+        return entry
+    
+    def record_llm_call(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        seconds: float,
+        rate_limit_wait: float,
+        cached: bool,
+        file_key: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> None:
+        """Account one AI call to the run, its model and, if known, its file."""
+        targets = [self.llm]
+        if file_key is not None:
+            entry = self.file(file_key)
+            entry.model = model or entry.model
+            targets.append(entry)
+        if model:
+            usage = self.models.setdefault(model, ModelUsage())
+            usage.llm_calls += 1
+            usage.cache_hits += int(cached)
+            usage.prompt_tokens += prompt_tokens
+            usage.completion_tokens += completion_tokens
+            usage.llm_seconds += seconds
+        for target in targets:
+            target.llm_calls += 1
+            target.cache_hits += int(cached)
+            target.prompt_tokens += prompt_tokens
+            target.completion_tokens += completion_tokens
+            target.llm_seconds += seconds
+            target.rate_limit_wait += rate_limit_wait
+    
+    def finish(self, status: str) -> None:
+        """Stop the clock."""
+        self.status = status
+        self.wall_seconds = time.perf_counter() - self._started
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the run report.
+        
+        Returns:
+            JSON-compatible dict with totals, stages and per-file metrics
+        """
+        def rounded(values: Dict[str, Any]) -> Dict[str, Any]:
+            return {key: round(value, 4) if isinstance(value, float) else value for key, value in values.items()}
+        
+        totals = rounded(asdict(self.llm))
+        totals.pop("mode")
+        totals.pop("model")
+        totals.pop("seconds")
+        totals.pop("queue_wait")
+        return {
+            "kind": self.kind,
+            "status": self.status,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "queue_wait_seconds": round(self.queue_wait, 4),
+            "llm": totals,
+            "models": {model: rounded(asdict(usage)) for model, usage in self.models.items()},
+            "stages": {name: rounded(asdict(timing)) for name, timing in self.stages.items()},
+            "files": {key: rounded(asdict(entry)) for key, entry in self.files.items()},
+        }
+    
+    async def save(self) -> GenerationRun:
+        """
+        Store the run and its report.
+        
+        Returns:
+            The created GenerationRun
+        """
+        return await GenerationRun.create(
+            id=self.id,
+            project_id=self.project_id,
+            job_id=self.job_id,
+            kind=self.kind,
+            status=self.status or "UNKNOWN",
+            started_at=self.started_at,
+            finished_at=timezone.now(),
+            wall_seconds=self.wall_seconds,
+            queue_wait_seconds=self.queue_wait,
+            llm_calls=self.llm.llm_calls,
+            cache_hits=self.llm.cache_hits,
+            prompt_tokens=self.llm.prompt_tokens,
+            completion_tokens=self.llm.completion_tokens,
+            report=self.report()
+        )
+
+
+_current_run: ContextVar[Optional[RunMetrics]] = ContextVar("current_run", default=None)
+_current_file: ContextVar[Optional[str]] = ContextVar("current_file", default=None)
+
+
+def current_run() -> Optional[RunMetrics]:
+    """The run collecting metrics in this context, if any."""
+    return _current_run.get()
+
+
+def bind_run(metrics: RunMetrics) -> None:
+    """Collect metrics of the current task (and tasks it spawns) into `metrics`."""
+    _current_run.set(metrics)
+
+
+def add_stage(name: str, seconds: float) -> None:
+    """Add wall time to a stage of the current run (no-op outside a run)."""
+    metrics = _current_run.get()
+    if metrics is not None:
+        metrics.add_stage(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as a stage of the current run (no-op outside a run)."""
+    metrics = _current_run.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.stage(name):
+        yield
+
+
+@contextmanager
+def file_scope(key: str, mode: str = "ai", queue_wait: float = 0.0) -> Iterator[None]:
+    """
+    Attribute AI calls made in the enclosed block to a file, and time it.
+    
+    Args:
+        key: File key (or batch label)
+        mode: ai | batch | template
+        queue_wait: Seconds the file waited for a concurrency slot
+    """
+    metrics = _current_run.get()
+    if metrics is None:
+        yield
+        return
+    entry = metrics.file(key, mode)
+    entry.queue_wait += queue_wait
+    token = _current_file.set(key)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry.seconds += time.perf_counter() - started
+        _current_file.reset(token)
+
+
+def record_llm_call(
+    usage: Optional[Dict[str, Any]],
+    seconds: float,
+    rate_limit_wait: float = 0.0,
+    cached: bool = False,
+    model: Optional[str] = None
+) -> None:
+    """
+    Account an AI call to the current run (no-op outside a run).
+    
+    Args:
+        usage: Provider `usage` object (prompt_tokens, completion_tokens)
+        seconds: Wall time of the call, including rate limiting and retries
+        rate_limit_wait: Part of it spent waiting for rate limiter capacity
+        cached: Whether the response came without an upstream call of its
+            own (from the LLM cache, or shared with an identical call in flight)
+        model: Model the call was made with
+    """
+    metrics = _current_run.get()
+    if metrics is None:
+        return
+    usage = usage or {}
+    metrics.record_llm_call(
+        prompt_tokens=int(usage.get("prompt_tokens") or 0),
+        completion_tokens=int(usage.get("completion_tokens") or 0),
+        seconds=seconds,
+        rate_limit_wait=rate_limit_wait,
+        cached=cached,
+        file_key=_current_file.get(),
+        model=model
+    )
@@ -0,0 +1,175 @@
+"""
+Single-flight deduplication of identical in-flight Groq API calls.
+Concurrent callers with the same request key (e.g. projects generated from
+the same specs at the same time) share one upstream call: the first caller
+starts it and later ones wait for its result, or replay and follow its
+stream. The upstream call runs in its own task, so a caller that goes away
+does not cancel it for the others; it is cancelled once no caller is left.
+Unlike the LLM cache, nothing is kept once the call has finished.
+"""
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+import asyncio
+
+from app.config import settings
+
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """An upstream call and the callers waiting for it."""
+    
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+
+
+class _StreamFlight(_Flight):
+    """An upstream stream with the chunks received so far."""
+    
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        # Replaced on every update; waiters wait on the one current when they started
+        self.updated = asyncio.Event()
+    
+    def notify(self) -> None:
+        """Wake the waiters after an update."""
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+
+class SingleFlight:
+    """Shares identical concurrent calls and streams."""
+    
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize with nothing in flight.
+        
+        Args:
+            enabled: Share calls at all; when False every caller makes its own
+        """
+        self.enabled = enabled
+        self._calls: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _StreamFlight] = {}
+    
+    async def call(
+        self,
+        key: str,
+        start: Callable[[], Awaitable[T]],
+        shared: Optional[Callable[[], None]] = None
+    ) -> T:
+        """
+        Await a call, joining an identical one already in flight.
+        
+        Args:
+            key: Request key (the LLM cache key of the payload)
+            start: Starts the upstream call when none is in flight
+            shared: Called when this caller got the result of another
+                caller's upstream call
+        
+        Returns:
+            Result of the upstream call (the same object for every caller)
+        """
+        if not self.enabled:
+            return await start()
+        
+        flight = self._calls.get(key)
+        joined = flight is not None
+        if flight is None:
+            flight = self._calls[key] = _Flight()
+            flight.task = asyncio.ensure_future(start())
+            flight.task.add_done_callback(lambda _: self._forget(self._calls, key, flight))
+        
+        flight.waiters += 1
+        try:
+            # Shielded: cancelling this caller must not cancel the shared call
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left waiting for it
+                flight.task.cancel()
+                self._forget(self._calls, key, flight)
+        if joined and shared is not None:
+            shared()
+        return result
+    
+    async def stream(
+        self,
+        key: str,
+        start: Callable[[], AsyncIterator[str]],
+        shared: Optional[Callable[[], None]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Iterate a stream, following an identical one already in flight.
+        A caller joining late first receives the chunks streamed so far.
+        
+        Args:
+            key: Request key (the LLM cache key of the payload)
+            start: Opens the upstream stream when none is in flight
+            shared: Called when this caller completed another caller's
+                upstream stream
+        
+        Yields:
+            Chunks of the upstream stream
+        """
+        if not self.enabled:
+            async with aclosing(start()) as stream:
+                async for chunk in stream:
+                    yield chunk
+            return
+        
+        flight = self._streams.get(key)
+        joined = flight is not None
+        if flight is None:
+            flight = self._streams[key] = _StreamFlight()
+            flight.task = asyncio.ensure_future(self._pump(key, flight, start))
+        
+        flight.waiters += 1
+        try:
+            position = 0
+            while True:
+                if position < len(flight.chunks):
+                    position += 1
+                    yield flight.chunks[position - 1]
+                    continue
+                if flight.done:
+                    break
+                await flight.updated.wait()
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._forget(self._streams, key, flight)
+        if joined and shared is not None:
+            shared()
+    
+    async def _pump(self, key: str, flight: _StreamFlight, start: Callable[[], AsyncIterator[str]]) -> None:
+        """Read the upstream stream into the flight."""
+        try:
+            async with aclosing(start()) as stream:
+                async for chunk in stream:
+                    flight.chunks.append(chunk)
+                    flight.notify()
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            flight.notify()
+            self._forget(self._streams, key, flight)
+    
+    @staticmethod
+    def _forget(flights: Dict[str, Any], key: str, flight: _Flight) -> None:
+        """Stop offering a finished or abandoned flight to new callers."""
+        if flights.get(key) is flight:
+            del flights[key]
+
+
+# Global single-flight layer of the Groq client
+single_flight = SingleFlight(enabled=settings.llm_single_flight_enabled)
@@ -0,0 +1,225 @@
+"""
+Row-level diffing of parsed specifications.
+Compares the specs a project was generated from with its current specs and
+maps the changed rows onto the blueprint files that depend on them.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Set, Tuple
+import json
+import re
+
+from app.services.blueprint_graph import BlueprintGraph
+
+
+# Spec categories in the order they are stored on ProjectSpec
+SPEC_CATEGORIES = ("features", "apis", "database", "tech_stack")
+
+# Column names (lower-case, spaces/underscores stripped) that identify a row
+IDENTITY_COLUMNS = (
+    "table", "tablename", "entity", "model",
+    "method", "endpoint", "path", "route", "url",
+    "feature", "featurename", "name", "title",
+    "column", "columnname", "field",
+    "technology", "tool", "library", "category", "layer", "component",
+)
+
+# Words that never name a resource
+STOP_WORDS = {
+    "get", "post", "put", "patch", "delete", "api", "the", "and",
+    "sheet", "table", "column", "row", "field",
+}
+
+
+# Languages, frameworks and databases: changing one of them changes the
+# project structure, not just its config and docs
+STRUCTURAL_TECHNOLOGIES = {
+    "python", "javascript", "typescript", "java", "kotlin", "golang", "rust", "ruby", "php",
+    "csharp", "dotnet", "node", "nodejs", "deno", "bun",
+    "fastapi", "django", "flask", "express", "nestjs", "koa", "spring", "rails", "laravel",
+    "react", "next", "nextjs", "vue", "nuxt", "angular", "svelte", "sveltekit", "remix",
+    "postgresql", "postgres", "mysql", "sqlite", "mongodb", "mongo",
+    "sqlalchemy", "tortoise", "prisma", "typeorm", "sequelize", "mongoose",
+}
+
+
+@dataclass
+class SpecChange:
+    """A single added, removed or changed spec row."""
+    
+    category: str
+    sheet: str
+    kind: str  # added | removed | changed
+    identity: Tuple[str, ...]
+    terms: Set[str] = field(default_factory=set)
+    
+    def describe(self) -> str:
+        """Human-readable one-line summary."""
+        label = " ".join(part for part in self.identity if part) or "row"
+        return f"{self.category}/{self.sheet}: {self.kind} {label}"
+
+
+def _normalize_column(name: Any) -> str:
+    return re.sub(r"[\s_\-]", "", str(name).lower())
+
+
+def row_identity(row: Dict[str, Any]) -> Tuple[str, ...]:
+    """Identify a row by its naming columns, falling back to its full content."""
+    columns = {_normalize_column(key): key for key in row}
+    identity = tuple(
+        str(row[columns[name]]).strip()
+        for name in IDENTITY_COLUMNS
+        if name in columns and row[columns[name]] not in (None, "")
+    )
+    if identity:
+        return identity
+    return (json.dumps(row, sort_keys=True, default=str),)
+
+
+def resource_terms(values: Tuple[str, ...]) -> Set[str]:
+    """Resource words in identity values ("GET /api/users/{id}" -> {"user"})."""
+    terms = set()
+    for value in values:
+        for word in re.split(r"[^a-zA-Z0-9]+", re.sub(r"([a-z])([A-Z])", r"\1_\2", value)):
+            word = word.lower()
+            word = word[:-1] if word.endswith("s") and len(word) > 3 else word
+            if len(word) < 3 or word in STOP_WORDS:
+                continue
+            terms.add(word)
+    return terms
+
+
+def spec_sheets(data: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """Sheets of a parsed workbook; parse errors are treated as empty."""
+    if not isinstance(data, dict) or data.get("parsed") is False:
+        return {}
+    return {
+        sheet: rows for sheet, rows in data.items()
+        if isinstance(rows, list)
+    }
+
+
+def diff_specs(old: Dict[str, Any], new: Dict[str, Any]) -> List[SpecChange]:
+    """
+    Diff two sets of parsed specs row by row.
+    
+    Args:
+        old: Specs keyed by category ("features", "apis", "database", "tech_stack")
+        new: Specs keyed by category
+    
+    Returns:
+        List of row changes
+    """
+    changes = []
+    for category in SPEC_CATEGORIES:
+        old_sheets = spec_sheets(old.get(category))
+        new_sheets = spec_sheets(new.get(category))
+        
+        for sheet in sorted(set(old_sheets) | set(new_sheets)):
+            old_rows = {}
+            for row in old_sheets.get(sheet, []):
+                old_rows.setdefault(row_identity(row), []).append(row)
+            new_rows = {}
+            for row in new_sheets.get(sheet, []):
+                new_rows.setdefault(row_identity(row), []).append(row)
+            
+            for identity in sorted(set(old_rows) | set(new_rows)):
+                before = old_rows.get(identity)
+                after = new_rows.get(identity)
+                if before is None:
+                    kind = "added"
+                elif after is None:
+                    kind = "removed"
+                elif json.dumps(before, sort_keys=True, default=str) != json.dumps(after, sort_keys=True, default=str):
+                    kind = "changed"
+                else:
+                    continue
+                changes.append(SpecChange(
+                    category=category,
+                    sheet=sheet,
+                    kind=kind,
+                    identity=identity,
+                    terms=resource_terms(identity) | resource_terms((sheet,))
+                ))
+    return changes
+
+
+def affected_files(blueprint: Dict[str, Any], changes: List[SpecChange]) -> Set[str]:
+    """
+    Map spec changes onto the blueprint files that must be regenerated.
+    
+    A change selects every file whose path or purpose mentions one of the
+    changed row's resource names. Changes that match no file by name fall back
+    to the files that own their category (e.g. database rows -> database files
+    and backend models). Tech stack changes always select config and docs;
+    changes of a language, framework or database (structural_changes())
+    need a new blueprint instead.
+    
+    Args:
+        blueprint: Blueprint the project was generated from
+        changes: Changes from diff_specs()
+    
+    Returns:
+        Set of file keys (paths relative to the project root)
+    """
+    graph = BlueprintGraph(blueprint)
+    file_terms = {
+        key: resource_terms((job.file_path, job.file_purpose or ""))
+        for key, job in graph.nodes.items()
+    }
+    
+    def layer_files(section: str, layer: str) -> Set[str]:
+        return {
+            key for key, job in graph.nodes.items()
+            if job.section_name == section and graph.layer_name(key) == layer
+        }
+    
+    leaves = {key for key in graph.nodes if graph.layer_name(key) is None}
+    fallbacks = {
+        "database": {key for key, job in graph.nodes.items() if job.section_name == "database"}
+        | layer_files("backend", "models"),
+        "apis": layer_files("backend", "routes") | layer_files("frontend", "services"),
+        "features": layer_files("frontend", "pages") | layer_files("frontend", "routes"),
+        "tech_stack": leaves,
+    }
+    
+    selected = set()
+    for change in changes:
+        if change.category == "tech_stack":
+            selected |= leaves
+            continue
+        
+        matched = {key for key, terms in file_terms.items() if terms & change.terms}
+        if not matched:
+            matched = fallbacks[change.category]
+        selected |= matched
+        
+        # Endpoints and features that appear or disappear change what the
+        # entry points register and what the docs describe
+        if change.kind != "changed":
+            if change.category == "apis":
+                selected |= layer_files("backend", "entry")
+            selected |= {key for key in leaves if key.lower().endswith("readme.md")}
+    
+    return selected
+
+
+def structural_changes(changes: List[SpecChange]) -> List[SpecChange]:
+    """
+    Tech stack changes that swap a language, framework or database.
+    Every code file depends on these, so they cannot be handled by
+    regenerating the affected files of the existing blueprint.
+    
+    Args:
+        changes: Changes from diff_specs()
+    
+    Returns:
+        The structural changes, empty if the project layout still holds
+    """
+    return [
+        change for change in changes
+        if change.category == "tech_stack"
+        and {
+            word for value in change.identity
+            for word in re.split(r"[^a-z0-9]+", value.lower())
+        } & STRUCTURAL_TECHNOLOGIES
+    ]
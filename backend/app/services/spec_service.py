@@ -3,6 +3,8 @@ Project specification service for managing ProjectSpec operations.
 Handles creation and updates of project specifications.
 """
 from typing import Dict, Any, Optional
+import hashlib
+import json
 import uuid
 
 from app.db.models import ProjectSpec, Project
@@ -11,6 +13,77 @@ from app.db.models import ProjectSpec, Project
 class SpecService:
     """Manages ProjectSpec database operations."""
     
+    @staticmethod
+    def compute_fingerprint(
+        features_json: Dict[str, Any],
+        apis_json: Dict[str, Any],
+        database_json: Dict[str, Any],
+        tech_stack_json: Dict[str, Any]
+    ) -> str:
+        """
+        Compute a stable fingerprint of parsed spec content.
+        Key order and formatting do not affect the result, so re-uploading
+        unchanged workbooks yields the same fingerprint.
+        
+        Args:
+            features_json: Parsed features data
+            apis_json: Parsed APIs data
+            database_json: Parsed database schema data
+            tech_stack_json: Parsed tech stack data
+            
+        Returns:
+            Hex SHA-256 digest
+        """
+        canonical = json.dumps(
+            {
+                "features": features_json or {},
+                "apis": apis_json or {},
+                "database": database_json or {},
+                "tech_stack": tech_stack_json or {}
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def fingerprint_of(spec: ProjectSpec) -> str:
+        """
+        Get the fingerprint of a stored spec.
+        
+        Args:
+            spec: ProjectSpec instance
+            
+        Returns:
+            Hex SHA-256 digest
+        """
+        return SpecService.compute_fingerprint(
+            spec.features_json,
+            spec.apis_json,
+            spec.database_json,
+            spec.tech_stack_json
+        )
+    
+    @staticmethod
+    def snapshot_of(spec: ProjectSpec) -> Dict[str, Any]:
+        """
+        Get the parsed specs of a stored spec keyed by category.
+        
+        Args:
+            spec: ProjectSpec instance
+            
+        Returns:
+            Dict with "features", "apis", "database" and "tech_stack" keys
+        """
+        return {
+            "features": spec.features_json or {},
+            "apis": spec.apis_json or {},
+            "database": spec.database_json or {},
+            "tech_stack": spec.tech_stack_json or {}
+        }
+    
     @staticmethod
     async def create_or_update_spec(
         project_id: uuid.UUID,
@@ -45,6 +118,7 @@ class SpecService:
                 existing_spec.database_json = database_json
             if tech_stack_json is not None:
                 existing_spec.tech_stack_json = tech_stack_json
+            existing_spec.fingerprint = SpecService.fingerprint_of(existing_spec)
             
             await existing_spec.save()
             return existing_spec
@@ -55,7 +129,10 @@ class SpecService:
                 features_json=features_json or {},
                 apis_json=apis_json or {},
                 database_json=database_json or {},
-                tech_stack_json=tech_stack_json or {}
+                tech_stack_json=tech_stack_json or {},
+                fingerprint=SpecService.compute_fingerprint(
+                    features_json, apis_json, database_json, tech_stack_json
+                )
             )
             return spec
     
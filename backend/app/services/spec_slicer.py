@@ -0,0 +1,176 @@
+"""
+Per-file slicing of parsed specifications.
+Builds a relevance index once per run that maps spec rows (features, API
+endpoints, tables/columns) onto the blueprint files that mention them, so each
+file prompt carries only its own slice of the specs plus a compact summary of
+the whole project.
+"""
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from app.services.blueprint_graph import BlueprintGraph
+from app.services.spec_diff import row_identity, resource_terms, spec_sheets
+
+
+# Categories sliced per file; the tech stack is small and passed whole
+SLICED_CATEGORIES = ("features", "apis", "database")
+
+# Words in file paths and purposes that say what kind of file it is rather
+# than which resource it handles
+GENERIC_TERMS = {
+    "app", "application", "main", "index", "entry", "point", "file", "module",
+    "model", "schema", "service", "route", "router", "controller", "component",
+    "page", "view", "config", "configuration", "util", "helper", "type",
+    "handle", "handler", "manage", "management", "define", "definition",
+    "create", "update", "list", "data", "base", "core", "logic", "layer",
+    "function", "class", "interface", "request", "response", "endpoint",
+    "operation", "database", "table", "frontend", "backend", "client", "server",
+}
+
+
+class SpecIndex:
+    """Relevance index from spec rows to blueprint files."""
+    
+    # Categories a file receives in full when no row matches it by name,
+    # e.g. a generic API client needs every endpoint
+    LAYER_CATEGORIES = {
+        "models": ("database",),
+        "schemas": ("database", "apis"),
+        "services": ("apis",),
+        "routes": ("apis", "features"),
+        "pages": ("features",),
+    }
+    
+    # Character budget of each category in the global summary
+    MAX_SUMMARY_CHARS = 1200
+    
+    def __init__(self, specs: Dict[str, Any], graph: BlueprintGraph):
+        """
+        Index the specs against the files of a blueprint.
+        
+        Args:
+            specs: Parsed specs keyed by category ("features", "apis",
+                "database", "tech_stack")
+            graph: Blueprint graph of the run
+        """
+        self.specs = specs
+        self.graph = graph
+        
+        # category -> [(sheet, row, identity)]
+        self._rows: Dict[str, List[Tuple[str, Dict[str, Any], Tuple[str, ...]]]] = {}
+        # term -> {(category, position)}
+        self._by_term: Dict[str, Set[Tuple[str, int]]] = {}
+        for category in SLICED_CATEGORIES:
+            rows = []
+            for sheet, sheet_rows in spec_sheets(specs.get(category)).items():
+                for row in sheet_rows:
+                    if not isinstance(row, dict):
+                        continue
+                    identity = row_identity(row)
+                    for term in resource_terms(identity):
+                        self._by_term.setdefault(term, set()).add((category, len(rows)))
+                    rows.append((sheet, row, identity))
+            self._rows[category] = rows
+        
+        # file key -> {category: [positions]}
+        self._matches: Dict[str, Dict[str, List[int]]] = {
+            key: self._match(job.file_path, job.file_purpose)
+            for key, job in graph.nodes.items()
+        }
+        self.summary = self._build_summary()
+    
+    def _match(self, file_path: str, file_purpose: str) -> Dict[str, List[int]]:
+        """Rows whose resource names appear in a file's path or purpose."""
+        terms = resource_terms((file_path, file_purpose or "")) - GENERIC_TERMS
+        matches: Dict[str, Set[int]] = {}
+        for term in terms:
+            for category, position in self._by_term.get(term, ()):
+                matches.setdefault(category, set()).add(position)
+        return {category: sorted(positions) for category, positions in matches.items()}
+    
+    def positions_for(self, key: str) -> Dict[str, Optional[List[int]]]:
+        """
+        Get the rows relevant to one file.
+        
+        Args:
+            key: File path relative to the project root (FileJob.key)
+        
+        Returns:
+            Dict of category to row positions (see rows()); None means the
+            whole category, an empty list means nothing relevant
+        """
+        job = self.graph.nodes.get(key)
+        if job is None:
+            return {category: None for category in SLICED_CATEGORIES}
+        
+        full = set()
+        if job.section_name == "database":
+            full.add("database")
+        full.update(self.LAYER_CATEGORIES.get(self.graph.layer_name(key), ()))
+        
+        matches = self._matches.get(key, {})
+        positions = {}
+        for category in SLICED_CATEGORIES:
+            matched = matches.get(category)
+            if matched:
+                positions[category] = matched
+            else:
+                positions[category] = None if category in full else []
+        return positions
+    
+    def rows(self, category: str) -> List[Tuple[str, Dict[str, Any], Tuple[str, ...]]]:
+        """
+        Indexed rows of a category.
+        
+        Args:
+            category: One of SLICED_CATEGORIES
+        
+        Returns:
+            List of (sheet, row, identity) in workbook order
+        """
+        return self._rows.get(category, [])
+    
+    def _build_summary(self) -> str:
+        """Compact listing of every feature, endpoint and table in the project."""
+        lines = []
+        
+        features = self._names("features")
+        if features:
+            lines.append("Features: " + self._clip(features))
+        
+        endpoints = self._names("apis")
+        if endpoints:
+            lines.append("Endpoints: " + self._clip(endpoints))
+        
+        # Database rows are usually one per column: group columns by table
+        tables: Dict[str, List[str]] = {}
+        for sheet, _, identity in self._rows.get("database", []):
+            if len(identity) > 1:
+                tables.setdefault(identity[0], []).append(identity[1])
+            else:
+                # No table column: one sheet per table
+                tables.setdefault(sheet, []).append(identity[0])
+        if tables:
+            lines.append("Tables: " + self._clip([
+                f"{table}({', '.join(columns)})" if columns else table
+                for table, columns in tables.items()
+            ]))
+        
+        return "\n".join(lines)
+    
+    def _names(self, category: str) -> List[str]:
+        """Distinct row names of a category, in workbook order."""
+        names = []
+        seen = set()
+        for _, _, identity in self._rows.get(category, []):
+            name = " ".join(part for part in identity if part)
+            if name and len(name) <= 120 and name not in seen:
+                seen.add(name)
+                names.append(name)
+        return names
+    
+    def _clip(self, items: List[str]) -> str:
+        """Join items, truncating to the summary budget."""
+        text = "; ".join(items)
+        if len(text) <= self.MAX_SUMMARY_CHARS:
+            return text
+        return text[:self.MAX_SUMMARY_CHARS].rsplit(";", 1)[0] + "; ..."
@@ -0,0 +1,87 @@
+"""
+Shared status polling for progress streams of runs on other processes.
+Runs executed by a dedicated worker publish to that worker's event bus, not
+to the API's. Instead of every open stream querying its project, one task
+polls the status of all watched projects with a single query per interval
+and publishes changes to the local bus, where every stream receives them.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+import asyncio
+import uuid
+
+from app.config import settings
+from app.db.models import Project
+from app.services.event_bus import ProgressEventBus, progress_events
+
+
+class StatusPoller:
+    """Polls watched projects whose runs do not publish in this process."""
+    
+    def __init__(self, bus: ProgressEventBus, interval: float):
+        """
+        Initialize without polling; polling starts with the first watcher.
+        
+        Args:
+            bus: Event bus the polled status changes are published to
+            interval: Seconds between polls
+        """
+        self.bus = bus
+        self.interval = interval
+        # project id -> open streams watching it
+        self._watchers: Dict[uuid.UUID, int] = {}
+        # Status each project was last seen with, when the bus has none
+        self._known: Dict[uuid.UUID, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    @contextmanager
+    def watch(self, project_id: uuid.UUID, current: Dict[str, Any]) -> Iterator[None]:
+        """
+        Poll a project while the enclosed block runs.
+        
+        Args:
+            project_id: UUID of the project
+            current: Status the watcher has already seen ({"status",
+                "current_step"}), so it is not published again
+        """
+        self._watchers[project_id] = self._watchers.get(project_id, 0) + 1
+        self._known.setdefault(project_id, current)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            yield
+        finally:
+            self._watchers[project_id] -= 1
+            if not self._watchers[project_id]:
+                del self._watchers[project_id]
+                self._known.pop(project_id, None)
+    
+    async def _run(self) -> None:
+        """Poll until nobody is watching."""
+        while self._watchers:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Status polling failed: {e}")
+    
+    async def poll(self) -> None:
+        """Query the watched projects once and publish status changes."""
+        # Runs publishing in this process need no polling
+        project_ids = [project_id for project_id in self._watchers if not self.bus.is_active(project_id)]
+        if not project_ids:
+            return
+        rows = await Project.filter(id__in=project_ids).values("id", "status", "current_step")
+        for row in rows:
+            project_id = row.pop("id")
+            if project_id not in self._watchers:
+                continue
+            latest = self.bus.last_event(project_id, "status")
+            seen = latest.data if latest else self._known.get(project_id, {})
+            if (seen.get("status"), seen.get("current_step")) != (row["status"], row["current_step"]):
+                self._known[project_id] = row
+                self.bus.publish(project_id, "status", row, remote=True)
+
+
+# Global status poller
+status_poller = StatusPoller(progress_events, settings.sse_poll_seconds)
@@ -0,0 +1,156 @@
+"""
+Deterministic templates for boilerplate blueprint files.
+Well-known files that are boilerplate or follow directly from the blueprint
+and specs (ignore files, framework type stubs, standard tool configs,
+dependency manifests, the project README) are rendered locally from
+FileGenerator templates instead of being sent to the AI.
+"""
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import PurePosixPath
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.blueprint_graph import FileJob
+from app.utils.file_generator import FileGenerator
+
+
+@dataclass(frozen=True)
+class TemplateContext:
+    """What a template may use to render a file."""
+    
+    project_name: str
+    framework: str
+    # Tech stack of the project as text, e.g. from the specs
+    tech_stack: str
+    # Parsed specs keyed by category ("features", "apis", "database", "tech_stack")
+    specs: Dict[str, Any] = field(default_factory=dict)
+    # Blueprint of the run
+    blueprint: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class TemplateRule:
+    """A template for file names matching a pattern."""
+    
+    pattern: str
+    render: Callable[[TemplateContext], str]
+    # Keywords one of which must appear in the section framework or project
+    # tech stack (case-insensitive); empty matches any stack
+    stacks: Tuple[str, ...] = ()
+    # Blueprint sections the rule applies to; empty matches any section
+    sections: Tuple[str, ...] = ()
+
+
+class TemplateRegistry:
+    """Ordered set of template rules; stack-specific rules win over generic ones."""
+    
+    def __init__(self):
+        """Create an empty registry."""
+        self._rules: List[TemplateRule] = []
+    
+    def register(
+        self,
+        pattern: str,
+        render: Callable[[TemplateContext], str],
+        stacks: Tuple[str, ...] = (),
+        sections: Tuple[str, ...] = ()
+    ) -> None:
+        """
+        Register a template.
+        
+        Args:
+            pattern: fnmatch pattern for the file name (e.g. ".gitignore",
+                "postcss.config.js")
+            render: Renders the file content
+            stacks: Tech stack keywords the rule is limited to
+            sections: Blueprint sections the rule is limited to
+        """
+        self._rules.append(TemplateRule(
+            pattern=pattern.lower(),
+            render=render,
+            stacks=tuple(stack.lower() for stack in stacks),
+            sections=tuple(sections)
+        ))
+        # Keep specific rules ahead of generic ones, registration order otherwise
+        self._rules.sort(key=lambda rule: (not rule.stacks, not rule.sections))
+    
+    def match(self, job: FileJob, tech_stack: str) -> Optional[TemplateRule]:
+        """
+        Find the template serving a blueprint file.
+        
+        Args:
+            job: Blueprint file
+            tech_stack: Tech stack of the project as text
+        
+        Returns:
+            Matching rule, or None if the file needs the AI
+        """
+        name = PurePosixPath(job.file_path).name.lower()
+        stack = f"{job.framework} {tech_stack}".lower()
+        for rule in self._rules:
+            if not fnmatch(name, rule.pattern):
+                continue
+            if rule.sections and job.section_name not in rule.sections:
+                continue
+            if rule.stacks and not any(keyword in stack for keyword in rule.stacks):
+                continue
+            return rule
+        return None
+
+
+def default_registry() -> TemplateRegistry:
+    """
+    Registry with the built-in templates. FileGenerator's backend main.py
+    and schema.sql templates are not registered: main.py has to import and
+    mount the modules the AI generates for this blueprint, and the schema's
+    DDL has to be derived from database sheets whose layout varies per
+    project, so both stay with the AI.
+    
+    Returns:
+        New registry
+    """
+    registry = TemplateRegistry()
+    registry.register(".gitignore", lambda context: FileGenerator.generate_gitignore())
+    registry.register(".gitkeep", lambda context: "")
+    registry.register(
+        "readme.md",
+        lambda context: FileGenerator.generate_project_readme(
+            context.project_name,
+            context.tech_stack,
+            context.specs,
+            context.blueprint
+        ),
+        sections=("root",)
+    )
+    registry.register(
+        "requirements.txt",
+        lambda context: FileGenerator.generate_backend_requirements(context.tech_stack),
+        stacks=("fastapi",),
+        sections=("backend",)
+    )
+    registry.register(
+        "readme.md",
+        lambda context: FileGenerator.generate_frontend_readme(context.project_name, context.framework),
+        stacks=("react", "next", "vue", "angular", "svelte", "vite"),
+        sections=("frontend",)
+    )
+    registry.register(
+        "next-env.d.ts",
+        lambda context: FileGenerator.generate_next_env_types(),
+        stacks=("next",)
+    )
+    registry.register(
+        ".eslintrc.json",
+        lambda context: FileGenerator.generate_next_eslintrc(),
+        stacks=("next",)
+    )
+    registry.register(
+        "postcss.config.js",
+        lambda context: FileGenerator.generate_postcss_config(),
+        stacks=("tailwind",)
+    )
+    return registry
+
+
+# Global template registry; register additional stacks at import time
+template_registry = default_registry()
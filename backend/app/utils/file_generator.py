@@ -3,7 +3,8 @@ File generation utilities for creating project files.
 Generates placeholder files based on project specifications.
 """
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+import re
 
 
 class FileGenerator:
@@ -45,19 +46,47 @@ if __name__ == "__main__":
     
     @staticmethod
     def generate_backend_requirements(tech_stack: str) -> str:
-        """Generate backend requirements.txt file."""
-        return '''# Backend Dependencies
-fastapi==0.115.0
-uvicorn[standard]==0.30.6
-pydantic==2.9.2
-python-dotenv==1.0.1
-
-# Database
-sqlalchemy==2.0.25
-alembic==1.13.1
-
-# Add other dependencies as needed
-'''
+        """
+        Generate backend requirements.txt file for a FastAPI backend.
+        The ORM, database driver and extras follow the technologies the
+        tech stack names.
+        """
+        stack = tech_stack.lower()
+        
+        if "tortoise" in stack:
+            database = ["tortoise-orm==0.21.6"]
+            if "postgres" in stack:
+                database.append("asyncpg==0.29.0")
+        elif "mongo" in stack:
+            database = ["motor==3.5.1"]
+        else:
+            database = ["sqlalchemy==2.0.25", "alembic==1.13.1"]
+            if "postgres" in stack:
+                database.append("psycopg2-binary==2.9.9")
+            elif "mysql" in stack:
+                database.append("pymysql==1.1.1")
+        
+        extras = []
+        if "jwt" in stack or "auth" in stack:
+            extras += ["python-jose[cryptography]==3.3.0", "passlib[bcrypt]==1.7.4"]
+        if "redis" in stack:
+            extras.append("redis==5.0.8")
+        if "celery" in stack:
+            extras.append("celery==5.4.0")
+        
+        lines = [
+            "# Backend Dependencies",
+            "fastapi==0.115.0",
+            "uvicorn[standard]==0.30.6",
+            "pydantic==2.9.2",
+            "python-dotenv==1.0.1",
+            "",
+            "# Database",
+            *database,
+        ]
+        if extras:
+            lines += ["", "# Additional dependencies", *extras]
+        return "\n".join(lines) + "\n"
     
     @staticmethod
     def generate_frontend_readme(project_name: str, tech_stack: str) -> str:
@@ -136,20 +165,85 @@ NEXT_PUBLIC_API_URL=http://localhost:8000
     
     @staticmethod
     def generate_project_readme(
-        project_name: str, 
-        tech_stack: str, 
-        specs: Dict[str, Any]
+        project_name: str,
+        tech_stack: str,
+        specs: Dict[str, Any],
+        blueprint: Dict[str, Any]
     ) -> str:
-        """Generate main project README.md file."""
-        features = specs.get('features_json', {})
-        apis = specs.get('apis_json', {})
-        database = specs.get('database_json', {})
+        """
+        Generate main project README.md file.
         
-        feature_count = len(features) if isinstance(features, dict) else 0
-        api_count = len(apis) if isinstance(apis, dict) else 0
-        db_count = len(database) if isinstance(database, dict) else 0
+        Args:
+            project_name: Name of the project
+            tech_stack: Tech stack of the project as text
+            specs: Parsed specs keyed by category ("features", "apis",
+                "database")
+            blueprint: Blueprint the project is generated from; gives the
+                structure and setup steps
+        """
+        features = FileGenerator._row_labels(specs.get("features"), (("feature", "featurename", "name", "title"),))
+        endpoints = FileGenerator._row_labels(specs.get("apis"), (("method",), ("endpoint", "path", "route", "url")))
+        tables = FileGenerator._row_labels(specs.get("database"), (("table", "tablename", "entity", "model"),))
+        # Database sheets usually list one row per column; count tables once
+        tables = list(dict.fromkeys(tables))
+        technologies = FileGenerator._row_labels(specs.get("tech_stack"), (("technology", "tool", "library", "name"),))
+        if technologies:
+            tech_stack = ", ".join(dict.fromkeys(technologies))
+        slug = project_name.lower().replace(" ", "_")
         
-        return f'''# {project_name}
+        sections = [
+            (name, data) for name, data in blueprint.items()
+            if name != "root" and isinstance(data, dict) and data.get("files")
+        ]
+        root_files = sorted((blueprint.get("root") or {}).get("files") or {})
+        entries = sections + [(path, None) for path in root_files]
+        tree = [f"{project_name}/"]
+        for index, (name, data) in enumerate(entries):
+            last = index == len(entries) - 1
+            if data is None:
+                tree.append(f"{'└──' if last else '├──'} {name}")
+                continue
+            framework = data.get("framework")
+            tree.append(f"{'└──' if last else '├──'} {name}/" + (f"  # {framework}" if framework else ""))
+            paths = sorted(data["files"])
+            for position, path in enumerate(paths):
+                tree.append(f"{'    ' if last else '│   '}{'└──' if position == len(paths) - 1 else '├──'} {path}")
+        structure = "\n".join(tree)
+        
+        setup = []
+        for name, data in sections:
+            files = data["files"]
+            title = f"### {name.capitalize()} Setup ({data.get('framework', name)})"
+            if "requirements.txt" in files:
+                entry = next((path for path in ("main.py", "app/main.py", "manage.py") if path in files), "main.py")
+                setup.append(f"""{title}
+
+```bash
+cd {name}
+python -m venv venv
+source venv/bin/activate  # On Windows: venv\\Scripts\\activate
+pip install -r requirements.txt
+python {entry}
+```""")
+            elif "package.json" in files:
+                setup.append(f"""{title}
+
+```bash
+cd {name}
+npm install
+npm run dev
+```""")
+            elif any(path.endswith(".sql") for path in files):
+                script = next(path for path in sorted(files) if path.endswith(".sql"))
+                setup.append(f"""{title}
+
+```bash
+createdb {slug}
+psql {slug} < {name}/{script}
+```""")
+        getting_started = "\n\n".join(setup) or "See the README of each section."
+        
+        return f"""# {project_name}
 
 Generated by AutoPilot - Excel to Code Generator
 
@@ -158,117 +252,88 @@ Generated by AutoPilot - Excel to Code Generator
 **Tech Stack:** {tech_stack}
 
 This project was automatically generated from Excel specifications:
-- **Features:** {feature_count} specifications
-- **APIs:** {api_count} endpoints
-- **Database:** {db_count} models
+- **Features:** {len(features)} specifications
+- **APIs:** {len(endpoints)} endpoints
+- **Database:** {len(tables)} tables
 
 ## Project Structure
 
 ```
-{project_name}/
-├── backend/           # Backend API (FastAPI)
-│   ├── main.py
-│   └── requirements.txt
-├── frontend/          # Frontend application
-│   └── README.md
-├── database/          # Database schema
-│   └── schema.sql
-└── README.md         # This file
+{structure}
 ```
 
 ## Getting Started
 
-### Backend Setup
-
-1. Navigate to backend directory:
-   ```bash
-   cd backend
-   ```
-
-2. Create virtual environment:
-   ```bash
-   python -m venv venv
-   source venv/bin/activate  # On Windows: venv\\Scripts\\activate
-   ```
-
-3. Install dependencies:
-   ```bash
-   pip install -r requirements.txt
-   ```
-
-4. Run the server:
-   ```bash
-   python main.py
-   ```
-
-   Backend will be available at `http://localhost:8000`
-
-### Frontend Setup
-
-1. Navigate to frontend directory:
-   ```bash
-   cd frontend
-   ```
-
-2. Install dependencies:
-   ```bash
-   npm install
-   ```
-
-3. Run development server:
-   ```bash
-   npm run dev
-   ```
-
-### Database Setup
-
-1. Create database:
-   ```bash
-   createdb {project_name.lower().replace(" ", "_")}
-   ```
-
-2. Run schema:
-   ```bash
-   psql {project_name.lower().replace(" ", "_")} < database/schema.sql
-   ```
+{getting_started}
 
 ## Features
 
-This project includes the following features based on your specifications:
-
-TODO: List features from Excel specifications
+{FileGenerator._bullet_list(features, "No features specified.")}
 
 ## API Endpoints
 
-TODO: Document API endpoints from specifications
-
-## Development
-
-Generated project includes:
-- Backend API with FastAPI
-- Frontend application structure
-- Database schema
-- Development environment setup
+{FileGenerator._bullet_list(endpoints, "No API endpoints specified.")}
 
 ## Next Steps
 
 1. Review generated code
 2. Customize business logic
-3. Implement features from specifications
-4. Add authentication and authorization
-5. Configure production environment
-6. Deploy to hosting platform
-
-## Support
-
-For issues or questions about the generated code, please refer to the AutoPilot documentation.
+3. Add authentication and authorization
+4. Configure production environment
+5. Deploy to hosting platform
 
 ---
 
 **Generated:** {project_name}  
 **Tech Stack:** {tech_stack}  
 **Generator:** AutoPilot v1.0
-'''
+"""
+    
+    @staticmethod
+    def _row_labels(workbook: Any, columns: Tuple[Tuple[str, ...], ...]) -> List[str]:
+        """
+        One label per spec row, from its naming columns.
+        
+        Args:
+            workbook: Parsed workbook ({sheet: [rows]})
+            columns: Groups of column names (lower-case without spaces or
+                underscores); the first column of each group the row has
+                is part of the label, e.g. method and path of an endpoint
+        
+        Returns:
+            Labels in workbook order
+        """
+        if not isinstance(workbook, dict) or workbook.get("parsed") is False:
+            return []
+        labels = []
+        for rows in workbook.values():
+            if not isinstance(rows, list):
+                continue
+            for row in rows:
+                if not isinstance(row, dict):
+                    continue
+                named = {re.sub(r"[\s_\-]", "", str(key).lower()): value for key, value in row.items()}
+                parts = []
+                for group in columns:
+                    value = next((
+                        str(named[column]).strip() for column in group
+                        if named.get(column) not in (None, "") and str(named[column]).lower() != "nan"
+                    ), None)
+                    if value:
+                        parts.append(value)
+                if parts:
+                    labels.append(" ".join(parts))
+        return labels
+    
+    @staticmethod
+    def _bullet_list(items: List[str], empty: str, limit: int = 50) -> str:
+        """Markdown list of at most `limit` items."""
+        if not items:
+            return empty
+        lines = [f"- {item}" for item in items[:limit]]
+        if len(items) > limit:
+            lines.append(f"- ... and {len(items) - limit} more")
+        return "\n".join(lines)
     
     @staticmethod
     def generate_gitignore() -> str:
@@ -306,4 +371,33 @@ Thumbs.db
 # Database
 *.sqlite
 *.db
+'''
+    
+    @staticmethod
+    def generate_next_env_types() -> str:
+        """Generate Next.js next-env.d.ts file."""
+        return '''/// <reference types="next" />
+/// <reference types="next/image-types/global" />
+
+// NOTE: This file should not be edited
+// see https://nextjs.org/docs/app/building-your-application/configuring/typescript for more information.
+'''
+    
+    @staticmethod
+    def generate_next_eslintrc() -> str:
+        """Generate Next.js .eslintrc.json file."""
+        return '''{
+  "extends": "next/core-web-vitals"
+}
+'''
+    
+    @staticmethod
+    def generate_postcss_config() -> str:
+        """Generate postcss.config.js file for Tailwind CSS."""
+        return '''module.exports = {
+  plugins: {
+    tailwindcss: {},
+    autoprefixer: {},
+  },
+}
 '''
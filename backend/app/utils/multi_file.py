@@ -0,0 +1,80 @@
+"""
+Delimited multi-file output format for batched generation.
+Several small files are requested in one completion and returned as
+
+    === FILE: path/to/file ===
+    ...content...
+    === END FILE ===
+
+blocks, which are split and validated per file.
+"""
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, Optional
+import json
+import re
+
+from app.utils.streaming import strip_markdown_fences
+
+
+FILE_START = "=== FILE: {path} ==="
+FILE_END = "=== END FILE ==="
+
+_BLOCK = re.compile(
+    r"^=== FILE: (?P<path>.+?) ===[ \t]*\n(?P<content>.*?)^=== END FILE ===[ \t]*$",
+    re.MULTILINE | re.DOTALL
+)
+
+# Files that are legitimately empty
+EMPTY_ALLOWED = ("__init__.py", ".gitkeep")
+
+
+def split_multi_file_output(text: str, expected_paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Split a multi-file completion into files.
+    
+    Args:
+        text: Raw completion
+        expected_paths: Paths that were requested; anything else is ignored
+    
+    Returns:
+        Dict of path to content (fences stripped) for every requested file
+        found in the output; the first block wins if a path repeats
+    """
+    expected = set(expected_paths)
+    files: Dict[str, str] = {}
+    for match in _BLOCK.finditer(text):
+        path = match.group("path").strip().strip("`")
+        if path in expected and path not in files:
+            files[path] = strip_markdown_fences(match.group("content"))
+    return files
+
+
+def validate_generated_file(path: str, content: str) -> Optional[str]:
+    """
+    Check that split-out content is usable as the file.
+    
+    Args:
+        path: File path
+        content: File content
+    
+    Returns:
+        Error description, or None if the content is valid
+    """
+    name = PurePosixPath(path).name.lower()
+    if not content.strip():
+        return None if name in EMPTY_ALLOWED else "empty output"
+    if "=== FILE:" in content or FILE_END in content:
+        return "contains file delimiters"
+    
+    suffix = PurePosixPath(name).suffix
+    if suffix == ".json":
+        try:
+            json.loads(content)
+        except ValueError as e:
+            return f"invalid JSON: {e}"
+    elif suffix == ".py":
+        try:
+            compile(content, path, "exec")
+        except SyntaxError as e:
+            return f"invalid Python: {e.msg} (line {e.lineno})"
+    return None
@@ -0,0 +1,186 @@
+"""
+Streaming helpers for AI-generated files.
+Strips markdown code fences from a token stream and writes it progressively
+to a temporary file that is atomically renamed once complete.
+"""
+from pathlib import Path
+import hashlib
+import os
+import re
+
+
+FENCE = "```"
+
+# Trailing text that may still turn out to be a closing fence or whitespace
+_TRAILING_CANDIDATE = re.compile(r"[\s`]*$")
+
+
+def strip_markdown_fences(code: str) -> str:
+    """
+    Remove a markdown code block wrapped around generated code.
+    
+    Args:
+        code: Raw model output
+    
+    Returns:
+        Code without the opening ```lang line, the closing ``` and
+        surrounding whitespace
+    """
+    code = code.strip()
+    if code.startswith(FENCE):
+        # Drop the opening fence line (```python, ```typescript, ...)
+        first_newline = code.find("\n")
+        if first_newline != -1:
+            code = code[first_newline + 1:]
+    if code.endswith(FENCE):
+        code = code[:-len(FENCE)]
+    return code.strip()
+
+
+class FenceStripper:
+    """
+    Incremental strip_markdown_fences(): feed chunks as they arrive and get
+    back the text that is safe to emit. Only the opening fence line and a
+    short tail of whitespace/backticks are ever held back.
+    """
+    
+    def __init__(self):
+        """Start before any output has been seen."""
+        self._state = "lead"  # lead | fence | body
+        self._fence_checked = False
+        self._head = ""
+        self._tail = ""
+    
+    def feed(self, chunk: str) -> str:
+        """
+        Process the next chunk of model output.
+        
+        Args:
+            chunk: Text delta from the stream
+        
+        Returns:
+            Text that can be written now (possibly empty)
+        """
+        if self._state != "body":
+            self._head += chunk
+            chunk = self._consume_head()
+            if self._state != "body":
+                return ""
+        
+        text = self._tail + chunk
+        match = _TRAILING_CANDIDATE.search(text)
+        self._tail = text[match.start():]
+        return text[:match.start()]
+    
+    def finish(self) -> str:
+        """
+        Flush held-back text at the end of the stream.
+        
+        Returns:
+            Remaining text, with a closing fence and trailing whitespace removed
+        """
+        if self._state != "body":
+            # The stream ended while still deciding on the opening fence
+            return strip_markdown_fences(self._head)
+        
+        tail = self._tail.rstrip()
+        if tail.endswith(FENCE):
+            tail = tail[:-len(FENCE)]
+        self._tail = ""
+        return tail.rstrip()
+    
+    def _consume_head(self) -> str:
+        """Advance through leading whitespace and the opening fence line."""
+        while True:
+            if self._state == "lead":
+                head = self._head.lstrip()
+                if not head:
+                    self._head = ""
+                    return ""
+                if not self._fence_checked:
+                    if len(head) < len(FENCE) and FENCE.startswith(head):
+                        # Could still become a fence
+                        self._head = head
+                        return ""
+                    self._fence_checked = True
+                    if head.startswith(FENCE):
+                        self._head = head
+                        self._state = "fence"
+                        continue
+                self._state = "body"
+                self._head = ""
+                return head
+            
+            if self._state == "fence":
+                newline = self._head.find("\n")
+                if newline == -1 or not self._head[newline + 1:].strip():
+                    # A lone fence line is kept, like strip_markdown_fences()
+                    return ""
+                self._head = self._head[newline + 1:]
+                # Whitespace after the fence line is stripped too
+                self._state = "lead"
+                continue
+            
+            return ""
+
+
+class StreamingFileWriter:
+    """
+    Writes a file chunk by chunk to `<name>.partial` next to its destination
+    and renames it into place on commit(), so readers never see a truncated
+    file at the final path.
+    """
+    
+    def __init__(self, destination: Path):
+        """
+        Open the temporary file.
+        
+        Args:
+            destination: Final path of the file
+        """
+        self.destination = destination
+        self.partial_path = destination.with_name(destination.name + ".partial")
+        self.destination.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.partial_path, "wb")
+        self._hash = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, text: str) -> None:
+        """
+        Append text and flush it so watchers see it immediately.
+        
+        Args:
+            text: Text to append
+        """
+        if not text:
+            return
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self._file.flush()
+        self._hash.update(data)
+        self.size += len(data)
+    
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of everything written so far."""
+        return self._hash.hexdigest()
+    
+    def commit(self) -> str:
+        """
+        Atomically move the completed file to its destination.
+        
+        Returns:
+            SHA-256 of the file content
+        """
+        self._file.close()
+        os.replace(self.partial_path, self.destination)
+        return self.content_hash
+    
+    def abort(self) -> None:
+        """Discard the partial file, leaving any previous destination intact."""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            self.partial_path.unlink()
+        except OSError:
+            pass
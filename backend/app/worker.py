@@ -0,0 +1,72 @@
+"""
+Generation worker entry point.
+Runs queued generation jobs outside the API process, so API nodes and
+generation capacity can be scaled independently:
+
+    python -m app.worker --concurrency 4
+
+SIGINT/SIGTERM stops claiming jobs and waits for running ones; a second
+signal hands running jobs back to the queue and exits.
+"""
+import argparse
+import asyncio
+import signal
+
+from app.config import settings
+from app.db import init_db, close_db
+from app.services.generation_worker import GenerationWorker
+from app.services.groq_client import groq_client
+from app.services.log_sink import log_sink
+
+
+async def main(concurrency: int) -> None:
+    """
+    Run a generation worker until it is signalled to stop.
+    
+    Args:
+        concurrency: Maximum number of generations run at once
+    """
+    print("Initializing database connection...")
+    await init_db()
+    print("Database initialized successfully!")
+    await groq_client.start()
+    
+    worker = GenerationWorker(concurrency)
+    signals_received = 0
+    
+    def on_signal() -> None:
+        nonlocal signals_received
+        signals_received += 1
+        if signals_received == 1:
+            print("Stopping worker, waiting for running generations (signal again to abort)...")
+            worker.request_stop()
+        else:
+            print("Aborting running generations...")
+            worker.abort()
+    
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, on_signal)
+    
+    try:
+        await worker.run()
+    finally:
+        print("Flushing generation logs...")
+        await log_sink.close()
+        print("Closing Groq HTTP client...")
+        await groq_client.close()
+        print("Closing database connection...")
+        await close_db()
+        print("Database connection closed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run AutoPilot generation workers")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.job_worker_concurrency,
+        help="Generations run at once by this process"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,410 @@
+"""
+Load test: latency and saturation of the projects API.
+
+Starts the API (uvicorn, generation worker disabled) and benchmarks.mock_groq
+as the optimizer's AI backend in subprocesses, seeds synthetic generated
+projects into the API's storage and database, then drives every endpoint
+with a closed loop of N concurrent clients for each concurrency level:
+
+- create          POST /projects
+- get             GET  /projects/{id}
+- upload-specs    POST /projects/{id}/upload-specs (four synthetic workbooks)
+- files           GET  /projects/{id}/files
+- files-content   GET  /projects/{id}/files/content
+- logs            GET  /projects/{id}/logs
+- optimize        POST /projects/{id}/optimize (one file, mock AI)
+- download        GET  /projects/{id}/download
+
+For every endpoint and level it reports throughput, p50/p95/p99 latency,
+errors and a latency histogram, and marks where throughput stops scaling
+(the saturation point). Generation routes are left out: they only enqueue
+jobs, and generation itself is covered by generation_benchmark.
+
+It needs a PostgreSQL database (DATABASE_URL, e.g. a local scratch database).
+Seeded and created projects are deleted afterwards unless --keep is given.
+
+Run from the backend directory:
+
+    python -m benchmarks.api_load_test --projects 20 --blueprint-tables 10 --levels 1,4,16,64
+    python -m benchmarks.api_load_test --endpoints files,download --duration 20 --output load.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+import pandas as pd
+
+from benchmarks.generation_benchmark import free_port, percentile, start_mock_server
+from benchmarks.mock_groq import COMPLETIONS_PATH, add_arguments, config_from_args, config_to_argv
+from benchmarks.synthetic import synthetic_file, synthetic_project
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+
+# Throughput gain below which a level counts as saturated
+SATURATION_GAIN = 1.10
+
+ENDPOINTS = ("create", "get", "upload-specs", "files", "files-content", "logs", "optimize", "download")
+
+
+class Fixture:
+    """Seeded projects and the inputs the request builders draw from."""
+    
+    def __init__(self, name_prefix: str):
+        """
+        Create an empty fixture.
+        
+        Args:
+            name_prefix: Prefix of every project name created by this run
+        """
+        self.name_prefix = name_prefix
+        # Generated projects (status DONE, files on disk)
+        self.project_ids: List[uuid.UUID] = []
+        self.file_paths: List[str] = []
+        # Projects that receive spec uploads (their status changes)
+        self.upload_project_ids: List[uuid.UUID] = []
+        self.workbooks: Dict[str, bytes] = {}
+
+
+def build_workbooks(specs: Dict[str, Any]) -> Dict[str, bytes]:
+    """One .xlsx per spec category, with a sheet per table of the synthetic specs."""
+    workbooks = {}
+    for category, sheets in specs.items():
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            for sheet, rows in sheets.items():
+                pd.DataFrame(rows).to_excel(writer, sheet_name=sheet, index=False)
+        workbooks[category] = buffer.getvalue()
+    return workbooks
+
+
+async def seed(args: argparse.Namespace, storage: Path, fixture: Fixture) -> None:
+    """Create generated projects on disk and in the database."""
+    from app.db.models import Project, ProjectFile
+    
+    specs, blueprint = synthetic_project(args.blueprint_tables, 10)
+    fixture.workbooks = build_workbooks(specs)
+    for section, data in blueprint.items():
+        for path in data.get("files", {}):
+            fixture.file_paths.append(path if section == "root" else f"{section}/{path}")
+    
+    for index in range(args.projects):
+        project = await Project.create(
+            name=f"{fixture.name_prefix}-{index}",
+            tech_stack="Next.js, FastAPI, PostgreSQL",
+            status="DONE"
+        )
+        project_dir = storage / "generated_projects" / str(project.id)
+        for key in fixture.file_paths:
+            full_path = project_dir / key
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            full_path.write_text(synthetic_file(key, args.file_tokens), encoding="utf-8")
+        await ProjectFile.bulk_create([
+            ProjectFile(
+                project_id=project.id,
+                path=key,
+                file_type=key.split("/", 1)[0] if "/" in key else "docs",
+                status="DONE"
+            )
+            for key in fixture.file_paths
+        ])
+        fixture.project_ids.append(project.id)
+        
+        upload_project = await Project.create(
+            name=f"{fixture.name_prefix}-upload-{index}",
+            tech_stack="Next.js, FastAPI, PostgreSQL",
+            status="PENDING"
+        )
+        fixture.upload_project_ids.append(upload_project.id)
+
+
+def request_builders(fixture: Fixture) -> Dict[str, Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]]:
+    """A request factory per endpoint, each picking a random seeded project and file."""
+    def project() -> uuid.UUID:
+        return random.choice(fixture.project_ids)
+    
+    async def create(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post("/projects", json={
+            "name": f"{fixture.name_prefix}-created",
+            "tech_stack": "Next.js, FastAPI, PostgreSQL"
+        })
+    
+    async def get(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/projects/{project()}")
+    
+    async def upload_specs(client: httpx.AsyncClient) -> httpx.Response:
+        files = {
+            category: (f"{category}.xlsx", content, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            for category, content in fixture.workbooks.items()
+        }
+        return await client.post(f"/projects/{random.choice(fixture.upload_project_ids)}/upload-specs", files=files)
+    
+    async def files(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/projects/{project()}/files")
+    
+    async def files_content(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(
+            f"/projects/{project()}/files/content",
+            params={"path": random.choice(fixture.file_paths)}
+        )
+    
+    async def logs(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/projects/{project()}/logs", params={"limit": 100})
+    
+    async def optimize(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(f"/projects/{project()}/optimize", json={
+            "files": [random.choice(fixture.file_paths)],
+            "use_cache": False
+        })
+    
+    async def download(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/projects/{project()}/download")
+    
+    return {
+        "create": create,
+        "get": get,
+        "upload-specs": upload_specs,
+        "files": files,
+        "files-content": files_content,
+        "logs": logs,
+        "optimize": optimize,
+        "download": download,
+    }
+
+
+async def run_level(
+    base_url: str,
+    send: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]],
+    concurrency: int,
+    duration: float,
+    warmup: float
+) -> Dict[str, Any]:
+    """
+    Drive one endpoint with `concurrency` closed-loop clients.
+    
+    Args:
+        base_url: API base URL
+        send: Request factory of the endpoint
+        concurrency: Concurrent clients
+        duration: Measured seconds
+        warmup: Seconds before measuring
+    
+    Returns:
+        Throughput, latency percentiles, errors and histogram of the level
+    """
+    samples: List[Tuple[float, int]] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        started = time.perf_counter()
+        measure_from = started + warmup
+        deadline = measure_from + duration
+        
+        async def client_loop() -> None:
+            while time.perf_counter() < deadline:
+                sent = time.perf_counter()
+                try:
+                    status_code = (await send(client)).status_code
+                except httpx.HTTPError:
+                    status_code = 0
+                if sent >= measure_from:
+                    samples.append((time.perf_counter() - sent, status_code))
+        
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - measure_from
+    
+    latencies = [latency for latency, _ in samples]
+    errors = sum(1 for _, status_code in samples if not 200 <= status_code < 400)
+    histogram = [0] * len(HISTOGRAM_BUCKETS_MS)
+    for latency in latencies:
+        for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if latency * 1000 <= bound:
+                histogram[index] += 1
+                break
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "throughput": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "histogram_ms": dict(zip((str(bound) for bound in HISTOGRAM_BUCKETS_MS), histogram)),
+    }
+
+
+def saturation_point(levels: List[Dict[str, Any]], max_error_rate: float) -> Dict[str, Any]:
+    """
+    Find where an endpoint stops scaling: the last level before throughput
+    grows by less than SATURATION_GAIN, or before errors exceed the limit.
+    
+    Args:
+        levels: Level results in increasing concurrency
+        max_error_rate: Error rate that counts as falling over
+    
+    Returns:
+        Concurrency and throughput at saturation, and whether it was reached
+    """
+    best = levels[0]
+    for previous, level in zip(levels, levels[1:]):
+        if level["error_rate"] > max_error_rate or level["throughput"] < previous["throughput"] * SATURATION_GAIN:
+            return {"concurrency": previous["concurrency"], "throughput": previous["throughput"], "reached": True}
+        best = level
+    return {"concurrency": best["concurrency"], "throughput": best["throughput"], "reached": False}
+
+
+def print_report(report: Dict[str, Any], show_histograms: bool) -> None:
+    """Print the saturation curve (and histograms) of every endpoint."""
+    for endpoint, result in report["endpoints"].items():
+        saturation = result["saturation"]
+        verdict = (
+            f"saturates at {saturation['concurrency']} clients, {saturation['throughput']:.1f} req/s"
+            if saturation["reached"] else
+            f"still scaling at {saturation['concurrency']} clients, {saturation['throughput']:.1f} req/s"
+        )
+        print(f"\n{endpoint}: {verdict}")
+        print(f"{'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+        for level in result["levels"]:
+            print(f"{level['concurrency']:>8} {level['throughput']:>9.1f} {level['p50_ms']:>9.1f} "
+                  f"{level['p95_ms']:>9.1f} {level['p99_ms']:>9.1f} {level['errors']:>8}")
+        if show_histograms:
+            for level in result["levels"]:
+                total = level["requests"] or 1
+                print(f"  latency histogram at {level['concurrency']} clients:")
+                for bound, count in level["histogram_ms"].items():
+                    if count:
+                        print(f"    <= {bound:>6} ms {count:>7} {'#' * max(1, round(40 * count / total))}")
+
+
+async def run_load_test(args: argparse.Namespace, api_url: str, storage: Path) -> Dict[str, Any]:
+    """Seed, run every level of every endpoint, clean up."""
+    from app.db import init_db, close_db
+    from app.db.models import Project
+    
+    fixture = Fixture(name_prefix=f"loadtest-{uuid.uuid4().hex[:8]}")
+    await init_db()
+    try:
+        await seed(args, storage, fixture)
+        builders = request_builders(fixture)
+        report: Dict[str, Any] = {
+            "projects": args.projects,
+            "files_per_project": len(fixture.file_paths),
+            "endpoints": {},
+        }
+        for endpoint in args.endpoints:
+            levels = []
+            for concurrency in args.levels:
+                level = await run_level(api_url, builders[endpoint], concurrency, args.duration, args.warmup)
+                levels.append(level)
+                print(f"{endpoint} x{concurrency}: {level['throughput']:.1f} req/s, "
+                      f"p95 {level['p95_ms']:.0f} ms, {level['errors']} errors")
+            report["endpoints"][endpoint] = {
+                "levels": levels,
+                "saturation": saturation_point(levels, args.max_error_rate),
+            }
+        return report
+    finally:
+        if not args.keep:
+            await Project.filter(name__startswith=fixture.name_prefix).delete()
+        await close_db()
+
+
+def start_api_server(port: int, cwd: Path, env: Dict[str, str], workers: int) -> subprocess.Popen:
+    """Start the API and wait until /health answers."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=cwd,
+        env=env
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("API server did not become healthy")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the projects API")
+    parser.add_argument("--projects", type=int, default=20, help="Seeded generated projects")
+    parser.add_argument("--file-tokens", type=int, default=600, help="Approximate size of each seeded file")
+    parser.add_argument("--endpoints", type=lambda value: value.split(","), default=list(ENDPOINTS),
+                        help=f"Comma-separated endpoints ({','.join(ENDPOINTS)})")
+    parser.add_argument("--levels", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[1, 2, 4, 8, 16, 32, 64], help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds before each level")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate that counts as saturated")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--histograms", action="store_true", help="Print latency histograms of every level")
+    parser.add_argument("--output", default=None, help="Also write the report as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep seeded projects and files")
+    add_arguments(parser)
+    parser.set_defaults(latency_ms=300.0)
+    args = parser.parse_args()
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    
+    mock_port, api_port = free_port(), free_port()
+    # The API resolves storage/ relative to its working directory
+    workdir = Path(tempfile.mkdtemp(prefix="api-load-test-"))
+    storage = workdir / "storage"
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), os.environ.get("PYTHONPATH")])),
+        "GROQ_API_URL": f"http://127.0.0.1:{mock_port}{COMPLETIONS_PATH}",
+        "GROQ_API_KEY": "benchmark",
+        "LLM_CACHE_ENABLED": "false",
+        "LLM_SINGLE_FLIGHT_ENABLED": "false",
+        "GROQ_REQUESTS_PER_MINUTE": "0",
+        "GROQ_TOKENS_PER_MINUTE": "0",
+        "JOB_EMBEDDED_WORKER": "false",
+    }
+    # The API runs outside the backend directory, so pass on the database from .env
+    from app.config import settings
+    env["DATABASE_URL"] = settings.database_url
+    
+    mock = start_mock_server(mock_port, config_to_argv(config_from_args(args)))
+    api = None
+    try:
+        api = start_api_server(api_port, workdir, env, args.workers)
+        report = asyncio.run(run_load_test(args, f"http://127.0.0.1:{api_port}", storage))
+    finally:
+        for process in (api, mock):
+            if process is not None:
+                process.terminate()
+                process.wait()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    print_report(report, args.histograms)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
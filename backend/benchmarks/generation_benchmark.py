@@ -0,0 +1,298 @@
+"""
+Benchmark: end-to-end project generation against a local mock Groq server.
+
+Starts benchmarks.mock_groq in a subprocess, seeds synthetic projects and runs
+ProjectGeneratorService.generate_project for each of them (planning, file
+generation, checkpointing, logging, status writes), then reports:
+
+- throughput (files/s, projects/min) and wall time
+- p50/p95/p99 latency per generated file, by mode (ai, template, and batch,
+  where one entry is a shared call), from the per-file run metrics
+- AI calls, 429s, tokens and rate limiter wait
+- database statements issued, by method, and per file
+- peak RSS of the generating process
+
+It needs a PostgreSQL database (DATABASE_URL, e.g. a local scratch database)
+but no API key or network access. Seeded projects and generated files are
+deleted afterwards unless --keep is given.
+
+Run from the backend directory:
+
+    python -m benchmarks.generation_benchmark --projects 4 --concurrency 2 --blueprint-tables 10
+    python -m benchmarks.generation_benchmark --latency-ms 300 --rate-limit-ratio 0.1 --output report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.mock_groq import COMPLETIONS_PATH, add_arguments, config_from_args, config_to_argv
+from benchmarks.synthetic import synthetic_project
+
+
+class QueryCounter:
+    """Counts statements sent through a Tortoise connection."""
+    
+    METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many", "execute_script")
+    
+    def __init__(self):
+        """Create a counter with nothing counted."""
+        self.counts: Counter = Counter()
+    
+    def install(self, connection: Any) -> None:
+        """Wrap the execute methods of a connection."""
+        for name in self.METHODS:
+            original = getattr(connection, name)
+            setattr(connection, name, self._wrap(name, original))
+    
+    def _wrap(self, name: str, original):
+        async def counted(*args, **kwargs):
+            self.counts[name] += 1
+            return await original(*args, **kwargs)
+        return counted
+    
+    def reset(self) -> None:
+        """Forget what was counted so far."""
+        self.counts.clear()
+    
+    @property
+    def total(self) -> int:
+        """Statements counted."""
+        return sum(self.counts.values())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of `values` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def free_port() -> int:
+    """A TCP port that is free on localhost right now."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(port: int, argv: List[str]) -> subprocess.Popen:
+    """Start the mock Groq server and wait until it accepts connections."""
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.mock_groq", "--port", str(port), *argv])
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Mock Groq server exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Mock Groq server did not start")
+
+
+def configure_environment(args: argparse.Namespace, port: int, storage: str) -> None:
+    """Point the application settings at the mock server; must run before importing app."""
+    os.environ["GROQ_API_URL"] = f"http://127.0.0.1:{port}{COMPLETIONS_PATH}"
+    os.environ["GROQ_API_KEY"] = "benchmark"
+    # Every request should reach the mock server
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["LLM_SINGLE_FLIGHT_ENABLED"] = "false"
+    os.environ["LLM_CACHE_DIR"] = os.path.join(storage, "llm_cache")
+    os.environ["GROQ_REQUESTS_PER_MINUTE"] = str(args.requests_per_minute)
+    os.environ["GROQ_TOKENS_PER_MINUTE"] = str(args.tokens_per_minute)
+    if args.max_concurrency is not None:
+        os.environ["GENERATION_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    if args.project_concurrency is not None:
+        os.environ["GENERATION_PROJECT_CONCURRENCY"] = str(args.project_concurrency)
+
+
+async def run_benchmark(args: argparse.Namespace, port: int, storage: str) -> Dict[str, Any]:
+    """Seed projects, generate them and collect the report."""
+    from pathlib import Path
+    
+    from tortoise import connections
+    
+    from app.db import init_db, close_db
+    from app.db.models import Project, ProjectFile, ProjectSpec
+    from app.services.generator import project_generator
+    from app.services.groq_client import groq_client
+    from app.services.log_sink import log_sink
+    from app.services.run_metrics import RunMetrics, bind_run
+    
+    await init_db()
+    await groq_client.start()
+    project_generator.base_path = Path(storage) / "generated_projects"
+    project_generator.base_path.mkdir(parents=True, exist_ok=True)
+    
+    queries = QueryCounter()
+    queries.install(connections.get("default"))
+    project_ids = []
+    try:
+        specs, _ = synthetic_project(args.blueprint_tables, 10)
+        for index in range(args.projects):
+            project = await Project.create(
+                name=f"benchmark-{index}",
+                tech_stack="Next.js, FastAPI, PostgreSQL, Tailwind",
+                status="PENDING"
+            )
+            await ProjectSpec.create(
+                project=project,
+                features_json=specs["features"],
+                apis_json=specs["apis"],
+                database_json=specs["database"],
+                tech_stack_json=specs["tech_stack"]
+            )
+            project_ids.append(project.id)
+        
+        queries.reset()
+        rss_before = peak_rss_mb()
+        slots = asyncio.Semaphore(max(1, args.concurrency))
+        runs: List[RunMetrics] = []
+        
+        async def generate(project_id) -> None:
+            async with slots:
+                metrics = RunMetrics(project_id, "generate")
+                bind_run(metrics)
+                # Planning is part of the pipeline under test, so skip the memoized blueprint
+                await project_generator.generate_project(project_id, use_cache=False, force_replan=True)
+                metrics.finish(metrics.status or "UNKNOWN")
+                project_generator.discard_run_state(project_id)
+                runs.append(metrics)
+        
+        started = time.perf_counter()
+        # Each run gets its own task, so metrics bound in one do not leak into another
+        await asyncio.gather(*(asyncio.create_task(generate(project_id)) for project_id in project_ids))
+        wall = time.perf_counter() - started
+        await log_sink.flush()
+        query_counts = dict(queries.counts)
+        query_total = queries.total
+        files = await ProjectFile.filter(project_id__in=project_ids, status="DONE").count()
+        
+        statuses = Counter(run.status for run in runs)
+        latencies: Dict[str, List[float]] = {}
+        queue_waits: List[float] = []
+        for run in runs:
+            for entry in run.files.values():
+                latencies.setdefault(entry.mode, []).append(entry.seconds)
+                queue_waits.append(entry.queue_wait)
+        
+        llm = {
+            "calls": sum(run.llm.llm_calls for run in runs),
+            "prompt_tokens": sum(run.llm.prompt_tokens for run in runs),
+            "completion_tokens": sum(run.llm.completion_tokens for run in runs),
+            "llm_seconds": round(sum(run.llm.llm_seconds for run in runs), 3),
+            "rate_limit_wait": round(sum(run.llm.rate_limit_wait for run in runs), 3),
+        }
+        async with httpx.AsyncClient() as client:
+            mock_stats = (await client.get(f"http://127.0.0.1:{port}/stats")).json()
+        
+        return {
+            "projects": len(project_ids),
+            "statuses": dict(statuses),
+            "files": files,
+            "wall_seconds": round(wall, 3),
+            "files_per_second": round(files / wall, 3) if wall else 0.0,
+            "projects_per_minute": round(len(project_ids) * 60 / wall, 3) if wall else 0.0,
+            "latency": {
+                mode: {
+                    "count": len(values),
+                    "p50": round(percentile(values, 0.50), 4),
+                    "p95": round(percentile(values, 0.95), 4),
+                    "p99": round(percentile(values, 0.99), 4),
+                    "max": round(max(values), 4),
+                }
+                for mode, values in sorted(latencies.items())
+            },
+            "slot_queue_wait_p95": round(percentile(queue_waits, 0.95), 4),
+            "llm": llm,
+            "mock": mock_stats,
+            "db_queries": {
+                "total": query_total,
+                "per_file": round(query_total / files, 2) if files else 0.0,
+                "by_method": query_counts,
+            },
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "peak_rss_before_mb": round(rss_before, 1),
+        }
+    finally:
+        if project_ids and not args.keep:
+            await Project.filter(id__in=project_ids).delete()
+        await log_sink.close()
+        await groq_client.close()
+        await close_db()
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print a report as tables."""
+    print(f"{report['projects']} projects {report['statuses']}, {report['files']} files "
+          f"in {report['wall_seconds']:.1f}s: {report['files_per_second']:.2f} files/s, "
+          f"{report['projects_per_minute']:.2f} projects/min")
+    print(f"{'mode':<10} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for mode, stats in report["latency"].items():
+        print(f"{mode:<10} {stats['count']:>6} {stats['p50'] * 1000:>9.0f} {stats['p95'] * 1000:>9.0f} "
+              f"{stats['p99'] * 1000:>9.0f} {stats['max'] * 1000:>9.0f}")
+    print(f"slot queue wait p95: {report['slot_queue_wait_p95'] * 1000:.0f} ms")
+    llm, mock = report["llm"], report["mock"]
+    print(f"AI calls: {llm['calls']} ({mock['requests']} HTTP requests, {mock['rate_limited']} answered 429), "
+          f"tokens: {llm['prompt_tokens']:,} prompt / {llm['completion_tokens']:,} completion, "
+          f"rate limiter wait: {llm['rate_limit_wait']:.1f}s")
+    queries = report["db_queries"]
+    print(f"DB statements: {queries['total']} ({queries['per_file']} per file) {queries['by_method']}")
+    print(f"peak RSS: {report['peak_rss_mb']:.1f} MiB (before generation: {report['peak_rss_before_mb']:.1f} MiB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end generation against a mock Groq server")
+    parser.add_argument("--projects", type=int, default=4, help="Projects generated")
+    parser.add_argument("--concurrency", type=int, default=2, help="Projects generated at once")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="GENERATION_MAX_CONCURRENCY override")
+    parser.add_argument("--project-concurrency", type=int, default=None,
+                        help="GENERATION_PROJECT_CONCURRENCY override")
+    parser.add_argument("--requests-per-minute", type=int, default=0, help="Client-side RPM quota (0: off)")
+    parser.add_argument("--tokens-per-minute", type=int, default=0, help="Client-side TPM quota (0: off)")
+    parser.add_argument("--output", default=None, help="Also write the report as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep seeded projects and generated files")
+    add_arguments(parser)
+    args = parser.parse_args()
+    
+    port = free_port()
+    storage = tempfile.mkdtemp(prefix="generation-benchmark-")
+    configure_environment(args, port, storage)
+    mock = start_mock_server(port, config_to_argv(config_from_args(args)))
+    try:
+        report = asyncio.run(run_benchmark(args, port, storage))
+    finally:
+        mock.terminate()
+        mock.wait()
+        if not args.keep:
+            shutil.rmtree(storage, ignore_errors=True)
+    
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
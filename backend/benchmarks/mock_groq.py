@@ -0,0 +1,258 @@
+"""
+Local stand-in for the Groq OpenAI-compatible chat completions API.
+
+Answers planner, single-file and batched code generation and optimizer
+requests with synthetic but well-formed output (a blueprint, filler code,
+delimited multi-file blocks, the submitted code unchanged), with
+configurable latency, token rate, response size and HTTP 429 injection.
+Used by the generation benchmark and the API load test; it can also be run
+on its own to point a local API server at it:
+
+    python -m benchmarks.mock_groq --port 8900 --latency-ms 800 --rate-limit-ratio 0.05
+
+    GROQ_API_URL=http://127.0.0.1:8900/openai/v1/chat/completions
+
+GET /stats returns request counters.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.utils.multi_file import FILE_START, FILE_END
+from benchmarks.synthetic import synthetic_file, synthetic_project
+
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+_BATCH_FILE = re.compile(r"^- (?P<path>[^:\n]+): ", re.MULTILINE)
+
+
+@dataclass
+class MockGroqConfig:
+    """Behaviour of the mock server."""
+    
+    # Time to first token: fixed | uniform | lognormal
+    latency: str = "lognormal"
+    # Median time to first token
+    latency_ms: float = 800.0
+    # Lognormal sigma, or +/- fraction of latency_ms for uniform
+    latency_spread: float = 0.5
+    # Completion tokens generated per second after the first token
+    tokens_per_second: float = 250.0
+    # Mean completion size of a code file, varied uniformly by +/- response_spread
+    response_tokens: int = 600
+    response_spread: float = 0.5
+    # Fraction of requests answered with HTTP 429 and Retry-After
+    rate_limit_ratio: float = 0.0
+    retry_after: float = 1.0
+    # Size of the blueprint returned to the planner
+    blueprint_tables: int = 10
+    seed: Optional[int] = None
+
+
+class MockGroq:
+    """Request handling and counters of the mock server."""
+    
+    def __init__(self, config: MockGroqConfig):
+        """
+        Create the mock.
+        
+        Args:
+            config: Server behaviour
+        """
+        self.config = config
+        self.random = random.Random(config.seed)
+        _, self.blueprint = synthetic_project(config.blueprint_tables, 10)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "rate_limited": 0,
+            "streamed": 0,
+            "planner": 0,
+            "batch": 0,
+            "file": 0,
+            "optimizer": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+    
+    def app(self) -> Starlette:
+        """ASGI application serving the completions and stats endpoints."""
+        return Starlette(routes=[
+            Route(COMPLETIONS_PATH, self.chat_completions, methods=["POST"]),
+            Route("/stats", self.get_stats, methods=["GET"]),
+        ])
+    
+    async def get_stats(self, request: Request) -> Response:
+        """Request counters."""
+        return JSONResponse(self.stats)
+    
+    def _first_token_delay(self) -> float:
+        """Sample the time to first token in seconds."""
+        median = self.config.latency_ms / 1000
+        if self.config.latency == "fixed":
+            return median
+        if self.config.latency == "uniform":
+            spread = median * self.config.latency_spread
+            return max(0.0, self.random.uniform(median - spread, median + spread))
+        return self.random.lognormvariate(0.0, self.config.latency_spread) * median
+    
+    def _response_tokens(self) -> int:
+        """Sample the completion size of a code file."""
+        mean = self.config.response_tokens
+        spread = int(mean * self.config.response_spread)
+        return max(1, self.random.randint(mean - spread, mean + spread))
+    
+    def _respond(self, payload: Dict[str, Any]) -> str:
+        """Build the completion content for a request."""
+        messages = payload.get("messages") or []
+        prompt = messages[-1].get("content", "") if messages else ""
+        system = messages[0].get("content", "") if messages else ""
+        
+        if "software architect" in system:
+            self.stats["planner"] += 1
+            return json.dumps(self.blueprint)
+        
+        if "improve code quality" in system:
+            # Optimizer: echo the code so repeated optimizations keep files stable
+            self.stats["optimizer"] += 1
+            code = prompt.split("\nCode:\n", 1)[-1]
+            return code.rsplit("\n\nReturn ONLY", 1)[0]
+        
+        if prompt.startswith("Generate these "):
+            self.stats["batch"] += 1
+            file_list = prompt.split("\n\n", 1)[0]
+            blocks = []
+            for match in _BATCH_FILE.finditer(file_list):
+                path = match.group("path").strip()
+                content = "" if path.endswith("__init__.py") else synthetic_file(path, self._response_tokens() // 4)
+                blocks.append(f"{FILE_START.format(path=path)}\n{content}{FILE_END}")
+            return "\n".join(blocks)
+        
+        self.stats["file"] += 1
+        match = re.search(r"^FILE: (.+)$", prompt, re.MULTILINE)
+        return synthetic_file(match.group(1).strip() if match else "file.txt", self._response_tokens())
+    
+    async def chat_completions(self, request: Request) -> Response:
+        """POST /openai/v1/chat/completions"""
+        payload = await request.json()
+        self.stats["requests"] += 1
+        
+        if self.random.random() < self.config.rate_limit_ratio:
+            self.stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(self.config.retry_after)}
+            )
+        
+        content = self._respond(payload)
+        usage = {
+            "prompt_tokens": sum(len(m.get("content") or "") for m in payload.get("messages") or []) // 4,
+            "completion_tokens": max(1, len(content) // 4),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        self.stats["prompt_tokens"] += usage["prompt_tokens"]
+        self.stats["completion_tokens"] += usage["completion_tokens"]
+        model = payload.get("model", "mock")
+        delay = self._first_token_delay()
+        
+        if payload.get("stream"):
+            self.stats["streamed"] += 1
+            return StreamingResponse(self._stream(model, content, usage, delay), media_type="text/event-stream")
+        
+        await asyncio.sleep(delay + usage["completion_tokens"] / self.config.tokens_per_second)
+        return JSONResponse({
+            "id": f"mock-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+    
+    async def _stream(self, model: str, content: str, usage: Dict[str, int], delay: float) -> AsyncIterator[str]:
+        """Server-sent chunks at the configured token rate, usage on the last chunk."""
+        interval = 0.05
+        chunk_chars = max(4, int(self.config.tokens_per_second * interval * 4))
+        await asyncio.sleep(delay)
+        for start in range(0, len(content), chunk_chars):
+            chunk = {
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + chunk_chars]}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(interval)
+        final = {
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"usage": usage}
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the mock server options to a parser."""
+    defaults = MockGroqConfig()
+    parser.add_argument("--latency", choices=("fixed", "uniform", "lognormal"), default=defaults.latency,
+                        help="Distribution of the time to first token")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Median time to first token")
+    parser.add_argument("--latency-spread", type=float, default=defaults.latency_spread,
+                        help="Lognormal sigma, or +/- fraction for uniform")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second,
+                        help="Completion token rate")
+    parser.add_argument("--response-tokens", type=int, default=defaults.response_tokens,
+                        help="Mean completion tokens of a code file")
+    parser.add_argument("--response-spread", type=float, default=defaults.response_spread,
+                        help="+/- fraction of the completion size")
+    parser.add_argument("--rate-limit-ratio", type=float, default=defaults.rate_limit_ratio,
+                        help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after,
+                        help="Retry-After seconds of injected 429s")
+    parser.add_argument("--blueprint-tables", type=int, default=defaults.blueprint_tables,
+                        help="Resources in the planned blueprint (4 backend + 1 frontend file each)")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+
+
+def config_from_args(args: argparse.Namespace) -> MockGroqConfig:
+    """Build the config from parsed add_arguments() options."""
+    return MockGroqConfig(**{name: getattr(args, name) for name in asdict(MockGroqConfig())})
+
+
+def config_to_argv(config: MockGroqConfig) -> List[str]:
+    """Command line options reproducing a config."""
+    argv = []
+    for name, value in asdict(config).items():
+        if value is not None:
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+    return argv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock Groq chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    
+    mock = MockGroq(config_from_args(args))
+    uvicorn.run(mock.app(), host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
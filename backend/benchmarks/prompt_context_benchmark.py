@@ -0,0 +1,105 @@
+"""
+Benchmark: per-run PromptContext vs. per-file prompt serialization.
+
+Builds the code generation prompt of every file of a synthetic project twice:
+
+- baseline: every prompt re-serializes the full specs with json.dumps(indent=2)
+  and rebuilds the related-files listing (the behaviour before PromptContext)
+- context:  specs and listings are serialized once per run; each prompt gets
+  its spec slices assembled from pre-serialized, minified rows
+
+and reports CPU time and prompt size (tokens estimated as characters / 4, the
+same heuristic the rate limiter uses).
+
+Run from the backend directory:
+
+    python -m benchmarks.prompt_context_benchmark --tables 40 --repeat 5
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, Any, List, Tuple
+
+# Prompt building needs no database or API access
+os.environ.setdefault("DATABASE_URL", "postgres://benchmark@localhost/benchmark")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from app.services.ai_code_generator import AICodeGenerator  # noqa: E402
+from app.services.blueprint_graph import BlueprintGraph  # noqa: E402
+from app.services.prompt_context import PromptContext, FilePromptSections  # noqa: E402
+from benchmarks.synthetic import synthetic_project  # noqa: E402
+
+
+def baseline_prompts(generator: AICodeGenerator, specs: Dict[str, Any], graph: BlueprintGraph) -> List[str]:
+    """Per-file serialization of the full specs, as before PromptContext."""
+    prompts = []
+    for key, job in graph.nodes.items():
+        related_files = {fp: purpose for fp, purpose in job.section_files.items() if fp != job.file_path}
+        sections = FilePromptSections(
+            features=json.dumps(specs["features"], indent=2),
+            apis=json.dumps(specs["apis"], indent=2),
+            database=json.dumps(specs["database"], indent=2),
+            tech_stack=json.dumps(specs["tech_stack"], indent=2),
+            related_files="\n".join(f"- {path}: {purpose}" for path, purpose in related_files.items())
+        )
+        prompts.append(generator._build_code_generation_prompt(
+            job.file_path, job.file_purpose, "Benchmark", job.framework, sections
+        ))
+    return prompts
+
+
+def context_prompts(generator: AICodeGenerator, specs: Dict[str, Any], graph: BlueprintGraph) -> List[str]:
+    """One PromptContext per run, reused by every file prompt."""
+    context = PromptContext.build("Benchmark", specs, graph)
+    return [
+        generator._build_code_generation_prompt(
+            job.file_path, job.file_purpose, "Benchmark", job.framework, context.sections_for(key)
+        )
+        for key, job in graph.nodes.items()
+    ]
+
+
+def measure(build, repeat: int) -> Tuple[float, List[str]]:
+    """Best-of-`repeat` CPU seconds of one full pass over the files."""
+    best = float("inf")
+    prompts: List[str] = []
+    for _ in range(repeat):
+        started = time.process_time()
+        prompts = build()
+        best = min(best, time.process_time() - started)
+    return best, prompts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-run prompt context")
+    parser.add_argument("--tables", type=int, default=40, help="Tables (resources) in the synthetic workbook")
+    parser.add_argument("--columns", type=int, default=10, help="Columns per table")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per variant (best is reported)")
+    args = parser.parse_args()
+    
+    specs, blueprint = synthetic_project(args.tables, args.columns)
+    graph = BlueprintGraph(blueprint)
+    generator = AICodeGenerator()
+    
+    print(f"{len(graph.nodes)} files, {args.tables} tables x {args.columns} columns, "
+          f"{args.tables * 4} endpoints, {args.tables} features")
+    print(f"{'variant':<10} {'cpu ms':>10} {'prompt chars':>14} {'est. tokens':>12} {'tokens/file':>12}")
+    
+    results = {}
+    for name, build in (
+        ("baseline", lambda: baseline_prompts(generator, specs, graph)),
+        ("context", lambda: context_prompts(generator, specs, graph)),
+    ):
+        cpu, prompts = measure(build, args.repeat)
+        chars = sum(len(prompt) for prompt in prompts)
+        results[name] = (cpu, chars // 4)
+        print(f"{name:<10} {cpu * 1000:>10.1f} {chars:>14,} {chars // 4:>12,} {chars // 4 // len(prompts):>12,}")
+    
+    (base_cpu, base_tokens), (ctx_cpu, ctx_tokens) = results["baseline"], results["context"]
+    print(f"CPU: {base_cpu / ctx_cpu if ctx_cpu else float('inf'):.1f}x less, "
+          f"tokens: {base_tokens / ctx_tokens if ctx_tokens else float('inf'):.1f}x fewer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Synthetic workbooks and blueprints shared by the benchmarks.
+"""
+from pathlib import PurePosixPath
+from typing import Dict, Any, Tuple
+import json
+
+
+# Line comment prefix of filler code, by file extension
+COMMENT_PREFIXES = {
+    ".py": "# ", ".sql": "-- ", ".yml": "# ", ".yaml": "# ", ".toml": "# ",
+    ".cfg": "# ", ".ini": "; ", ".md": "", ".txt": "", ".env": "# ",
+}
+
+COLUMNS = ("id", "name", "description", "status", "owner_id", "created_at", "updated_at", "price", "quantity", "notes")
+
+
+def synthetic_project(tables: int, columns: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Build a synthetic workbook and blueprint.
+    
+    Args:
+        tables: Number of database tables (resources)
+        columns: Columns per table
+    
+    Returns:
+        Tuple of (specs keyed by category, blueprint)
+    """
+    names = [f"resource{i}" for i in range(tables)]
+    database = {"Tables": [
+        {"Table": f"{name}s", "Column": COLUMNS[c % len(COLUMNS)] + ("" if c < len(COLUMNS) else str(c)),
+         "Type": "VARCHAR(255)", "Nullable": "NO", "Default": None, "Notes": None}
+        for name in names for c in range(columns)
+    ]}
+    apis = {"Endpoints": [
+        {"Method": method, "Endpoint": f"/api/{name}s" + ("/{id}" if method != "POST" else ""),
+         "Description": f"{method} {name} records with filtering, pagination and validation",
+         "Auth": "Bearer", "Request Body": None}
+        for name in names for method in ("GET", "POST", "PUT", "DELETE")
+    ]}
+    features = {"Features": [
+        {"Feature": f"{name.title()} management",
+         "Description": f"Users can create, browse, edit and delete {name}s with search and sorting",
+         "Priority": "High"}
+        for name in names
+    ]}
+    tech_stack = {"Stack": [
+        {"Layer": "Frontend", "Technology": "Next.js"},
+        {"Layer": "Backend", "Technology": "FastAPI"},
+        {"Layer": "Database", "Technology": "PostgreSQL"},
+    ]}
+    
+    backend_files = {"app/main.py": "FastAPI application entry point", "app/database.py": "Database connection"}
+    frontend_files = {"src/app/page.tsx": "Home page", "src/lib/api.ts": "API client for all endpoints"}
+    for name in names:
+        backend_files[f"app/models/{name}.py"] = f"{name.title()} ORM model"
+        backend_files[f"app/schemas/{name}.py"] = f"{name.title()} request and response schemas"
+        backend_files[f"app/routes/{name}s.py"] = f"{name.title()} CRUD routes"
+        frontend_files[f"src/app/{name}s/page.tsx"] = f"{name.title()} list page"
+    blueprint = {
+        "backend": {"framework": "FastAPI", "files": backend_files},
+        "frontend": {"framework": "Next.js", "files": frontend_files},
+        "database": {"framework": "PostgreSQL", "files": {"schema.sql": "Database schema"}},
+        "root": {"files": {"README.md": "Project documentation", ".gitignore": "Git ignore rules"}},
+    }
+    return {"features": features, "apis": apis, "database": database, "tech_stack": tech_stack}, blueprint
+
+
+def synthetic_file(path: str, tokens: int) -> str:
+    """
+    Syntactically valid filler content for a file.
+    
+    Args:
+        path: File path; the extension decides the format
+        tokens: Approximate size in tokens (4 characters each)
+    
+    Returns:
+        File content
+    """
+    suffix = PurePosixPath(path).suffix.lower()
+    if suffix == ".json":
+        return json.dumps({"name": "benchmark", "description": "x" * (tokens * 4)}, indent=2) + "\n"
+    prefix = COMMENT_PREFIXES.get(suffix, "// ")
+    lines = []
+    size = 0
+    while size < tokens * 4:
+        line = f"{prefix}synthetic line {len(lines) + 1} of {path}"
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,51 @@
+"""
+SCHEMA_UPGRADES must add columns exactly as generate_schemas() would create
+them, so upgraded and fresh databases accept the same values.
+"""
+import re
+
+import pytest
+
+from app.db import models
+from app.db.init import SCHEMA_UPGRADES
+
+
+ADD_COLUMN = re.compile(
+    r"ALTER TABLE (?P<table>\w+) ADD COLUMN IF NOT EXISTS (?P<column>\w+) (?P<type>\w+(?:\(\d+\))?)",
+    re.IGNORECASE
+)
+
+
+def _model_fields():
+    """Map (table, column) to the model field declaring it."""
+    fields = {}
+    for model in (
+        models.Project,
+        models.ProjectSpec,
+        models.ProjectFile,
+        models.GenerationLog,
+        models.Blueprint,
+        models.GenerationJob,
+        models.GenerationRun,
+    ):
+        for field in model._meta.fields_map.values():
+            if field.source_field or not field.has_db_field:
+                continue
+            fields[(model._meta.db_table, field.model_field_name)] = field
+    return fields
+
+
+UPGRADE_COLUMNS = [match.groupdict() for match in map(ADD_COLUMN.match, SCHEMA_UPGRADES) if match]
+
+
+def test_upgrades_add_columns():
+    """Guards the pattern below against silently matching nothing."""
+    assert UPGRADE_COLUMNS
+
+
+@pytest.mark.parametrize("upgrade", UPGRADE_COLUMNS, ids=lambda upgrade: f"{upgrade['table']}.{upgrade['column']}")
+def test_upgrade_column_type_matches_model(upgrade):
+    """An upgraded column has the SQL type generate_schemas() gives it."""
+    field = _model_fields().get((upgrade["table"], upgrade["column"]))
+    assert field is not None, f"No model field for {upgrade['table']}.{upgrade['column']}"
+    assert upgrade["type"].upper() == field.get_for_dialect("postgres", "SQL_TYPE").upper()
@@ -8,7 +8,7 @@ import StatusBadge, { ProjectStatus } from '@/components/StatusBadge';
 import Stepper from '@/components/Stepper';
 import LogPanel, { LogMessage } from '@/components/LogPanel';
 import { apiClient } from '@/lib/api-client';
-import type { Project } from '@/types/api';
+import type { Project, FileProgressEvent, GenerationLogEvent } from '@/types/api';
 
 interface ProjectStatusPageProps {
     params: Promise<{
@@ -28,12 +28,29 @@ function mapBackendStatus(backendStatus: string): ProjectStatus {
     return statusMap[backendStatus] || 'uploaded';
 }
 
+// Map a streamed generation log line to a log panel entry
+function toLogMessage(event: GenerationLogEvent, id: string): LogMessage {
+    let type: LogMessage['type'] = 'info';
+    if (event.message.startsWith('✓')) {
+        type = 'success';
+    } else if (event.message.startsWith('✗') || event.step === 'error') {
+        type = 'error';
+    }
+    return {
+        id: `event-${id}`,
+        timestamp: new Date(event.timestamp),
+        message: event.message,
+        type
+    };
+}
+
 export default function ProjectStatusPage({ params }: ProjectStatusPageProps) {
     const { id } = use(params);
     const router = useRouter();
     const [project, setProject] = useState<Project | null>(null);
     const [currentStatus, setCurrentStatus] = useState<ProjectStatus>('uploaded');
     const [logs, setLogs] = useState<LogMessage[]>([]);
+    const [fileProgress, setFileProgress] = useState<FileProgressEvent | null>(null);
     const [isLoading, setIsLoading] = useState(true);
     const [isRetrying, setIsRetrying] = useState(false);
     const [error, setError] = useState<string | null>(null);
@@ -130,25 +147,47 @@ export default function ProjectStatusPage({ params }: ProjectStatusPageProps) {
 
         fetchProject();
 
-        // Poll for updates every 5 seconds, but stop if project reaches terminal state
-        const interval = setInterval(async () => {
-            try {
-                const data = await apiClient.getProject(id);
-                const status = data.status;
+        // Fall back to polling every 5 seconds if the event stream is unavailable
+        let interval: ReturnType<typeof setInterval> | undefined;
+        const startPolling = () => {
+            if (interval) return;
+            interval = setInterval(async () => {
+                try {
+                    const data = await apiClient.getProject(id);
+                    const status = data.status;
 
-                // Stop polling if project is done or failed
-                if (status === 'DONE' || status === 'FAILED') {
-                    clearInterval(interval);
+                    // Stop polling if project is done or failed
+                    if (status === 'DONE' || status === 'FAILED') {
+                        clearInterval(interval);
+                    }
+
+                    setProject(data);
+                    setCurrentStatus(mapBackendStatus(status));
+                } catch (err) {
+                    console.error('Polling error:', err);
                 }
+            }, 5000);
+        };
 
-                setProject(data);
-                setCurrentStatus(mapBackendStatus(status));
-            } catch (err) {
-                console.error('Polling error:', err);
-            }
-        }, 5000);
+        // Live updates pushed by the backend
+        const unsubscribe = apiClient.subscribeToProject(id, {
+            onStatus: (event) => {
+                setProject(prev => prev ? { ...prev, status: event.status, current_step: event.current_step } : prev);
+                setCurrentStatus(mapBackendStatus(event.status));
+            },
+            onFile: (event) => setFileProgress(event),
+            onLog: (event, eventId) => {
+                const entry = toLogMessage(event, eventId);
+                // Replayed events after a reconnect are already shown
+                setLogs(prev => prev.some(log => log.id === entry.id) ? prev : [...prev, entry]);
+            },
+            onError: startPolling
+        });
 
-        return () => clearInterval(interval);
+        return () => {
+            unsubscribe();
+            if (interval) clearInterval(interval);
+        };
     }, [id]);
 
     // Define the steps for the stepper
@@ -279,6 +318,12 @@ export default function ProjectStatusPage({ params }: ProjectStatusPageProps) {
                                 <p className="text-sm text-gray-600">
                                     {project?.current_step || 'Please wait while we process your project...'}
                                 </p>
+                                {currentStatus === 'generating' && fileProgress && (
+                                    <p className="text-sm text-gray-500 mt-1">
+                                        {fileProgress.completed}/{fileProgress.total} files
+                                        {fileProgress.failed > 0 && ` (${fileProgress.failed} failed)`}
+                                    </p>
+                                )}
                             </div>
                             {currentStatus === 'uploaded' && project?.status === 'PENDING' && (
                                 <Button
@@ -8,6 +8,7 @@ import type {
   FileContentResponse,
   OptimizeFilesRequest,
   OptimizeFilesResponse,
+  ProjectEventHandlers,
   ApiError,
 } from "@/types/api";
 
@@ -61,6 +62,42 @@ class ApiClient {
     return response.json();
   }
 
+  /**
+   * Subscribe to live generation progress (server-sent events).
+   * The browser reconnects on its own and resumes from the last received
+   * event; the stream closes once the project is DONE or FAILED.
+   * Returns a function that closes the stream.
+   */
+  subscribeToProject(
+    projectId: string,
+    handlers: ProjectEventHandlers
+  ): () => void {
+    const source = new EventSource(`${this.baseUrl}/projects/${projectId}/events`);
+
+    source.addEventListener("status", (event) => {
+      const data = JSON.parse((event as MessageEvent).data);
+      handlers.onStatus?.(data);
+      if (data.status === "DONE" || data.status === "FAILED") {
+        source.close();
+      }
+    });
+    source.addEventListener("file", (event) => {
+      handlers.onFile?.(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener("log", (event) => {
+      const message = event as MessageEvent;
+      handlers.onLog?.(JSON.parse(message.data), message.lastEventId);
+    });
+    source.onerror = () => {
+      // CLOSED means the browser gave up reconnecting
+      if (source.readyState === EventSource.CLOSED) {
+        handlers.onError?.();
+      }
+    };
+
+    return () => source.close();
+  }
+
   /**
    * Upload Excel specification files
    */
@@ -59,3 +59,31 @@ export interface OptimizeFilesResponse {
 export interface ApiError {
   detail: string;
 }
+
+// Live progress events (GET /projects/{id}/events)
+export interface ProjectStatusEvent {
+  status: Project["status"];
+  current_step: string | null;
+}
+
+export interface FileProgressEvent {
+  path: string;
+  state: "generating" | "done" | "failed";
+  completed: number;
+  total: number;
+  succeeded: number;
+  failed: number;
+}
+
+export interface GenerationLogEvent {
+  step: string;
+  message: string;
+  timestamp: string;
+}
+
+export interface ProjectEventHandlers {
+  onStatus?: (event: ProjectStatusEvent) => void;
+  onFile?: (event: FileProgressEvent) => void;
+  onLog?: (event: GenerationLogEvent, id: string) => void;
+  onError?: () => void;
+}